@@ -42,6 +42,12 @@ class Settings(BaseSettings):
     redis_port: int = Field(default=6379, alias="REDIS_PORT")
     redis_password: str = Field(default="password", alias="REDIS_PASSWORD")
     redis_rate_limit_db: int = Field(default=2, alias="REDIS_RATE_LIMIT_DB")
+    redis_rate_limit_max_connections: int = Field(
+        default=50, alias="REDIS_RATE_LIMIT_MAX_CONNECTIONS"
+    )
+    redis_rate_limit_pool_timeout_sec: float = Field(
+        default=5.0, alias="REDIS_RATE_LIMIT_POOL_TIMEOUT_SEC"
+    )
 
     pg_user: str = Field(default="user", alias="PG_USER")
     pg_password: str = Field(default="password", alias="PG_PASSWORD")
@@ -1,7 +1,6 @@
 import logging
-from contextlib import asynccontextmanager
 
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
 from redis.exceptions import ConnectionError
 
 from src.core.config import settings
@@ -11,6 +10,7 @@ from src.services.auth_service import AuthService
 logger = logging.getLogger(__name__)
 
 redis_auth: AuthService | None = None
+redis_rate_limit: Redis | None = None
 
 
 async def get_redis_auth() -> AuthService:
@@ -44,21 +44,35 @@ async def get_redis_auth() -> AuthService:
     return redis_auth
 
 
-@asynccontextmanager
-async def redis_client_by_rate_limit():
+def get_redis_rate_limit() -> Redis:
     """
-    Асинхронный контекстный менеджер Redis для RateLimit.
+    Клиент Redis для RateLimit. Один на процесс: запросы берут соединения из
+    общего пула (не более redis_rate_limit_max_connections) вместо
+    подключения и ping на каждый запрос. При исчерпании пула запрос ждет
+    свободное соединение (BlockingConnectionPool), а не получает ошибку:
+    иначе всплеск запросов пропускался бы без ограничения.
 
-    @rtype: AsyncGenerator[Redis | None | Redis[bytes], Any]
+    @rtype: Redis
     @return: redis_client
     """
-    redis_client = Redis.from_url(url=settings.redis_rate_limit_url)
+    global redis_rate_limit
+
+    if not redis_rate_limit:
+        redis_rate_limit = Redis(
+            connection_pool=BlockingConnectionPool.from_url(
+                url=settings.redis_rate_limit_url,
+                max_connections=settings.redis_rate_limit_max_connections,
+                timeout=settings.redis_rate_limit_pool_timeout_sec,
+            )
+        )
+
+    return redis_rate_limit
 
-    try:
-        if not await redis_client.ping():
-            raise ConnectionError("Redis недоступен!")
 
-        yield redis_client
+async def close_redis_rate_limit() -> None:
+    global redis_rate_limit
 
-    finally:
-        await redis_client.close()
+    if redis_rate_limit:
+        await redis_rate_limit.close()
+        await redis_rate_limit.connection_pool.disconnect()
+        redis_rate_limit = None
@@ -7,7 +7,7 @@ from sqlalchemy import text
 from src.api.v1 import healthcheck, user, user_role, validate
 from src.core.config import settings
 from src.db.postgres import async_session
-from src.db.redis_client import get_redis_auth
+from src.db.redis_client import close_redis_rate_limit, get_redis_auth
 from src.middleware import AsyncRateLimitMiddleware
 
 logger = logging.getLogger(__name__)
@@ -85,6 +85,8 @@ async def shutdown():
     if redis_auth:
         await redis_auth.close()
 
+    await close_redis_rate_limit()
+
 
 # Подключение Route - внешних
 api_router.include_router(
@@ -0,0 +1,73 @@
+import logging
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["RateLimiter"]
+
+
+class RateLimiter:
+    """
+    Ограничение частоты запросов по алгоритму GCRA (generic cell rate
+    algorithm): на клиента в Redis хранится одно значение - теоретическое
+    время прихода следующего запроса (TAT). Проверка и учет запроса
+    выполняются одним Lua-скриптом, то есть атомарно и за один round trip.
+    Допускается limit запросов за window_sec (включая всплеск до limit
+    запросов), интервалы между запросами выравниваются.
+    """
+
+    # KEYS[1] - ключ клиента; ARGV[1] - limit, ARGV[2] - окно в мс.
+    # Возвращает {1, 0}, если запрос разрешен, иначе {0, мс до повтора}.
+    GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local time_ = redis.call('TIME')
+local now = time_[1] * 1000 + math.floor(time_[2] / 1000)
+local interval = window_ms / limit
+local tat = tonumber(redis.call('GET', KEYS[1]))
+
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local allow_at = new_tat - window_ms
+
+if allow_at > now then
+    return {0, math.ceil(allow_at - now)}
+end
+
+local ttl = math.max(math.ceil(new_tat - now), 1)
+redis.call('SET', KEYS[1], new_tat, 'PX', ttl)
+
+return {1, 0}
+"""
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        limit: int,
+        window_sec: int,
+        key_template: str = "ratelimit:{client_id}",
+    ):
+        self._limit = limit
+        self._window_ms = window_sec * 1000
+        self._key_template = key_template
+        # Скрипт вызывается по EVALSHA, при NOSCRIPT - загружается заново.
+        self._script = redis_client.register_script(self.GCRA_SCRIPT)
+
+    async def hit(self, client_id: str) -> tuple[bool, int]:
+        """
+        Учет запроса клиента.
+
+        @param client_id:
+        @rtype: tuple[bool, int]
+        @return: (разрешен ли запрос, секунд до повтора)
+        """
+        allowed, retry_after_ms = await self._script(
+            keys=[self._key_template.format(client_id=client_id)],
+            args=[self._limit, self._window_ms],
+        )
+
+        return bool(allowed), -(-int(retry_after_ms) // 1000)
@@ -0,0 +1,124 @@
+"""
+Генератор синтетического каталога (жанры, персоны, кинопроизведения и
+связки) для бенчмарков ETL.
+"""
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from models.movies.pg_models import (Base, FilmWork, Genre, GenreFilmWork,
+                                     Person, PersonFilmWork)
+from utils.movies_utils.etl_enum import PersonRoles
+
+__all__ = ["CatalogSize", "create_catalog"]
+
+ROLES = [role.value for role in PersonRoles]
+INSERT_CHUNK_SIZE = 5_000
+START_MODIFIED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class CatalogSize:
+    films: int = 1_000
+    persons: int = 2_000
+    genres: int = 20
+    cast_size: int = 10
+    genres_per_film: int = 3
+
+    @property
+    def records(self) -> int:
+        """Сущности, которые ETL загружает в ES."""
+        return self.films + self.persons + self.genres
+
+
+async def create_catalog(
+    engine: AsyncEngine, size: CatalogSize, seed: int = 0
+) -> None:
+    """
+    Создание схемы и заполнение каталога. Записи получают разные modified,
+    чтобы выборка шла keyset-пагинацией, как на рабочих данных.
+
+    :param AsyncEngine engine:
+    :param CatalogSize size:
+    :param int seed:
+    :return None:
+    """
+    random_ = random.Random(seed)
+    tick = iter(range(10 ** 9))
+
+    def timestamps() -> dict:
+        modified = START_MODIFIED + timedelta(milliseconds=next(tick))
+        return {"created": modified, "modified": modified}
+
+    genres = [
+        {
+            "id": uuid.UUID(int=random_.getrandbits(128)),
+            "name": f"Genre {i}",
+            "description": f"Genre {i} description",
+            **timestamps(),
+        }
+        for i in range(size.genres)
+    ]
+    persons = [
+        {
+            "id": uuid.UUID(int=random_.getrandbits(128)),
+            "full_name": f"Person {i}",
+            **timestamps(),
+        }
+        for i in range(size.persons)
+    ]
+    films, genre_film_works, person_film_works = [], [], []
+
+    for i in range(size.films):
+        film_work_id = uuid.UUID(int=random_.getrandbits(128))
+        films.append({
+            "id": film_work_id,
+            "title": f"Film {i}",
+            "description": f"Film {i} description",
+            "creation_date": START_MODIFIED,
+            "rating": round(random_.uniform(0, 10), 1),
+            "type": "movie",
+            **timestamps(),
+        })
+        genre_film_works.extend(
+            {
+                "id": uuid.UUID(int=random_.getrandbits(128)),
+                "genre_id": genre["id"],
+                "film_work_id": film_work_id,
+                "created": START_MODIFIED,
+            }
+            for genre in random_.sample(
+                genres, k=min(size.genres_per_film, len(genres))
+            )
+        )
+        person_film_works.extend(
+            {
+                "id": uuid.UUID(int=random_.getrandbits(128)),
+                "person_id": person["id"],
+                "film_work_id": film_work_id,
+                "role": ROLES[j % len(ROLES)],
+                "created": START_MODIFIED,
+            }
+            for j, person in enumerate(
+                random_.sample(persons, k=min(size.cast_size, len(persons)))
+            )
+        )
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+        for model_, rows in (
+            (Genre, genres),
+            (Person, persons),
+            (FilmWork, films),
+            (GenreFilmWork, genre_film_works),
+            (PersonFilmWork, person_film_works),
+        ):
+            for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+                await connection.execute(
+                    insert(model_), rows[i:i + INSERT_CHUNK_SIZE]
+                )
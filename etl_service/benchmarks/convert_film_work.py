@@ -0,0 +1,96 @@
+"""
+Micro-benchmark стоимости конвертации одного документа film_work
+(FilmWorkRules.film_work_transformation_data_rule) для фильмов с большим
+составом.
+
+Запуск из каталога etl_service:
+    python benchmarks/convert_film_work.py --casts 10 100 1000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from transfer.movies.convert_rules import FilmWorkRules  # noqa: E402
+from utils.movies_utils.etl_enum import PersonRoles  # noqa: E402
+
+ROLES = [role.value for role in PersonRoles]
+
+
+def make_film_work(cast_size: int, genres_size: int = 5) -> dict:
+    """Обогащенный film_work в формате Storage (FilmWorkModel, JSON)."""
+    film_work_id = str(uuid.uuid4())
+
+    return {
+        "id": film_work_id,
+        "imdb_rating": 7.5,
+        "title": "Title",
+        "description": "Description",
+        "persons": [
+            {
+                "id": str(uuid.uuid4()),
+                "film_work_id": film_work_id,
+                "full_name": f"Person {i}",
+                "role": ROLES[i % len(ROLES)],
+            }
+            for i in range(cast_size)
+        ],
+        "genres": [
+            {
+                "id": str(uuid.uuid4()),
+                "film_work_id": film_work_id,
+                "name": f"Genre {i}",
+                "description": "",
+            }
+            for i in range(genres_size)
+        ],
+        "was_enrich": True,
+        "was_convert": False,
+    }
+
+
+async def bench(cast_size: int, number: int) -> float:
+    film_work = make_film_work(cast_size=cast_size)
+
+    # Прогрев.
+    await FilmWorkRules.film_work_transformation_data_rule(obj_data=film_work)
+
+    start = time.perf_counter()
+    for _ in range(number):
+        es_model = await FilmWorkRules.film_work_transformation_data_rule(
+            obj_data=film_work
+        )
+        es_model.model_dump_json()
+
+    return (time.perf_counter() - start) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--casts", type=int, nargs="+", default=[10, 100, 1000, 5000]
+    )
+    parser.add_argument(
+        "--budget", type=int, default=200_000,
+        help="persons converted per cast size (sets the iteration count)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'cast':>8} {'iterations':>11} {'us/doc':>11} {'docs/sec':>11}")
+    for cast_size in args.casts:
+        number = max(args.budget // max(cast_size, 1), 10)
+        per_doc = asyncio.run(bench(cast_size=cast_size, number=number))
+        print(
+            f"{cast_size:>8} {number:>11} {per_doc * 1e6:>11.1f} "
+            f"{1 / per_doc:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Бенчмарк конвейера ETL без docker-compose: синтетический каталог в SQLite
+(или в Postgres по --pg-url), fakeredis и приемник bulk-запросов вместо ES.
+Этапы Producer -> (FanOut) -> Enricher -> Convertor -> Loader прогоняются
+цепочкой (StageChain.run_pass) до полной выгрузки каталога. Отчет:
+records/sec, время, выход и пик памяти (tracemalloc) по этапам. --json
+сохраняет результат, --baseline сравнивает с сохраненным ранее.
+
+Запуск из каталога etl_service:
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/etl_pipeline.py --films 5000 --cast-size 20 \
+        --json baseline.json
+    python benchmarks/etl_pipeline.py --films 5000 --cast-size 20 \
+        --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from catalog import CatalogSize, create_catalog  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+from stand_ins import (FakeESClient, create_pg_engine,  # noqa: E402
+                       create_redis_storage)
+
+from core import config  # noqa: E402
+from extract.movies.enricher import Enricher  # noqa: E402
+from extract.movies.fan_out import FanOut  # noqa: E402
+from extract.movies.producer import Producer  # noqa: E402
+from loader.movies_loader import Loader  # noqa: E402
+from transfer.movies.convertor import Convertor  # noqa: E402
+from utils.stage_chain import StageChain  # noqa: E402
+
+MB = 1024 * 1024
+
+
+class MeasuredStage:
+    """Этап ETL с учетом времени, выхода и пика памяти его запусков."""
+
+    def __init__(self, stage, trace_memory: bool):
+        self._stage = stage
+        self._trace_memory = trace_memory
+        self.name = type(stage).__name__
+        self.runs, self.items, self.seconds, self.peak_memory = 0, 0, 0.0, 0
+
+    async def run(self) -> int:
+        if self._trace_memory:
+            tracemalloc.reset_peak()
+            current_memory = tracemalloc.get_traced_memory()[0]
+
+        start_ = time.perf_counter()
+        items = await self._stage.run() or 0
+        self.seconds += time.perf_counter() - start_
+
+        if self._trace_memory:
+            self.peak_memory = max(
+                self.peak_memory,
+                tracemalloc.get_traced_memory()[1] - current_memory,
+            )
+
+        self.runs += 1
+        self.items += items
+
+        return items
+
+    def report(self) -> dict:
+        return {
+            "runs": self.runs,
+            "items": self.items,
+            "seconds": round(self.seconds, 4),
+            "items_per_sec": round(self.items / self.seconds, 1)
+            if self.seconds else 0.0,
+            "peak_memory_mb": round(self.peak_memory / MB, 2),
+        }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    size = CatalogSize(
+        films=args.films,
+        persons=args.persons,
+        genres=args.genres,
+        cast_size=args.cast_size,
+        genres_per_film=args.genres_per_film,
+    )
+    engine = await create_pg_engine(url=args.pg_url)
+    await create_catalog(engine=engine, size=size, seed=args.seed)
+
+    redis_storage = create_redis_storage()
+    es_client = FakeESClient(latency_sec=args.es_latency_ms / 1000)
+
+    if args.trace_memory:
+        tracemalloc.start()
+
+    try:
+        async with async_sessionmaker(
+            bind=engine, expire_on_commit=False
+        )() as pg_session:
+            stage_classes = [Producer, Enricher, Convertor, Loader]
+
+            if args.fan_out:
+                stage_classes.insert(1, FanOut)
+
+            stages = [
+                MeasuredStage(
+                    stage=stage_cls(redis_storage, pg_session, es_client),
+                    trace_memory=args.trace_memory,
+                )
+                for stage_cls in stage_classes
+            ]
+            producer = stages[0]._stage
+            stage_chain = StageChain(
+                stages=stages,
+                idle_interval_sec=0,
+                has_backlog=producer.has_backlog,
+            )
+
+            passes, start_ = 0, time.perf_counter()
+
+            while passes < args.max_passes:
+                passes += 1
+
+                if not await stage_chain.run_pass(full_pass=True) and (
+                    not await producer.has_backlog()
+                ):
+                    break
+
+            total_seconds = time.perf_counter() - start_
+
+    finally:
+        if args.trace_memory:
+            tracemalloc.stop()
+
+        await redis_storage.close_()
+        await engine.dispose()
+
+    loaded = sum(es_client.bulk_documents.values())
+
+    return {
+        "params": {
+            key_: value
+            for key_, value in vars(args).items()
+            if key_ not in ("json", "baseline")
+        },
+        "records": size.records,
+        "loaded": loaded,
+        "passes": passes,
+        "bulk_requests": es_client.bulk_requests,
+        "total_seconds": round(total_seconds, 4),
+        "records_per_sec": round(size.records / total_seconds, 1),
+        "max_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "stages": {stage.name: stage.report() for stage in stages},
+    }
+
+
+def get_delta(value: float, baseline_value: float) -> str:
+    if not baseline_value:
+        return ""
+
+    return f"{(value - baseline_value) / baseline_value * 100:+.1f}%"
+
+
+def print_report(result: dict, baseline: dict | None) -> None:
+    baseline_stages = (baseline or {}).get("stages", {})
+
+    print(
+        f"records: {result['records']}, loaded: {result['loaded']}, "
+        f"passes: {result['passes']}, bulk requests: "
+        f"{result['bulk_requests']}, max RSS: {result['max_rss_mb']} MB"
+    )
+    print(
+        f"total: {result['total_seconds']} s, "
+        f"{result['records_per_sec']} records/sec "
+        + (
+            get_delta(
+                result["records_per_sec"], baseline["records_per_sec"]
+            )
+            if baseline else ""
+        )
+    )
+    print(
+        f"{'stage':>10} {'runs':>6} {'items':>8} {'seconds':>9} "
+        f"{'share':>7} {'items/sec':>10} {'peak MB':>8} {'vs base':>8}"
+    )
+
+    for name, stage in result["stages"].items():
+        share = stage["seconds"] / result["total_seconds"] * 100
+        delta = get_delta(
+            stage["seconds"],
+            baseline_stages.get(name, {}).get("seconds", 0),
+        )
+        print(
+            f"{name:>10} {stage['runs']:>6} {stage['items']:>8} "
+            f"{stage['seconds']:>9.3f} {share:>6.1f}% "
+            f"{stage['items_per_sec']:>10.1f} "
+            f"{stage['peak_memory_mb']:>8.2f} {delta:>8}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--films", type=int, default=1_000)
+    parser.add_argument("--persons", type=int, default=2_000)
+    parser.add_argument("--genres", type=int, default=20)
+    parser.add_argument("--cast-size", type=int, default=10)
+    parser.add_argument("--genres-per-film", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--pg-url", default=None,
+        help="async SQLAlchemy URL of Postgres (default: SQLite temp file)",
+    )
+    parser.add_argument(
+        "--es-latency-ms", type=float, default=0.0,
+        help="latency of every fake ES request",
+    )
+    parser.add_argument(
+        "--fan-out", action="store_true", help="run FanOut stage too"
+    )
+    parser.add_argument(
+        "--no-trace-memory", dest="trace_memory", action="store_false",
+        help="disable tracemalloc (it slows down the pipeline)",
+    )
+    parser.add_argument("--max-passes", type=int, default=10_000)
+    parser.add_argument(
+        "--select-limit", type=int, default=config.etl_movies_select_limit
+    )
+    parser.add_argument(
+        "--bulk-size", type=int, default=config.etl_movies_bulk_size
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Producer selects with server-side cursor",
+    )
+    parser.add_argument("--codec", default=config.etl_storage_codec)
+    parser.add_argument(
+        "--compression", default=config.etl_storage_compression
+    )
+    parser.add_argument("--json", help="save result to json-file")
+    parser.add_argument("--baseline", help="compare with saved json-file")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    config.etl_movies_select_limit = args.select_limit
+    config.etl_movies_bulk_size = args.bulk_size
+    config.etl_producer_stream_enabled = args.stream
+    config.etl_storage_codec = args.codec
+    config.etl_storage_compression = args.compression
+    config.etl_change_feed_enabled = False
+    config.etl_top_films_enabled = False
+    config.etl_cache_invalidation_enabled = False
+
+    result = asyncio.run(run_benchmark(args=args))
+    baseline = None
+
+    if args.baseline:
+        with open(args.baseline, "r") as fp:
+            baseline = json.load(fp)
+
+    print_report(result=result, baseline=baseline)
+
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(result, fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Локальные замены бэкендов ETL для бенчмарков: fakeredis вместо Redis,
+SQLite (aiosqlite) или произвольный Postgres вместо DB, приемник bulk-запросов
+вместо Elasticsearch.
+"""
+import asyncio
+import os
+import tempfile
+from collections import Counter
+
+import fakeredis.aioredis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from interface.storage.redis_storage import RedisStorage
+from models.movies.pg_models import SchemaContent
+
+__all__ = ["FakeESClient", "create_pg_engine", "create_redis_storage"]
+
+CONTENT_SCHEMA = SchemaContent.__table_args__["schema"]
+
+
+class FakeESClient:
+    """
+    Приемник запросов ES: документы bulk-запросов только считаются, прочие
+    (checkpoint) хранятся. latency_sec - задержка каждого запроса (сеть,
+    индексация).
+    """
+
+    def __init__(self, latency_sec: float = 0.0):
+        self._latency_sec = latency_sec
+        self._documents: dict[tuple[str, str], dict] = {}
+        self.bulk_requests = 0
+        self.bulk_documents: Counter = Counter()
+
+    async def _request(self) -> None:
+        if self._latency_sec:
+            await asyncio.sleep(self._latency_sec)
+
+    async def create_index_with_alias(
+        self, alias: str, body: dict = None
+    ) -> bool:
+        return False
+
+    async def put_mapping(self, index_: str, mappings: dict) -> bool:
+        return True
+
+    async def get_document(self, index_: str, id_: str) -> dict | None:
+        await self._request()
+        return self._documents.get((index_, id_))
+
+    async def insert_document(
+        self, index_: str, document: dict, id_: str = None
+    ) -> dict:
+        await self._request()
+        self._documents[(index_, id_)] = document
+
+        return {"status": True}
+
+    async def insert_documents(
+        self, index_: str, documents: dict[str, dict]
+    ) -> dict:
+        return await self._bulk(index_=index_, documents=documents)
+
+    async def update_documents(
+        self, index_: str, documents: dict[str, dict]
+    ) -> dict:
+        return await self._bulk(index_=index_, documents=documents)
+
+    async def _bulk(self, index_: str, documents: dict[str, dict]) -> dict:
+        await self._request()
+        self.bulk_requests += 1
+        self.bulk_documents[index_] += len(documents)
+
+        return {"status": True, "errors": {}}
+
+
+def create_redis_storage() -> RedisStorage:
+    return RedisStorage(
+        redis_=fakeredis.aioredis.FakeRedis(decode_responses=True)
+    )
+
+
+async def create_pg_engine(url: str | None = None) -> AsyncEngine:
+    """
+    Engine DB бенчмарка. Без url - SQLite во временном файле (отдельные
+    сессии этапов видят одни данные), схема content отображается на схему
+    SQLite по умолчанию. С url (например, локальный Postgres) таблицы
+    создаются в схеме content.
+
+    :param str | None url:
+    :return AsyncEngine:
+    """
+    if url:
+        engine = create_async_engine(url=url)
+
+        async with engine.begin() as connection:
+            await connection.execute(
+                text(f"CREATE SCHEMA IF NOT EXISTS {CONTENT_SCHEMA}")
+            )
+
+        return engine
+
+    fd, path = tempfile.mkstemp(prefix="etl_benchmark_", suffix=".db")
+    os.close(fd)
+
+    return create_async_engine(
+        url=f"sqlite+aiosqlite:///{path}",
+        execution_options={"schema_translate_map": {CONTENT_SCHEMA: None}},
+    )
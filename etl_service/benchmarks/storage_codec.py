@@ -0,0 +1,134 @@
+"""
+Micro-benchmark кодеков Storage (StorageCodec): размер значения и время
+encode/decode для данных каждого этапа ETL (film_work после Producer,
+Enricher и Convertor). legacy - прежний формат (model_dump_json +
+json.loads).
+
+Запуск из каталога etl_service:
+    python benchmarks/storage_codec.py --casts 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from convert_film_work import make_film_work  # noqa: E402
+from interface.storage.codec import StorageCodec  # noqa: E402
+from schemas.movies_schemas.film_work_models import \
+    FilmWorkModel  # noqa: E402
+from transfer.movies.convert_rules import FilmWorkRules  # noqa: E402
+
+CODECS = [
+    ("orjson", None),
+    ("orjson", "lz4"),
+    ("orjson", "zstd"),
+    ("msgpack", None),
+    ("msgpack", "lz4"),
+    ("msgpack", "zstd"),
+]
+
+
+def get_stage_payloads(cast_size: int) -> dict:
+    """Модели, которые этапы ETL сохраняют в Storage."""
+    enriched = make_film_work(cast_size=cast_size)
+    produced = {
+        key_: value
+        for key_, value in enriched.items()
+        if key_ not in ("persons", "genres")
+    }
+
+    return {
+        "producer": FilmWorkModel.model_validate(produced),
+        "enricher": FilmWorkModel.model_validate(enriched),
+        "convertor": asyncio.run(
+            FilmWorkRules.film_work_transformation_data_rule(
+                obj_data=enriched
+            )
+        ),
+    }
+
+
+def timeit(func, number: int) -> float:
+    func()
+    start = time.perf_counter()
+
+    for _ in range(number):
+        func()
+
+    return (time.perf_counter() - start) / number
+
+
+def bench_legacy(model_, number: int) -> tuple[int, float, float]:
+    data = model_.model_dump_json()
+
+    return (
+        len(data.encode()),
+        timeit(model_.model_dump_json, number=number),
+        timeit(lambda: json.loads(data), number=number),
+    )
+
+
+def bench_codec(
+    codec: StorageCodec, model_, number: int
+) -> tuple[int, float, float]:
+    data = codec.encode(value=model_)
+
+    return (
+        len(data),
+        timeit(lambda: codec.encode(value=model_), number=number),
+        timeit(lambda: codec.decode(data=data), number=number),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--casts", type=int, nargs="+", default=[10, 100, 1000]
+    )
+    parser.add_argument(
+        "--budget", type=int, default=100_000,
+        help="persons encoded per cast size (sets the iteration count)",
+    )
+    parser.add_argument(
+        "--compression-min-size", type=int, default=1024,
+        help="min value size for compression, bytes",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'cast':>6} {'stage':>10} {'codec':>14} {'bytes':>9} "
+        f"{'encode us':>10} {'decode us':>10}"
+    )
+    for cast_size in args.casts:
+        number = max(args.budget // max(cast_size, 1), 20)
+
+        for stage, model_ in get_stage_payloads(cast_size=cast_size).items():
+            results = [("legacy", bench_legacy(model_=model_, number=number))]
+
+            for serializer, compression in CODECS:
+                codec = StorageCodec(
+                    serializer=serializer,
+                    compression=compression,
+                    compression_min_size=args.compression_min_size,
+                )
+                results.append((
+                    f"{serializer}+{compression}" if compression
+                    else serializer,
+                    bench_codec(codec=codec, model_=model_, number=number),
+                ))
+
+            for name, (size, encode_, decode_) in results:
+                print(
+                    f"{cast_size:>6} {stage:>10} {name:>14} {size:>9} "
+                    f"{encode_ * 1e6:>10.1f} {decode_ * 1e6:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
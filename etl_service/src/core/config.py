@@ -20,12 +20,22 @@ class Settings(BaseSettings):
     redis_password: str = Field(default="password", alias="REDIS_PASSWORD")
     redis_db_movies: int = Field(default=3, alias="REDIS_ETL_DB_MOVIES")
     redis_db_events: int = Field(default=4, alias="REDIS_ETL_DB_EVENTS")
+    redis_db_movies_reindex: int = Field(
+        default=5, alias="REDIS_ETL_DB_MOVIES_REINDEX"
+    )
+    # БД кеша movies_service: ETL публикует в нее предрасчитанные данные.
+    redis_db_movies_cache: int = Field(
+        default=1, alias="REDIS_MOVIES_CACHE_DB"
+    )
 
     elastic_schema: str = Field(default="film_work", alias="ELASTIC_SCHEME")
     elastic_name: str = Field(default="elastic", alias="ELASTIC_USERNAME")
     elastic_host: str = Field(default="127.0.0.1", alias="ELASTIC_HOST")
     elastic_port: int = Field(default=9200, alias="ELASTIC_PORT")
     elastic_password: str = Field(default="123qwe", alias="ELASTIC_PASSWORD")
+    elastic_connections_per_node: int = Field(
+        default=10, alias="ELASTIC_CONNECTIONS_PER_NODE"
+    )
 
     postgres_driver_name: str = Field(
         default="postgresql+asyncpg", alias="PG_DRIVER_NAME"
@@ -35,14 +45,117 @@ class Settings(BaseSettings):
     postgres_password: str = Field(default="password", alias="PG_PASSWORD")
     postgres_host: str = Field(default="127.0.0.1", alias="PG_HOST")
     postgres_port: int = Field(default=5432, alias="PG_PORT")
+    postgres_pool_size: int = Field(default=10, alias="PG_POOL_SIZE")
+    postgres_max_overflow: int = Field(default=20, alias="PG_MAX_OVERFLOW")
 
-    etl_task_trigger: str = Field(default="interval", alias="ETL_TASK_TRIGGER")
     etl_movies_task_interval_sec: int = Field(
         default=1 * 60, alias="ETL_MOVIES_TASK_INTERVAL_SEC"
     )
     etl_movies_select_limit: int = Field(
         default=1 * 250, alias="ETL_MOVIES_SELECT_LIMIT"
     )
+    etl_movies_bulk_size: int = Field(
+        default=1 * 500, alias="ETL_MOVIES_BULK_SIZE"
+    )
+    etl_stage_concurrency: int = Field(
+        default=0, alias="ETL_STAGE_CONCURRENCY"
+    )
+    etl_producer_stream_enabled: bool = Field(
+        default=False, alias="ETL_PRODUCER_STREAM_ENABLED"
+    )
+    etl_producer_stream_rows: int = Field(
+        default=1_000, alias="ETL_PRODUCER_STREAM_ROWS"
+    )
+    etl_storage_high_watermark: int = Field(
+        default=2_000, alias="ETL_STORAGE_HIGH_WATERMARK"
+    )
+    etl_storage_low_watermark: int = Field(
+        default=500, alias="ETL_STORAGE_LOW_WATERMARK"
+    )
+    etl_storage_codec: str = Field(
+        default="orjson", alias="ETL_STORAGE_CODEC"
+    )
+    etl_storage_compression: str = Field(
+        default="lz4", alias="ETL_STORAGE_COMPRESSION"
+    )
+    etl_storage_compression_min_size: int = Field(
+        default=1024, alias="ETL_STORAGE_COMPRESSION_MIN_SIZE"
+    )
+    etl_skip_unchanged_documents: bool = Field(
+        default=True, alias="ETL_SKIP_UNCHANGED_DOCUMENTS"
+    )
+    etl_checkpoint_enabled: bool = Field(
+        default=True, alias="ETL_CHECKPOINT_ENABLED"
+    )
+    etl_checkpoint_index: str = Field(
+        default="etl_checkpoint", alias="ETL_CHECKPOINT_INDEX"
+    )
+    # Неудачных попыток загрузки (ошибка bulk, повторная выборка) до
+    # исключения сущности из обработки (dead letter).
+    etl_checkpoint_max_attempts: int = Field(
+        default=5, alias="ETL_CHECKPOINT_MAX_ATTEMPTS"
+    )
+    etl_reindex_refresh_interval: str = Field(
+        default="1s", alias="ETL_REINDEX_REFRESH_INTERVAL"
+    )
+    etl_reindex_number_of_replicas: int = Field(
+        default=1, alias="ETL_REINDEX_NUMBER_OF_REPLICAS"
+    )
+
+    etl_top_films_enabled: bool = Field(
+        default=True, alias="ETL_TOP_FILMS_ENABLED"
+    )
+    etl_top_films_size: int = Field(
+        default=1_000, alias="ETL_TOP_FILMS_SIZE"
+    )
+    etl_top_films_max_genres: int = Field(
+        default=500, alias="ETL_TOP_FILMS_MAX_GENRES"
+    )
+    etl_top_films_refresh_interval_sec: int = Field(
+        default=60, alias="ETL_TOP_FILMS_REFRESH_INTERVAL_SEC"
+    )
+
+    # События загрузки документов для сброса кеша movies_service (Redis
+    # stream в redis_db_movies_cache) и примерная длина stream.
+    etl_cache_invalidation_enabled: bool = Field(
+        default=True, alias="ETL_CACHE_INVALIDATION_ENABLED"
+    )
+    etl_cache_events_max_len: int = Field(
+        default=100_000, alias="ETL_CACHE_EVENTS_MAX_LEN"
+    )
+
+    etl_workers_count: int = Field(default=1, alias="ETL_WORKERS_COUNT")
+    etl_shards_count: int = Field(default=1, alias="ETL_SHARDS_COUNT")
+    etl_shard_lease_ttl_sec: int = Field(
+        default=30, alias="ETL_SHARD_LEASE_TTL_SEC"
+    )
+    # Если шардов больше, чем воркеров, воркер уступает шард через
+    # etl_shard_rotate_sec, когда есть шард без lease: шарды обрабатываются
+    # по очереди, а не простаивают.
+    etl_shard_rotate_sec: int = Field(
+        default=300, alias="ETL_SHARD_ROTATE_SEC"
+    )
+
+    etl_metrics_enabled: bool = Field(
+        default=True, alias="ETL_METRICS_ENABLED"
+    )
+    etl_metrics_port: int = Field(default=8000, alias="ETL_METRICS_PORT")
+
+    etl_change_feed_enabled: bool = Field(
+        default=False, alias="ETL_CHANGE_FEED_ENABLED"
+    )
+    etl_change_feed_channel: str = Field(
+        default="etl_movies_changes", alias="ETL_CHANGE_FEED_CHANNEL"
+    )
+    etl_change_feed_install_triggers: bool = Field(
+        default=True, alias="ETL_CHANGE_FEED_INSTALL_TRIGGERS"
+    )
+    etl_change_feed_debounce_sec: float = Field(
+        default=0.5, alias="ETL_CHANGE_FEED_DEBOUNCE_SEC"
+    )
+    etl_change_feed_fallback_interval_sec: int = Field(
+        default=15 * 60, alias="ETL_CHANGE_FEED_FALLBACK_INTERVAL_SEC"
+    )
 
 
 config = Settings()
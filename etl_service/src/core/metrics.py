@@ -0,0 +1,90 @@
+import functools
+import time
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from core import config
+from core.logger import logger
+
+__all__ = [
+    "STAGE_ITEMS",
+    "STAGE_RUN_SECONDS",
+    "STAGING_KEYS",
+    "WATERMARK_LAG_SECONDS",
+    "BULK_ERRORS",
+    "DEAD_LETTERS",
+    "BACKEND_CALL_SECONDS",
+    "BACKEND_CALL_ERRORS",
+    "measure_stage_run",
+    "start_metrics_server",
+]
+
+STAGE_ITEMS = Counter(
+    "etl_stage_items",
+    "Entities processed by ETL stage (items/sec: rate of the counter)",
+    ["stage", "model"],
+)
+STAGE_RUN_SECONDS = Histogram(
+    "etl_stage_run_seconds",
+    "Duration of one ETL stage run",
+    ["stage"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+STAGING_KEYS = Gauge(
+    "etl_staging_keys",
+    "Entities waiting in Storage at the start of ETL stage",
+    ["stage", "model"],
+)
+WATERMARK_LAG_SECONDS = Gauge(
+    "etl_watermark_lag_seconds",
+    "now - modified of the last produced entity (0 when nothing left)",
+    ["model"],
+)
+BULK_ERRORS = Counter(
+    "etl_bulk_errors",
+    "Documents rejected by ES bulk requests",
+    ["index", "action"],
+)
+DEAD_LETTERS = Counter(
+    "etl_dead_letters",
+    "Entities excluded from ETL after etl_checkpoint_max_attempts failures",
+    ["model"],
+)
+BACKEND_CALL_SECONDS = Histogram(
+    "etl_backend_call_seconds",
+    "Duration of Postgres/ES/Redis calls (one attempt)",
+    ["backend", "call"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+BACKEND_CALL_ERRORS = Counter(
+    "etl_backend_call_errors",
+    "Failed (retried) connection attempts to Postgres/ES/Redis",
+    ["backend", "call"],
+)
+
+
+def measure_stage_run(stage: str):
+    """Декоратор run() этапа ETL: длительность прогона этапа."""
+
+    def wrapper(func):
+        @functools.wraps(func)
+        async def wrapped(*args, **kwargs):
+            start_ = time.perf_counter()
+
+            try:
+                return await func(*args, **kwargs)
+
+            finally:
+                STAGE_RUN_SECONDS.labels(stage=stage).observe(
+                    time.perf_counter() - start_
+                )
+
+        return wrapped
+
+    return wrapper
+
+
+def start_metrics_server(port: int) -> None:
+    if config.etl_metrics_enabled:
+        start_http_server(port=port)
+        logger.info(f"metrics: listen on port {port}")
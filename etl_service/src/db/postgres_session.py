@@ -80,8 +80,8 @@ def get_async_engine(url_: str | URL) -> AsyncEngine:
         echo=False,
         pool_pre_ping=True,
         pool_recycle=3600,
-        pool_size=10,
-        max_overflow=20,
+        pool_size=config.postgres_pool_size,
+        max_overflow=config.postgres_max_overflow,
     )
 
 
@@ -0,0 +1,185 @@
+import asyncio
+import contextlib
+import json
+import os
+from collections import defaultdict
+from typing import Awaitable, Callable
+
+import asyncpg
+
+from core import config
+from core.logger import logger
+from interface import RedisStorage_T
+from models.movies.pg_models import (FilmWork, Genre, GenreFilmWork, Person,
+                                     PersonFilmWork)
+from schemas.shard import ShardModel
+from utils import backoff_by_connection
+
+__all__ = ["ChangeFeedListener"]
+
+
+class ChangeFeedListener:
+    """
+    Слушатель change feed Postgres (триггеры + LISTEN/NOTIFY). Складывает id
+    измененных сущностей в Storage и запускает ETL-конвейер, не дожидаясь
+    очередного интервала планировщика.
+    """
+
+    SQL_PATH = ("models", "movies", "pg_sql", "change_feed.sql")
+    CHANGED_KEY_TEMPLATE = "changed:{model_name}"
+
+    # Таблица DB -> (модель, поле payload с id сущности модели).
+    TABLE_RULES = {
+        FilmWork.model_name(): ((FilmWork, "id"),),
+        Person.model_name(): ((Person, "id"),),
+        Genre.model_name(): ((Genre, "id"),),
+        PersonFilmWork.model_name(): (
+            (FilmWork, "film_work_id"),
+            (Person, "person_id"),
+        ),
+        GenreFilmWork.model_name(): ((FilmWork, "film_work_id"),),
+    }
+
+    def __init__(
+        self,
+        redis_storage: RedisStorage_T,
+        on_change: Callable[[], Awaitable[None]],
+        shard: ShardModel | None = None,
+    ) -> None:
+        self._redis_storage: RedisStorage_T = redis_storage
+        self._on_change = on_change
+        # Уведомления получают все воркеры: каждый берет id своего шарда.
+        self._shard = shard or ShardModel()
+        self._connection: asyncpg.Connection | None = None
+        self._pending: dict[str, set[str]] = defaultdict(set)
+        self._flush_task: asyncio.Task | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopped = False
+
+    @classmethod
+    def get_changed_key(cls, model_name: str) -> str:
+        return cls.CHANGED_KEY_TEMPLATE.format(model_name=model_name)
+
+    async def start(self) -> None:
+        self._stopped = False
+        await self._connect()
+
+        logger.info(
+            f"change feed: listen channel '{config.etl_change_feed_channel}'"
+        )
+
+    async def stop(self) -> None:
+        """
+        Остановка: закрытие соединения не должно вызывать переподключение
+        (asyncpg вызывает termination listener и при штатном close).
+        """
+        self._stopped = True
+
+        for task_ in (self._reconnect_task, self._flush_task):
+            if task_ and not task_.done():
+                task_.cancel()
+
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task_
+
+        self._reconnect_task = self._flush_task = None
+
+        if self._connection and not self._connection.is_closed():
+            self._connection.remove_termination_listener(
+                self._on_termination
+            )
+            await self._connection.close()
+
+    @backoff_by_connection(
+        exceptions=(OSError, asyncpg.PostgresConnectionError),
+        backend="postgres",
+    )
+    async def _connect(self) -> None:
+        self._connection = await asyncpg.connect(
+            host=config.postgres_host,
+            port=config.postgres_port,
+            user=config.postgres_user,
+            password=config.postgres_password,
+            database=config.postgres_db,
+        )
+
+        if self._stopped:
+            await self._connection.close()
+            return
+
+        # Триггеры устанавливает только один воркер (шард 0).
+        if config.etl_change_feed_install_triggers and self._shard.number == 0:
+            await self._connection.execute(self._get_sql())
+
+        await self._connection.add_listener(
+            config.etl_change_feed_channel, self._on_notify
+        )
+        self._connection.add_termination_listener(self._on_termination)
+
+    def _get_sql(self) -> str:
+        with open(os.path.join(config.base_dir, *self.SQL_PATH), "r") as fp:
+            return fp.read().replace(
+                "{channel}", config.etl_change_feed_channel
+            )
+
+    def _on_termination(self, connection: asyncpg.Connection) -> None:
+        """
+        Соединение потеряно: переподключаемся. Изменения, пришедшие за время
+        простоя, будут подхвачены резервным опросом по watermark.
+        """
+        if self._stopped:
+            return
+
+        logger.warning("change feed: connection lost, reconnect")
+        self._reconnect_task = asyncio.create_task(self._connect())
+
+    def _on_notify(
+        self,
+        connection: asyncpg.Connection,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        if self._stopped:
+            return
+
+        try:
+            change = json.loads(payload)
+
+        except json.JSONDecodeError as ex:
+            logger.error(f"change feed: not correct payload({payload}): {ex}")
+            return
+
+        for model_, field_ in self.TABLE_RULES.get(change.get("table"), ()):
+            if (obj_id := change.get(field_)) and self._shard.owns(id_=obj_id):
+                self._pending[model_.model_name()].add(obj_id)
+
+        if self._pending and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        """
+        Пачками (с debounce) переносит id в Storage и запускает конвейер.
+        Уведомления, пришедшие во время работы конвейера, обрабатываются
+        следующей итерацией.
+
+        :return None:
+        """
+        while self._pending:
+            await asyncio.sleep(config.etl_change_feed_debounce_sec)
+            pending, self._pending = self._pending, defaultdict(set)
+
+            for model_name, ids in pending.items():
+                await self._redis_storage.sadd_(
+                    name=self.get_changed_key(model_name=model_name),
+                    values=list(ids),
+                )
+                logger.debug(f"change feed: {model_name}, ids({len(ids)})")
+
+            try:
+                await self._on_change()
+
+            except Exception as ex:
+                logger.error(f"change feed: error run ETL-stages: {ex}")
@@ -0,0 +1,187 @@
+from core import config
+from core.logger import logger
+from core.metrics import DEAD_LETTERS
+from interface import ESClient_T, RedisStorage_T
+from schemas.shard import ShardModel
+from schemas.watermark import CheckpointBatchModel, WatermarkModel
+
+__all__ = ["Checkpoint"]
+
+
+class Checkpoint:
+    """
+    Контрольная точка (crash-safe watermark) модели. Каждая выборка
+    Producer - пачка: id сущностей и watermark после последней из них. Пачка
+    и ее неподтвержденные id сохраняются в Storage одной транзакцией с
+    сущностями, Loader подтверждает id после ответа bulk-запроса ES (той же
+    транзакцией, что и очистка Storage). Checkpoint - watermark последней
+    пачки из непрерывного префикса подтвержденных пачек - хранится в ES
+    рядом с данными и переживает потерю Storage. Неподтвержденные id, которых
+    уже нет в Storage, выбираются из DB повторно (replay только этих id).
+
+    Неудачные попытки (ошибка bulk в Loader, повторная выборка) считаются
+    по id; после etl_checkpoint_max_attempts попыток id исключается из
+    обработки (dead letter): подтверждается, пишется в лог и учитывается в
+    метрике DEAD_LETTERS, чтобы один документ не останавливал checkpoint.
+    """
+
+    BATCHES_KEY_TEMPLATE = "batches:{model_name}"
+    PENDING_KEY_TEMPLATE = "pending:{model_name}"
+    ATTEMPTS_KEY_TEMPLATE = "attempts:{model_name}"
+
+    def __init__(
+        self,
+        redis_storage: RedisStorage_T,
+        es_client: ESClient_T,
+        model_name: str,
+        shard: ShardModel | None = None,
+    ):
+        self._redis_storage: RedisStorage_T = redis_storage
+        self._es_client: ESClient_T = es_client
+        self._model_name = model_name
+        self._document_id = (
+            f"{shard.namespace}{model_name}" if shard else model_name
+        )
+
+    @classmethod
+    def get_batches_key(cls, model_name: str) -> str:
+        """Очередь пачек модели, ожидающих подтверждения."""
+        return cls.BATCHES_KEY_TEMPLATE.format(model_name=model_name)
+
+    @classmethod
+    def get_pending_key(cls, model_name: str) -> str:
+        """Hash неподтвержденных id сущностей модели."""
+        return cls.PENDING_KEY_TEMPLATE.format(model_name=model_name)
+
+    @classmethod
+    def get_attempts_key(cls, model_name: str) -> str:
+        """Hash количества неудачных попыток по id сущностей модели."""
+        return cls.ATTEMPTS_KEY_TEMPLATE.format(model_name=model_name)
+
+    @property
+    def batches_key(self) -> str:
+        return self.get_batches_key(model_name=self._model_name)
+
+    @property
+    def pending_key(self) -> str:
+        return self.get_pending_key(model_name=self._model_name)
+
+    @property
+    def attempts_key(self) -> str:
+        return self.get_attempts_key(model_name=self._model_name)
+
+    @staticmethod
+    def new_batch(ids: list[str], watermark: WatermarkModel) -> str:
+        return CheckpointBatchModel(
+            ids=ids, watermark=watermark
+        ).model_dump_json()
+
+    async def get_(self) -> WatermarkModel | None:
+        if document := await self._es_client.get_document(
+            index_=config.etl_checkpoint_index, id_=self._document_id
+        ):
+            return WatermarkModel.model_validate(document)
+
+    async def commit_(self) -> list[str]:
+        """
+        Сдвиг checkpoint на последнюю пачку непрерывного префикса
+        подтвержденных пачек и поиск потерянных сущностей первой
+        неподтвержденной пачки (просмотр очереди на ней заканчивается).
+
+        :return list[str]: неподтвержденные id, которых нет в Storage.
+        """
+        committed, done_ids, lost_ids = None, [], []
+        staged_key = self._redis_storage.get_staged_key(
+            model_name=self._model_name
+        )
+
+        for batch_data in await self._redis_storage.lrange_(
+            name=self.batches_key
+        ):
+            batch = CheckpointBatchModel.model_validate_json(batch_data)
+            pending_ids = [
+                id_
+                for id_, is_pending in zip(
+                    batch.ids,
+                    await self._redis_storage.hmget_(
+                        name=self.pending_key, keys=batch.ids
+                    ),
+                )
+                if is_pending
+            ]
+
+            if not pending_ids:
+                committed = batch.watermark
+                done_ids.append(batch.ids)
+
+                continue
+
+            lost_ids = [
+                id_
+                for id_, is_staged in zip(
+                    pending_ids,
+                    await self._redis_storage.smismember_(
+                        name=staged_key, values=pending_ids
+                    ),
+                )
+                if not is_staged
+            ]
+            break
+
+        if committed:
+            # Сначала checkpoint, затем очередь: повтор после сбоя безопасен.
+            await self._es_client.insert_document(
+                index_=config.etl_checkpoint_index,
+                document=committed.model_dump(mode="json"),
+                id_=self._document_id,
+            )
+            await self._redis_storage.lpop_(
+                name=self.batches_key, count=len(done_ids)
+            )
+            await self._redis_storage.hdel_(
+                name=self.attempts_key,
+                keys=[id_ for ids in done_ids for id_ in ids],
+            )
+            logger.debug(
+                f"{self._model_name}: checkpoint was commit "
+                f"({committed.model_dump_json()}, batches: {len(done_ids)})"
+            )
+
+        return lost_ids
+
+    async def ack_(self, ids: list[str]) -> None:
+        """Подтверждение id без загрузки (например, сущность удалена в DB)."""
+        await self._redis_storage.hdel_(name=self.pending_key, keys=ids)
+
+    async def fail_(self, ids: list[str]) -> list[str]:
+        """
+        Учет неудачной попытки обработки id.
+
+        :param list[str] ids:
+        :return list[str]: id, исчерпавшие etl_checkpoint_max_attempts
+        (их следует исключить из обработки: dead_letter_).
+        """
+        return [
+            id_
+            for id_, attempts in zip(
+                ids,
+                await self._redis_storage.hincrby_(
+                    name=self.attempts_key, keys=ids
+                ),
+            )
+            if attempts >= config.etl_checkpoint_max_attempts
+        ]
+
+    async def dead_letter_(self, ids: list[str]) -> None:
+        """Исключение id из обработки: подтверждение без загрузки."""
+        if not ids:
+            return
+
+        await self.ack_(ids=ids)
+        await self._redis_storage.hdel_(name=self.attempts_key, keys=ids)
+        DEAD_LETTERS.labels(model=self._model_name).inc(len(ids))
+        logger.error(
+            f"{self._model_name}: ids({len(ids)}) failed "
+            f"{config.etl_checkpoint_max_attempts} attempts and was excluded "
+            f"from ETL (dead letter): {ids}"
+        )
@@ -1,4 +1,5 @@
 import socket
+from uuid import UUID
 
 from sqlalchemy import select
 
@@ -13,10 +14,11 @@ class FilmWorkRules:
 
     @classmethod
     @backoff_by_connection(
-        exceptions=(ConnectionRefusedError, socket.gaierror)
+        exceptions=(ConnectionRefusedError, socket.gaierror),
+        backend="postgres",
     )
     async def film_work_selection_data_rule(
-        cls, pg_session, obj_id: int
+        cls, pg_session, obj_id: UUID
     ) -> dict:
         query_person = await pg_session.execute(
             select(
@@ -36,6 +38,7 @@ class FilmWorkRules:
             .where(
                 FilmWork.id == obj_id,
             )
+            .order_by(Person.full_name, Person.id)
         )
 
         query_genre = await pg_session.execute(
@@ -56,6 +59,7 @@ class FilmWorkRules:
             .where(
                 FilmWork.id == obj_id,
             )
+            .order_by(Genre.name, Genre.id)
         )
 
         film_works_data = {
@@ -65,6 +69,142 @@ class FilmWorkRules:
 
         return film_works_data
 
+    @classmethod
+    @backoff_by_connection(
+        exceptions=(ConnectionRefusedError, socket.gaierror),
+        backend="postgres",
+    )
+    async def film_works_ids_by_person_rule(
+        cls, pg_session, person_ids: list[UUID]
+    ) -> list[UUID]:
+        query_ = await pg_session.scalars(
+            select(PersonFilmWork.film_work_id)
+            .where(PersonFilmWork.person_id.in_(person_ids))
+            .distinct()
+        )
+
+        return query_.all()
+
+    @classmethod
+    @backoff_by_connection(
+        exceptions=(ConnectionRefusedError, socket.gaierror),
+        backend="postgres",
+    )
+    async def film_works_ids_by_genre_rule(
+        cls, pg_session, genre_ids: list[UUID]
+    ) -> list[UUID]:
+        query_ = await pg_session.scalars(
+            select(GenreFilmWork.film_work_id)
+            .where(GenreFilmWork.genre_id.in_(genre_ids))
+            .distinct()
+        )
+
+        return query_.all()
+
+    @classmethod
+    @backoff_by_connection(
+        exceptions=(ConnectionRefusedError, socket.gaierror),
+        backend="postgres",
+    )
+    async def film_works_selection_data_rule(
+        cls, pg_session, obj_ids: list[UUID]
+    ) -> dict[UUID, dict]:
+        """
+        Пакетная выборка персон и жанров для списка кинопроизведений (два
+        запроса на весь список вместо двух запросов на каждый объект).
+
+        :param pg_session:
+        :param list[UUID] obj_ids:
+        :return dict[UUID, dict]: данные в формате
+        film_work_selection_data_rule, сгруппированные по id.
+        """
+        query_person = await pg_session.execute(
+            select(
+                PersonFilmWork.film_work_id.label("film_work_id"),
+                PersonFilmWork.role.label("person_role"),
+                Person.id.label("person_id"),
+                Person.full_name.label("person_full_name"),
+            )
+            .join(
+                Person,
+                PersonFilmWork.person_id == Person.id,
+            )
+            .where(
+                PersonFilmWork.film_work_id.in_(obj_ids),
+            )
+            .order_by(Person.full_name, Person.id)
+        )
+
+        query_genre = await pg_session.execute(
+            select(
+                GenreFilmWork.film_work_id.label("film_work_id"),
+                Genre.id.label("genre_id"),
+                Genre.name.label("genre_name"),
+                Genre.description.label("genre_description"),
+            )
+            .join(
+                Genre,
+                GenreFilmWork.genre_id == Genre.id,
+            )
+            .where(
+                GenreFilmWork.film_work_id.in_(obj_ids),
+            )
+            .order_by(Genre.name, Genre.id)
+        )
+
+        film_works_data = {
+            obj_id: {Person.model_name(): [], Genre.model_name(): []}
+            for obj_id in obj_ids
+        }
+
+        for person_data in query_person.all():
+            film_works_data[person_data.film_work_id][
+                Person.model_name()
+            ].append(person_data)
+
+        for genre_data in query_genre.all():
+            film_works_data[genre_data.film_work_id][
+                Genre.model_name()
+            ].append(genre_data)
+
+        return film_works_data
+
+    @classmethod
+    def film_work_normalized_persons_rule(
+        cls, selection_data: dict
+    ) -> list[PersonModel]:
+        return [
+            PersonModel(
+                id=person_data.person_id,
+                film_work_id=person_data.film_work_id,
+                full_name=(
+                    person_data.person_full_name
+                    if person_data.person_full_name
+                    else ""
+                ),
+                role=person_data.person_role,
+            )
+            for person_data in selection_data.get(Person.model_name()) or []
+        ]
+
+    @classmethod
+    def film_work_normalized_genres_rule(
+        cls, selection_data: dict
+    ) -> list[GenreModel]:
+        return [
+            GenreModel(
+                id=genre_data.genre_id,
+                film_work_id=genre_data.film_work_id,
+                name=genre_data.genre_name,
+                description=(
+                    genre_data.genre_description
+                    if genre_data.genre_description
+                    else ""
+                ),
+            )
+            for genre_data in selection_data.get(Genre.model_name()) or []
+        ]
+
     @classmethod
     async def film_work_normalized_enrich_data_rule(
         cls, obj_data: dict, selection_data: dict
@@ -72,34 +212,14 @@ class FilmWorkRules:
         film_work_data = FilmWorkModel(**obj_data)
         film_work_data.was_enrich = True
 
-        if persons_data := selection_data.get(Person.model_name()):
-            film_work_data.persons = [
-                PersonModel(
-                    id=person_data.person_id,
-                    film_work_id=person_data.film_work_id,
-                    full_name=(
-                        person_data.person_full_name
-                        if person_data.person_full_name
-                        else ""
-                    ),
-                    role=person_data.person_role,
-                )
-                for person_data in persons_data
-            ]
-
-        if genres_data := selection_data.get(Genre.model_name()):
-            film_work_data.genres = [
-                GenreModel(
-                    id=genre_data.genre_id,
-                    film_work_id=genre_data.film_work_id,
-                    name=genre_data.genre_name,
-                    description=(
-                        genre_data.genre_description
-                        if genre_data.genre_description
-                        else ""
-                    ),
-                )
-                for genre_data in genres_data
-            ]
+        if persons_data := cls.film_work_normalized_persons_rule(
+            selection_data=selection_data
+        ):
+            film_work_data.persons = persons_data
+
+        if genres_data := cls.film_work_normalized_genres_rule(
+            selection_data=selection_data
+        ):
+            film_work_data.genres = genres_data
 
         return film_work_data
@@ -1,5 +1,6 @@
 import socket
 from collections import defaultdict
+from uuid import UUID
 
 from sqlalchemy import select
 
@@ -12,18 +13,21 @@ class PersonRules:
 
     @classmethod
     @backoff_by_connection(
-        exceptions=(ConnectionRefusedError, socket.gaierror)
+        exceptions=(ConnectionRefusedError, socket.gaierror),
+        backend="postgres",
     )
     async def person_selection_data_rule(
-        cls, pg_session, obj_id: int
+        cls, pg_session, obj_id: UUID
     ) -> dict:
         query_person_film_work = await pg_session.execute(
             select(
                 PersonFilmWork.film_work_id.label("film_work_id"),
                 PersonFilmWork.role.label("person_role"),
-            ).where(
+            )
+            .where(
                 PersonFilmWork.person_id == obj_id,
             )
+            .order_by(PersonFilmWork.film_work_id, PersonFilmWork.role)
         )
 
         persons_data = {
@@ -1,11 +1,17 @@
-import json
+from uuid import UUID
 
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from core import config
 from core.logger import logger
+from core.metrics import STAGE_ITEMS, STAGING_KEYS, measure_stage_run
 from extract.movies.enrich_rules import FilmWorkRules, PersonRules
 from interface import ESClient_T, RedisStorage_T
 from models.movies.pg_models import Base as BaseModel
 from models.movies.pg_models import FilmWork, Person
 from schemas import Base as BaseSchema
+from utils.concurrency import (get_stage_concurrency, run_bounded,
+                               split_batches)
 from utils.movies_utils.etl_enum import RuleTypes
 
 
@@ -25,6 +31,11 @@ class Enricher:
         self._redis_storage: RedisStorage_T = redis_storage
         self._pg_session = pg_session
         self._es_client: ESClient_T = es_client
+        self._pg_session_factory: async_sessionmaker | None = None
+        # Пачки обогащаются конкурентно, каждая в своей сессии из пула.
+        self._concurrency = get_stage_concurrency(
+            pool_size=config.postgres_pool_size
+        )
 
     @property
     def redis_storage(self) -> RedisStorage_T:
@@ -34,6 +45,16 @@ class Enricher:
     def pg_session(self):
         return self._pg_session
 
+    @property
+    def pg_session_factory(self) -> async_sessionmaker:
+        """Фабрика отдельных сессий на том же engine (пуле), что pg_session."""
+        if not self._pg_session_factory:
+            self._pg_session_factory = async_sessionmaker(
+                bind=self.pg_session.bind, expire_on_commit=False
+            )
+
+        return self._pg_session_factory
+
     @property
     def model_rules(self) -> dict:
         return {
@@ -55,7 +76,8 @@ class Enricher:
     def get_key_of_rule(model_: BaseModel) -> str:
         return model_.model_name()
 
-    async def run(self) -> None:
+    @measure_stage_run(stage="enricher")
+    async def run(self) -> int:
         """
         Точка запуска. Этапы:
         - Получение правил для выборки и нормализации сущностей-связок по
@@ -65,24 +87,77 @@ class Enricher:
         - Связка базовой сущности с сущностями-связками.
         - Сохранение данных в Storage.
 
-        :return None:
+        Сущности разбиваются на пачки, которые обрабатываются конкурентно
+        (не больше лимита по размеру пула соединений DB), каждая пачка в
+        отдельной сессии.
+
+        :return int: количество обработанных сущностей.
         """
-        for model_, rules in self.model_rules.items():
-            enrich_count = 0
-            selection_rule, enrich_rule = (
-                rules[RuleTypes.SELECTION_RULE.value],
-                rules[RuleTypes.ENRICH_RULE.value],
-            )
+        enrich_total = 0
 
+        for model_, rules in self.model_rules.items():
             key_rule = self.get_key_of_rule(model_=model_)
             scan_lst = await self.redis_storage.scan_iter(f"{key_rule}_*")
+            STAGING_KEYS.labels(stage="enricher", model=key_rule).set(
+                len(scan_lst)
+            )
 
             if scan_lst:
                 logger.info(
                     f"{key_rule}: start enrich(count: {len(scan_lst)})"
                 )
 
-            for obj_key_rule in scan_lst:
+            enrich_count = sum(
+                await run_bounded(
+                    coros=[
+                        self._enrich_batch(
+                            key_rule=key_rule,
+                            obj_key_rules=obj_key_rules,
+                            selection_rule=rules[
+                                RuleTypes.SELECTION_RULE.value
+                            ],
+                            enrich_rule=rules[RuleTypes.ENRICH_RULE.value],
+                        )
+                        for obj_key_rules in split_batches(
+                            items=scan_lst,
+                            concurrency=self._concurrency,
+                            max_size=config.etl_movies_select_limit,
+                        )
+                    ],
+                    limit=self._concurrency,
+                )
+            )
+
+            enrich_total += enrich_count
+            STAGE_ITEMS.labels(stage="enricher", model=key_rule).inc(
+                enrich_count
+            )
+            logger.info(
+                f"{key_rule}: was enrich({enrich_count} from {len(scan_lst)})"
+            )
+
+        return enrich_total
+
+    async def _enrich_batch(
+        self,
+        key_rule: str,
+        obj_key_rules: list[str],
+        selection_rule,
+        enrich_rule,
+    ) -> int:
+        """
+        Обогащение пачки сущностей в отдельной сессии DB.
+
+        :param str key_rule:
+        :param list[str] obj_key_rules:
+        :param selection_rule:
+        :param enrich_rule:
+        :return int: количество обогащенных сущностей.
+        """
+        enrich_count = 0
+
+        async with self.pg_session_factory() as pg_session:
+            for obj_key_rule in obj_key_rules:
                 obj_ = await self._get_object_data_by_key_rule(
                     obj_key_rule=obj_key_rule
                 )
@@ -90,10 +165,10 @@ class Enricher:
                 if obj_ and not obj_.get("was_enrich") and not obj_.get(
                         "was_convert"
                 ):
-                    obj_id = obj_key_rule.split(f"{key_rule}_")[-1]
+                    obj_id = UUID(obj_key_rule.split(f"{key_rule}_")[-1])
 
                     selection_data = await selection_rule(
-                        pg_session=self.pg_session, obj_id=obj_id
+                        pg_session=pg_session, obj_id=obj_id
                     )
                     enriched_data = await enrich_rule(
                         obj_data=obj_, selection_data=selection_data
@@ -105,21 +180,14 @@ class Enricher:
                     enrich_count += self.CONCAT
                     logger.debug(f"{key_rule}: id={obj_id} was enrich")
 
-            logger.info(
-                f"{key_rule}: was enrich({enrich_count} from {len(scan_lst)})"
-            )
+        return enrich_count
 
     async def _get_object_data_by_key_rule(self, obj_key_rule: str) -> dict:
-        if obj_data := await self.redis_storage.retrieve_state(
-                key_=obj_key_rule
-        ):
-            obj_deserialize_data = json.loads(obj_data)
-
-            return obj_deserialize_data
+        return await self.redis_storage.retrieve_state(key_=obj_key_rule)
 
     async def _save_enrich_data(
             self, obj_key_rule: str, enriched_data: BaseSchema
     ):
         await self.redis_storage.save_state(
-            key_=obj_key_rule, value=enriched_data.model_dump_json()
+            key_=obj_key_rule, value=enriched_data
         )
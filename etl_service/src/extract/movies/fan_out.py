@@ -0,0 +1,178 @@
+from uuid import UUID
+
+from core import config
+from core.logger import logger
+from core.metrics import STAGE_ITEMS, measure_stage_run
+from extract.movies.enrich_rules import FilmWorkRules as FilmWorkEnrichRules
+from interface import ESClient_T, RedisStorage_T
+from loader.movies_cache import CacheEvents
+from loader.movies_loader import Loader
+from models.movies.pg_models import Base as BaseModel
+from models.movies.pg_models import FilmWork, Genre, Person
+from transfer.movies.convert_rules import \
+    FilmWorkRules as FilmWorkConvertRules
+
+
+class FanOut:
+    """
+    Класс по распространению изменений персон и жанров на документы
+    film_work, в которых они денормализованы (actors_names, genres, ...).
+    Затронутые кинопроизведения определяются пакетно через связующие
+    таблицы и обновляются в ES частично (bulk _update). Id обновленных
+    документов публикуются для сброса кеша movies_service (CacheEvents).
+    """
+
+    FAN_OUT_KEY_TEMPLATE = "fan_out:{model_name}"
+
+    def __init__(
+        self,
+        redis_storage: RedisStorage_T,
+        pg_session,
+        es_client: ESClient_T,
+    ):
+        self._redis_storage: RedisStorage_T = redis_storage
+        self._pg_session = pg_session
+        self._es_client: ESClient_T = es_client
+        self._cache_events = (
+            CacheEvents(es_client=es_client)
+            if config.etl_cache_invalidation_enabled
+            else None
+        )
+
+    async def close(self) -> None:
+        """Закрытие клиента Redis кеша movies_service."""
+        if self._cache_events:
+            await self._cache_events.close()
+
+    @property
+    def redis_storage(self) -> RedisStorage_T:
+        return self._redis_storage
+
+    @property
+    def pg_session(self):
+        return self._pg_session
+
+    @property
+    def model_rules(self) -> dict:
+        return {
+            Person: FilmWorkEnrichRules.film_works_ids_by_person_rule,
+            Genre: FilmWorkEnrichRules.film_works_ids_by_genre_rule,
+        }
+
+    @classmethod
+    def get_fan_out_key(cls, model_: BaseModel) -> str:
+        return cls.FAN_OUT_KEY_TEMPLATE.format(model_name=model_.model_name())
+
+    @measure_stage_run(stage="fan_out")
+    async def run(self) -> int:
+        """
+        Точка запуска. Этапы:
+        - Получение из Storage id измененных персон и жанров.
+        - Определение id затронутых кинопроизведений (один запрос на пачку).
+        - Пакетная выборка персон и жанров затронутых кинопроизведений.
+        - Частичное обновление документов film_work в ES.
+        - Публикация событий сброса кеша movies_service.
+        - Удаление id из Storage только после успешного обновления: при
+        ошибке ES изменения повторяются следующим запуском.
+
+        :return int: количество обновленных документов film_work.
+        """
+        limit, update_count = config.etl_movies_select_limit, 0
+
+        for model_, film_works_ids_rule in self.model_rules.items():
+            fan_out_key = self.get_fan_out_key(model_=model_)
+
+            while ids := await self.redis_storage.srandmember_(
+                name=fan_out_key, count=limit
+            ):
+                film_work_ids = await film_works_ids_rule(
+                    self.pg_session, [UUID(id_) for id_ in ids]
+                )
+                logger.info(
+                    f"{model_.model_name()}: fan out {len(ids)} changes to "
+                    f"{FilmWork.model_name()}(count: {len(film_work_ids)})"
+                )
+                is_updated = True
+
+                for i in range(0, len(film_work_ids), limit):
+                    count_, is_updated_ = await self._update_film_works(
+                        film_work_ids=film_work_ids[i:i + limit]
+                    )
+                    update_count += count_
+                    is_updated = is_updated and is_updated_
+
+                if not is_updated:
+                    # id остаются в Storage до следующего запуска.
+                    break
+
+                await self.redis_storage.srem_(name=fan_out_key, values=ids)
+
+        if self._cache_events:
+            await self._cache_events.publish()
+
+        return update_count
+
+    async def _update_film_works(
+        self, film_work_ids: list[UUID]
+    ) -> tuple[int, bool]:
+        """
+        :param list[UUID] film_work_ids:
+        :return tuple[int, bool]: количество обновленных документов и
+        признак обновления без ошибок.
+        """
+        key_rule = FilmWork.model_name()
+        selection_data = (
+            await FilmWorkEnrichRules.film_works_selection_data_rule(
+                pg_session=self.pg_session, obj_ids=film_work_ids
+            )
+        )
+
+        documents = {
+            str(film_work_id): FilmWorkConvertRules
+            .film_work_denormalized_data_rule(
+                persons=[
+                    person.model_dump(mode="json")
+                    for person in FilmWorkEnrichRules
+                    .film_work_normalized_persons_rule(
+                        selection_data=film_work_data
+                    )
+                ],
+                genres=[
+                    genre.model_dump(mode="json")
+                    for genre in FilmWorkEnrichRules
+                    .film_work_normalized_genres_rule(
+                        selection_data=film_work_data
+                    )
+                ],
+            )
+            for film_work_id, film_work_data in selection_data.items()
+        }
+
+        result_ = await self._es_client.update_documents(
+            index_=key_rule, documents=documents
+        )
+        # Документы изменены частично: хэш полной загрузки неактуален.
+        await self.redis_storage.shared().hdel_(
+            name=Loader.get_content_hash_key(model_name=key_rule),
+            keys=list(documents),
+        )
+
+        if result_.get("status") is False:
+            logger.error(
+                f"{key_rule}: error partial update data in ES: "
+                f"{result_.get('errors')}"
+            )
+
+            return 0, False
+
+        if self._cache_events:
+            self._cache_events.add(index_=key_rule, documents=documents)
+
+        STAGE_ITEMS.labels(stage="fan_out", model=key_rule).inc(
+            len(documents)
+        )
+        logger.debug(
+            f"{key_rule}: ids({len(documents)}) was partial update in ES"
+        )
+
+        return len(documents), True
@@ -1,16 +1,30 @@
+import contextlib
 import socket
+import time
 from datetime import datetime
+from typing import Sequence
+from uuid import UUID
 
+from pydantic import ValidationError
 from sqlalchemy import select
 
+from core import config
 from core.logger import logger
+from core.metrics import (STAGE_ITEMS, WATERMARK_LAG_SECONDS,
+                          measure_stage_run)
+from extract.movies.change_feed import ChangeFeedListener
+from extract.movies.checkpoint import Checkpoint
+from extract.movies.fan_out import FanOut
 from extract.movies.producer_rules import (FilmWorkRules, GenreRules,
                                            PersonRules)
 from interface import ESClient_T, RedisStorage_T, check_free_size_storage
 from models.movies.pg_models import (BaseWithTimeStampedType, FilmWork, Genre,
                                      Person)
 from schemas import Base as BaseSchema
-from utils import EntitiesNotFoundInDBError, backoff_by_connection
+from schemas.shard import ShardModel
+from schemas.watermark import WatermarkModel
+from utils import (EntitiesNotFoundInDBError, StorageIsFullError,
+                   backoff_by_connection)
 from utils.movies_utils.etl_enum import RuleTypes
 
 
@@ -18,16 +32,38 @@ class Producer:
     """Класс по получению данных базовых сущностей из DB."""
 
     DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+    # Модели, изменения которых распространяются на документы film_work.
+    FAN_OUT_MODELS = (Person, Genre)
 
     def __init__(
         self,
         redis_storage: RedisStorage_T,
         pg_session,
         es_client: ESClient_T,
+        force_poll: bool = False,
+        shard: ShardModel | None = None,
+        stream: bool | None = None,
+        checkpoint: bool | None = None,
     ):
         self._redis_storage: RedisStorage_T = redis_storage
         self._pg_session = pg_session
         self._es_client: ESClient_T = es_client
+        # Опрос по watermark при каждом запуске (например, для пересборки).
+        self._force_poll = force_poll
+        # Шард воркера: выбираются только сущности с hash(id) из шарда.
+        self._shard = shard
+        # Выборка по watermark server-side курсором (полная выгрузка).
+        self._stream = (
+            config.etl_producer_stream_enabled if stream is None else stream
+        )
+        # Watermark фиксируется в checkpoint только после загрузки в ES.
+        self._checkpoint_enabled = (
+            config.etl_checkpoint_enabled if checkpoint is None
+            else checkpoint
+        )
+        self._last_poll_at: float | None = None
+        # Модели, запись которых приостановлена backpressure Storage.
+        self.throttled_models: set[str] = set()
 
     @property
     def redis_storage(self) -> RedisStorage_T:
@@ -43,18 +79,30 @@ class Producer:
             FilmWork: {
                 RuleTypes.SELECTION_RULE.value:
                     FilmWorkRules.film_work_selection_data_rule,
+                RuleTypes.STREAM_SELECTION_RULE.value:
+                    FilmWorkRules.film_work_stream_selection_data_rule,
+                RuleTypes.SELECTION_BY_IDS_RULE.value:
+                    FilmWorkRules.film_work_selection_by_ids_data_rule,
                 RuleTypes.NORMALIZE_RULE.value:
                     FilmWorkRules.film_work_normalize_data_rule,
             },
             Person: {
                 RuleTypes.SELECTION_RULE.value:
                     PersonRules.person_selection_data_rule,
+                RuleTypes.STREAM_SELECTION_RULE.value:
+                    PersonRules.person_stream_selection_data_rule,
+                RuleTypes.SELECTION_BY_IDS_RULE.value:
+                    PersonRules.person_selection_by_ids_data_rule,
                 RuleTypes.NORMALIZE_RULE.value:
                     PersonRules.person_normalize_data_rule,
             },
             Genre: {
                 RuleTypes.SELECTION_RULE.value:
                     GenreRules.genre_selection_data_rule,
+                RuleTypes.STREAM_SELECTION_RULE.value:
+                    GenreRules.genre_stream_selection_data_rule,
+                RuleTypes.SELECTION_BY_IDS_RULE.value:
+                    GenreRules.genre_selection_by_ids_data_rule,
                 RuleTypes.NORMALIZE_RULE.value:
                     GenreRules.genre_normalize_data_rule,
             },
@@ -70,88 +118,387 @@ class Producer:
     def datetime_to_str(self, datetime_: datetime) -> str:
         return datetime.strftime(datetime_, self.DATETIME_FORMAT)
 
-    async def run(self) -> None:
+    @measure_stage_run(stage="producer")
+    async def run(self) -> int:
         """
         Точка запуска. Этапы:
         - Получение правил для выборки и нормализации данных по модели из DB.
-        - Получение date_modified.
-        - Выборка и нормализация данных из DB.
+        - Фиксация checkpoint по загруженным в ES пачкам и повторная выборка
+        потерянных сущностей (если checkpoint включен).
+        - Выборка сущностей, id которых пришли из change feed (если включен).
+        - Получение watermark (составной курсор modified, id).
+        - Выборка (keyset-пагинация) и нормализация данных из DB. В режиме
+        stream выборка идет server-side курсором пачками.
         - Сохранение данных в Storage.
-        - Обновление date_modified для модели DB.
+        - Обновление watermark для модели DB.
 
-        :return None:
+        При включенном change feed опрос по watermark выполняется не чаще
+        etl_change_feed_fallback_interval_sec (страховка от потерянных
+        уведомлений).
+
+        :return int: количество сущностей, сохраненных в Storage.
         """
+        need_poll, produce_count = self._is_poll_due(), 0
+
         for model_, rules in self.model_rules.items():
             selection_rule = rules[RuleTypes.SELECTION_RULE.value]
             normalize_rule = rules[RuleTypes.NORMALIZE_RULE.value]
 
+            if self._checkpoint_enabled:
+                produce_count += await self._commit_checkpoint(
+                    model_=model_,
+                    selection_rule=rules[
+                        RuleTypes.SELECTION_BY_IDS_RULE.value
+                    ],
+                    normalize_rule=normalize_rule,
+                )
+
+            if config.etl_change_feed_enabled:
+                produce_count += await self._produce_changed_entities(
+                    model_=model_,
+                    selection_rule=rules[
+                        RuleTypes.SELECTION_BY_IDS_RULE.value
+                    ],
+                    normalize_rule=normalize_rule,
+                )
+
+            if not need_poll:
+                continue
+
             try:
-                date_modified = await self._get_date_modified(model_=model_)
+                watermark = await self._get_watermark(model_=model_)
 
             except EntitiesNotFoundInDBError as ex:
                 logger.warning(f"{ex} (model was skip)")
                 continue
 
+            if self._stream:
+                produce_count += await self._produce_by_stream(
+                    model_=model_,
+                    stream_rule=rules[RuleTypes.STREAM_SELECTION_RULE.value],
+                    normalize_rule=normalize_rule,
+                    watermark=watermark,
+                )
+                continue
+
             if selection_data := await selection_rule(
-                pg_session=self.pg_session, date_modified=date_modified
+                pg_session=self.pg_session,
+                watermark=watermark,
+                shard=self._shard,
             ):
                 logger.info(
-                    f"{model_.model_name()}, received date modified: "
-                    f"{date_modified}"
+                    f"{model_.model_name()}, received watermark: "
+                    f"{watermark.model_dump_json()}"
                 )
 
                 normalized_data = normalize_rule(selection_data=selection_data)
                 logger.debug(
                     f"{model_.model_name()}, select and normalize data for "
-                    f"date modified: {date_modified}"
+                    f"watermark: {watermark.model_dump_json()}"
                 )
 
-                await self._insert_data_in_storage(
-                    model_=model_, normalized_data=normalized_data
-                )
-                await self._update_date_modified(
+                try:
+                    await self._insert_data_in_storage(
+                        model_=model_,
+                        normalized_data=normalized_data,
+                        watermark=self.get_last_watermark(
+                            selection_data=selection_data
+                        ),
+                    )
+
+                except StorageIsFullError as ex:
+                    logger.warning(f"{ex} (model was skip)")
+                    continue
+
+                await self._update_watermark(
                     model_=model_, selection_data=selection_data
                 )
 
+                produce_count += len(selection_data)
+                STAGE_ITEMS.labels(
+                    stage="producer", model=model_.model_name()
+                ).inc(len(selection_data))
                 logger.info(
                     f"{model_.model_name()}, ids({len(selection_data)})="
                     f"{[d.id for d in selection_data]} was produce"
                 )
 
             else:
+                WATERMARK_LAG_SECONDS.labels(model=model_.model_name()).set(0)
                 logger.info(
                     f"{model_.model_name()}, not found data for modified"
                 )
 
-    async def _get_date_modified(
+        return produce_count
+
+    async def has_backlog(self) -> bool:
+        """В Storage есть сущности, не загруженные в ES."""
+        for model_ in self.model_rules:
+            if await self.redis_storage.scard_(
+                name=self.redis_storage.get_staged_key(
+                    model_name=self.get_key_of_rule(model_=model_)
+                )
+            ):
+                return True
+
+        return False
+
+    def _is_poll_due(self) -> bool:
+        now_ = time.monotonic()
+
+        if self._force_poll:
+            return True
+
+        if config.etl_change_feed_enabled and self._last_poll_at and (
+            now_ - self._last_poll_at
+            < config.etl_change_feed_fallback_interval_sec
+        ):
+            return False
+
+        self._last_poll_at = now_
+
+        return True
+
+    def _get_checkpoint(self, model_: BaseWithTimeStampedType) -> Checkpoint:
+        return Checkpoint(
+            redis_storage=self.redis_storage,
+            es_client=self._es_client,
+            model_name=self.get_key_of_rule(model_=model_),
+            shard=self._shard,
+        )
+
+    async def _commit_checkpoint(
+        self,
+        model_: BaseWithTimeStampedType,
+        selection_rule,
+        normalize_rule,
+    ) -> int:
+        """
+        Фиксация checkpoint и повторная выборка из DB только тех сущностей
+        неподтвержденных пачек, которых уже нет в Storage (сбой или очистка
+        Storage). Удаленные из DB сущности подтверждаются без загрузки.
+        Повторная выборка - неудачная попытка (Checkpoint.fail_): исчерпавшие
+        попытки сущности исключаются из обработки.
+
+        :param BaseWithTimeStampedType model_:
+        :param selection_rule:
+        :param normalize_rule:
+        :return int: количество повторно сохраненных в Storage сущностей.
+        """
+        replay_count = 0
+        checkpoint = self._get_checkpoint(model_=model_)
+        lost_ids = await checkpoint.commit_()
+
+        for i in range(0, len(lost_ids), config.etl_movies_select_limit):
+            ids = lost_ids[i:i + config.etl_movies_select_limit]
+
+            if dead_ids := set(await checkpoint.fail_(ids=ids)):
+                await checkpoint.dead_letter_(ids=list(dead_ids))
+                ids = [id_ for id_ in ids if id_ not in dead_ids]
+
+            selection_data = await selection_rule(
+                pg_session=self.pg_session, ids=[UUID(id_) for id_ in ids]
+            )
+            found_ids = {str(data_.id) for data_ in selection_data}
+            await checkpoint.ack_(
+                ids=[id_ for id_ in ids if id_ not in found_ids]
+            )
+
+            if selection_data:
+                try:
+                    await self._insert_data_in_storage(
+                        model_=model_,
+                        normalized_data=normalize_rule(
+                            selection_data=selection_data
+                        ),
+                    )
+
+                except StorageIsFullError as ex:
+                    logger.warning(f"{ex} (replay was postpone)")
+                    break
+
+            replay_count += len(selection_data)
+
+        if lost_ids:
+            STAGE_ITEMS.labels(
+                stage="producer", model=model_.model_name()
+            ).inc(replay_count)
+            logger.warning(
+                f"{model_.model_name()}, checkpoint: ids({replay_count} from "
+                f"{len(lost_ids)}) lost in Storage was replay"
+            )
+
+        return replay_count
+
+    async def _produce_changed_entities(
+        self,
+        model_: BaseWithTimeStampedType,
+        selection_rule,
+        normalize_rule,
+    ) -> int:
+        """
+        Выборка и сохранение в Storage сущностей, id которых пришли из change
+        feed. Watermark при этом не меняется.
+
+        :param BaseWithTimeStampedType model_:
+        :param selection_rule:
+        :param normalize_rule:
+        :return int: количество сохраненных в Storage сущностей.
+        """
+        produce_count = 0
+        changed_key = ChangeFeedListener.get_changed_key(
+            model_name=model_.model_name()
+        )
+
+        # id удаляются из change feed только после сохранения в Storage: при
+        # ошибке выборки или Storage они обрабатываются следующим запуском.
+        while ids := await self.redis_storage.srandmember_(
+            name=changed_key, count=config.etl_movies_select_limit
+        ):
+            if selection_data := await selection_rule(
+                pg_session=self.pg_session, ids=[UUID(id_) for id_ in ids]
+            ):
+                try:
+                    await self._insert_data_in_storage(
+                        model_=model_,
+                        normalized_data=normalize_rule(
+                            selection_data=selection_data
+                        ),
+                    )
+
+                except StorageIsFullError as ex:
+                    # id остаются в change feed до разгрузки Storage.
+                    logger.warning(f"{ex} (change feed was postpone)")
+                    break
+
+            await self.redis_storage.srem_(name=changed_key, values=ids)
+            produce_count += len(selection_data)
+            STAGE_ITEMS.labels(
+                stage="producer", model=model_.model_name()
+            ).inc(len(selection_data))
+            logger.info(
+                f"{model_.model_name()}, change feed: "
+                f"ids({len(selection_data)} from {len(ids)}) was produce"
+            )
+
+        return produce_count
+
+    async def _produce_by_stream(
+        self,
+        model_: BaseWithTimeStampedType,
+        stream_rule,
+        normalize_rule,
+        watermark: WatermarkModel,
+    ) -> int:
+        """
+        Выборка по watermark одним запросом server-side курсором: до
+        etl_producer_stream_rows записей за запуск, пачками по
+        etl_movies_select_limit. Каждая пачка сохраняется в Storage и
+        сдвигает watermark, поэтому прерванная выборка продолжается с
+        последней сохраненной пачки.
+
+        :param BaseWithTimeStampedType model_:
+        :param stream_rule:
+        :param normalize_rule:
+        :param WatermarkModel watermark:
+        :return int: количество сохраненных в Storage сущностей.
+        """
+        produce_count = 0
+
+        async with contextlib.aclosing(
+            stream_rule(
+                pg_session=self.pg_session,
+                watermark=watermark,
+                limit=config.etl_producer_stream_rows,
+                shard=self._shard,
+            )
+        ) as partitions:
+            async for selection_data in partitions:
+                try:
+                    await self._insert_data_in_storage(
+                        model_=model_,
+                        normalized_data=normalize_rule(
+                            selection_data=selection_data
+                        ),
+                        watermark=self.get_last_watermark(
+                            selection_data=selection_data
+                        ),
+                    )
+
+                except StorageIsFullError as ex:
+                    logger.warning(f"{ex} (stream was stop)")
+                    break
+
+                await self._update_watermark(
+                    model_=model_, selection_data=selection_data
+                )
+
+                produce_count += len(selection_data)
+                STAGE_ITEMS.labels(
+                    stage="producer", model=model_.model_name()
+                ).inc(len(selection_data))
+
+        if produce_count:
+            logger.info(
+                f"{model_.model_name()}, stream from watermark "
+                f"{watermark.model_dump_json()}: {produce_count} was produce"
+            )
+
+        else:
+            WATERMARK_LAG_SECONDS.labels(model=model_.model_name()).set(0)
+            logger.info(f"{model_.model_name()}, not found data for modified")
+
+        return produce_count
+
+    async def _get_watermark(
             self, model_: BaseWithTimeStampedType
-    ) -> datetime:
+    ) -> WatermarkModel:
         """
-        Получение modified по модели из DB. Если данной информации по модели
-        нет в Storage, получаем ее из DB и записываем в Storage.
+        Получение watermark (modified, id) по модели из DB. Если данной
+        информации по модели нет в Storage, берем checkpoint из ES (если
+        включен), иначе modified из DB, и записываем в Storage. Значение в
+        старом формате (только modified) читается как курсор без id.
 
         :param BaseWithTimeStampedType model_:
-        :return datetime date_modified:
+        :return WatermarkModel watermark:
         """
         key_rule = self.get_key_of_rule(model_=model_)
 
-        if date_from_storage := await self.redis_storage.get_(name=key_rule):
-            date_modified = self.str_to_datetime(
-                datetime_str=date_from_storage
+        if watermark_from_storage := await self.redis_storage.get_(
+                name=key_rule
+        ):
+            try:
+                watermark = WatermarkModel.model_validate_json(
+                    watermark_from_storage
+                )
+
+            except ValidationError:
+                watermark = WatermarkModel(
+                    modified=self.str_to_datetime(
+                        datetime_str=watermark_from_storage
+                    )
+                )
+
+        elif self._checkpoint_enabled and (
+            watermark := await self._get_checkpoint(model_=model_).get_()
+        ):
+            await self._set_watermark(key_rule=key_rule, watermark=watermark)
+            logger.warning(
+                f"{model_.model_name()}: watermark was restore from "
+                f"checkpoint({watermark.model_dump_json()})"
             )
 
         else:
-            date_modified = await self._get_date_modified_from_db(
-                model_=model_
-            )
-            await self._set_date_modified(
-                key_rule=key_rule, date_modified=date_modified
+            watermark = WatermarkModel(
+                modified=await self._get_date_modified_from_db(model_=model_)
             )
+            await self._set_watermark(key_rule=key_rule, watermark=watermark)
 
-        return date_modified
+        return watermark
 
     @backoff_by_connection(
-        exceptions=(ConnectionRefusedError, socket.gaierror)
+        exceptions=(ConnectionRefusedError, socket.gaierror),
+        backend="postgres",
     )
     async def _get_date_modified_from_db(
         self, model_: BaseWithTimeStampedType
@@ -168,28 +515,44 @@ class Producer:
 
         return last_modified_entity.modified
 
-    async def _update_date_modified(
-        self, model_: BaseWithTimeStampedType, selection_data: list[BaseSchema]
+    @staticmethod
+    def get_last_watermark(selection_data: Sequence) -> WatermarkModel:
+        """Watermark последней записи выборки (упорядочена по modified, id)."""
+        last_entity = selection_data[-1]
+
+        return WatermarkModel(modified=last_entity.modified, id=last_entity.id)
+
+    async def _update_watermark(
+        self, model_: BaseWithTimeStampedType, selection_data: Sequence
     ) -> None:
-        ord_selection_data = sorted(
-            selection_data, key=lambda d: d.modified, reverse=False
-        )
+        """
+        Сдвиг watermark (курсора выборки) на последнюю запись выборки.
+        Выборка уже упорядочена по (modified, id) на стороне DB.
 
-        date_modified = ord_selection_data[-1].modified
+        :param BaseWithTimeStampedType model_:
+        :param Sequence selection_data:
+        :return None:
+        """
+        watermark = self.get_last_watermark(selection_data=selection_data)
         key_rule = self.get_key_of_rule(model_=model_)
-        await self._set_date_modified(
-            key_rule=key_rule, date_modified=date_modified
-        )
+        await self._set_watermark(key_rule=key_rule, watermark=watermark)
 
+        WATERMARK_LAG_SECONDS.labels(model=model_.model_name()).set(
+            (
+                datetime.now(tz=watermark.modified.tzinfo)
+                - watermark.modified
+            ).total_seconds()
+        )
         logger.debug(
-            f"{model_.model_name()}: set new date modified({date_modified})"
+            f"{model_.model_name()}: set new watermark"
+            f"({watermark.model_dump_json()})"
         )
 
-    async def _set_date_modified(
-            self, key_rule: str, date_modified: datetime
+    async def _set_watermark(
+            self, key_rule: str, watermark: WatermarkModel
     ) -> None:
         await self.redis_storage.set_(
-            name=key_rule, value=self.datetime_to_str(datetime_=date_modified)
+            name=key_rule, value=watermark.model_dump_json()
         )
 
     @check_free_size_storage()
@@ -197,15 +560,44 @@ class Producer:
         self,
         model_: BaseWithTimeStampedType,
         normalized_data: list[BaseSchema],
+        watermark: WatermarkModel | None = None,
     ) -> None:
-        key_rule = self.get_key_of_rule(model_=model_)
+        """
+        Сохранение сущностей в Storage. Выборка по watermark сохраняется
+        пачкой checkpoint (если включен).
 
-        for data_ in normalized_data:
-            key_ = "{}_{}".format(key_rule, data_.id)
-            await self.redis_storage.save_state(
-                key_=key_, value=data_.model_dump_json()
-            )
+        :param BaseWithTimeStampedType model_:
+        :param list[BaseSchema] normalized_data:
+        :param WatermarkModel | None watermark: watermark после выборки.
+        :return None:
+        """
+        key_rule = self.get_key_of_rule(model_=model_)
+        ids = [str(data_.id) for data_ in normalized_data]
+        checkpoint_kwargs = {}
+
+        if watermark and self._checkpoint_enabled:
+            checkpoint_kwargs = {
+                "pending_key": Checkpoint.get_pending_key(model_name=key_rule),
+                "batches_key": Checkpoint.get_batches_key(model_name=key_rule),
+                "batch": Checkpoint.new_batch(ids=ids, watermark=watermark),
+            }
+
+        await self.redis_storage.stage_(
+            staged_key=self.redis_storage.get_staged_key(model_name=key_rule),
+            ids=ids,
+            states={
+                "{}_{}".format(key_rule, data_.id): data_
+                for data_ in normalized_data
+            },
+            **checkpoint_kwargs,
+        )
 
         logger.debug(
             f"{model_.model_name()}: normalized data was insert in storage"
         )
+
+        if model_ in self.FAN_OUT_MODELS:
+            await self.redis_storage.sadd_(
+                name=FanOut.get_fan_out_key(model_=model_),
+                values=[str(data_.id) for data_ in normalized_data],
+            )
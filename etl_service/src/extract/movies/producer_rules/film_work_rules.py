@@ -1,30 +1,104 @@
 import socket
-from datetime import datetime
+from typing import AsyncIterator, Sequence
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, Select, select
 
 from core import config
+from extract.movies.producer_rules.keyset import (keyset_condition,
+                                                  keyset_order)
+from extract.movies.producer_rules.sharding import shard_condition
 from models.movies.pg_models import FilmWork
 from schemas.movies_schemas.film_work_models import FilmWorkModel
+from schemas.shard import ShardModel
+from schemas.watermark import WatermarkModel
 from utils import backoff_by_connection
 
 
 class FilmWorkRules:
 
+    # Выбираются только колонки, нужные для нормализации и watermark.
+    COLUMNS = (
+        FilmWork.id,
+        FilmWork.modified,
+        FilmWork.title,
+        FilmWork.description,
+        FilmWork.rating,
+    )
+
+    @classmethod
+    def film_work_selection_query(
+        cls, watermark: WatermarkModel, shard: ShardModel | None = None
+    ) -> Select:
+        return (
+            select(*cls.COLUMNS)
+            .where(keyset_condition(model_=FilmWork, watermark=watermark))
+            .where(shard_condition(model_=FilmWork, shard=shard))
+            .order_by(*keyset_order(model_=FilmWork))
+        )
+
     @classmethod
     @backoff_by_connection(
-        exceptions=(ConnectionRefusedError, socket.gaierror)
+        exceptions=(ConnectionRefusedError, socket.gaierror),
+        backend="postgres",
     )
     async def film_work_selection_data_rule(
-        cls, pg_session, date_modified: datetime
-    ) -> list[FilmWork]:
+        cls,
+        pg_session,
+        watermark: WatermarkModel,
+        shard: ShardModel | None = None,
+    ) -> Sequence[Row]:
         limit = config.etl_movies_select_limit
 
-        query_ = await pg_session.scalars(
-            select(FilmWork)
-            .where(FilmWork.modified >= date_modified)
-            .order_by(FilmWork.modified)
+        query_ = await pg_session.execute(
+            cls.film_work_selection_query(watermark=watermark, shard=shard)
+            .limit(limit)
+        )
+        film_works = query_.all()
+
+        return film_works
+
+    @classmethod
+    async def film_work_stream_selection_data_rule(
+        cls,
+        pg_session,
+        watermark: WatermarkModel,
+        limit: int,
+        shard: ShardModel | None = None,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Выборка server-side курсором: строки отдаются пачками по
+        etl_movies_select_limit, память не зависит от limit.
+
+        :param pg_session:
+        :param WatermarkModel watermark:
+        :param int limit: максимум строк за выборку.
+        :param ShardModel | None shard:
+        :return AsyncIterator[Sequence[Row]]:
+        """
+        result_ = await pg_session.stream(
+            cls.film_work_selection_query(watermark=watermark, shard=shard)
             .limit(limit)
+            .execution_options(yield_per=config.etl_movies_select_limit)
+        )
+
+        try:
+            async for partition in result_.partitions():
+                yield partition
+
+        finally:
+            await result_.close()
+
+    @classmethod
+    @backoff_by_connection(
+        exceptions=(ConnectionRefusedError, socket.gaierror),
+        backend="postgres",
+    )
+    async def film_work_selection_by_ids_data_rule(
+        cls, pg_session, ids: list[UUID]
+    ) -> Sequence[Row]:
+        query_ = await pg_session.execute(
+            select(*cls.COLUMNS).where(FilmWork.id.in_(ids))
         )
         film_works = query_.all()
 
@@ -32,7 +106,7 @@ class FilmWorkRules:
 
     @classmethod
     def film_work_normalize_data_rule(
-        cls, selection_data: list[FilmWork]
+        cls, selection_data: Sequence[Row]
     ) -> list[FilmWorkModel]:
         normalized_data = [
             FilmWorkModel(
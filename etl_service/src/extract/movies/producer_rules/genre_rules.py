@@ -1,30 +1,103 @@
 import socket
-from datetime import datetime
+from typing import AsyncIterator, Sequence
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, Select, select
 
 from core import config
+from extract.movies.producer_rules.keyset import (keyset_condition,
+                                                  keyset_order)
+from extract.movies.producer_rules.sharding import shard_condition
 from models.movies.pg_models import Genre
 from schemas.movies_schemas.genre_models import GenreModel
+from schemas.shard import ShardModel
+from schemas.watermark import WatermarkModel
 from utils import backoff_by_connection
 
 
 class GenreRules:
 
+    # Выбираются только колонки, нужные для нормализации и watermark.
+    COLUMNS = (
+        Genre.id,
+        Genre.modified,
+        Genre.name,
+        Genre.description,
+    )
+
+    @classmethod
+    def genre_selection_query(
+        cls, watermark: WatermarkModel, shard: ShardModel | None = None
+    ) -> Select:
+        return (
+            select(*cls.COLUMNS)
+            .where(keyset_condition(model_=Genre, watermark=watermark))
+            .where(shard_condition(model_=Genre, shard=shard))
+            .order_by(*keyset_order(model_=Genre))
+        )
+
     @classmethod
     @backoff_by_connection(
-        exceptions=(ConnectionRefusedError, socket.gaierror)
+        exceptions=(ConnectionRefusedError, socket.gaierror),
+        backend="postgres",
     )
     async def genre_selection_data_rule(
-        cls, pg_session, date_modified: datetime
-    ) -> list[Genre]:
+        cls,
+        pg_session,
+        watermark: WatermarkModel,
+        shard: ShardModel | None = None,
+    ) -> Sequence[Row]:
         limit = config.etl_movies_select_limit
 
-        query_ = await pg_session.scalars(
-            select(Genre)
-            .where(Genre.modified >= date_modified)
-            .order_by(Genre.modified)
+        query_ = await pg_session.execute(
+            cls.genre_selection_query(watermark=watermark, shard=shard)
+            .limit(limit)
+        )
+        genres = query_.all()
+
+        return genres
+
+    @classmethod
+    async def genre_stream_selection_data_rule(
+        cls,
+        pg_session,
+        watermark: WatermarkModel,
+        limit: int,
+        shard: ShardModel | None = None,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Выборка server-side курсором: строки отдаются пачками по
+        etl_movies_select_limit, память не зависит от limit.
+
+        :param pg_session:
+        :param WatermarkModel watermark:
+        :param int limit: максимум строк за выборку.
+        :param ShardModel | None shard:
+        :return AsyncIterator[Sequence[Row]]:
+        """
+        result_ = await pg_session.stream(
+            cls.genre_selection_query(watermark=watermark, shard=shard)
             .limit(limit)
+            .execution_options(yield_per=config.etl_movies_select_limit)
+        )
+
+        try:
+            async for partition in result_.partitions():
+                yield partition
+
+        finally:
+            await result_.close()
+
+    @classmethod
+    @backoff_by_connection(
+        exceptions=(ConnectionRefusedError, socket.gaierror),
+        backend="postgres",
+    )
+    async def genre_selection_by_ids_data_rule(
+        cls, pg_session, ids: list[UUID]
+    ) -> Sequence[Row]:
+        query_ = await pg_session.execute(
+            select(*cls.COLUMNS).where(Genre.id.in_(ids))
         )
         genres = query_.all()
 
@@ -32,7 +105,7 @@ class GenreRules:
 
     @classmethod
     def genre_normalize_data_rule(
-            cls, selection_data: list[Genre]
+            cls, selection_data: Sequence[Row]
     ) -> list[GenreModel]:
         normalized_data = [
             GenreModel(
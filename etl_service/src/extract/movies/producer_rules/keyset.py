@@ -0,0 +1,30 @@
+from sqlalchemy import tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+from models.movies.pg_models import BaseWithTimeStampedType
+from schemas.watermark import WatermarkModel
+
+__all__ = ["keyset_condition", "keyset_order"]
+
+
+def keyset_condition(
+    model_: BaseWithTimeStampedType, watermark: WatermarkModel
+) -> ColumnElement[bool]:
+    """
+    Условие keyset-пагинации по составному курсору (modified, id). Строки с
+    одинаковым modified не перечитываются повторно и не блокируют выборку.
+
+    :param BaseWithTimeStampedType model_:
+    :param WatermarkModel watermark:
+    :return ColumnElement[bool]:
+    """
+    if watermark.id is None:
+        return model_.modified >= watermark.modified
+
+    return tuple_(model_.modified, model_.id) > tuple_(
+        watermark.modified, watermark.id
+    )
+
+
+def keyset_order(model_: BaseWithTimeStampedType) -> tuple:
+    return model_.modified, model_.id
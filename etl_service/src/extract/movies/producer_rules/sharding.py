@@ -0,0 +1,40 @@
+from sqlalchemy import Integer, String, cast, func, literal, true
+from sqlalchemy.dialects.postgresql import BIT
+from sqlalchemy.sql.elements import ColumnElement
+
+from models.movies.pg_models import BaseWithTimeStampedType
+from schemas.shard import ShardModel
+
+__all__ = ["shard_condition"]
+
+
+def shard_condition(
+    model_: BaseWithTimeStampedType, shard: ShardModel | None
+) -> ColumnElement[bool]:
+    """
+    Условие выборки сущностей шарда:
+    ('x' || substr(md5(id::text), 1, 7))::bit(28)::int % count = number.
+    Совпадает с ShardModel.owns на стороне Python.
+
+    :param BaseWithTimeStampedType model_:
+    :param ShardModel | None shard:
+    :return ColumnElement[bool]:
+    """
+    if shard is None or shard.is_single:
+        return true()
+
+    id_hash = cast(
+        cast(
+            literal("x").concat(
+                func.substr(
+                    func.md5(cast(model_.id, String)),
+                    1,
+                    ShardModel.HASH_HEX_LENGTH,
+                )
+            ),
+            BIT(ShardModel.HASH_HEX_LENGTH * 4),
+        ),
+        Integer,
+    )
+
+    return func.mod(id_hash, shard.count) == shard.number
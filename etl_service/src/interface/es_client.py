@@ -6,6 +6,8 @@ from elasticsearch import ConnectionError as ConnectionErrorES
 from elasticsearch import NotFoundError
 
 from core import config
+from core.logger import logger
+from core.metrics import BULK_ERRORS
 from utils import backoff_by_connection
 
 ESClient_T = TypeVar("ESClient_T", bound="AsyncESClient")
@@ -14,6 +16,9 @@ ESClient_T = TypeVar("ESClient_T", bound="AsyncESClient")
 class AsyncESClient:
     """Async-клиент Elasticsearch."""
 
+    NOT_FOUND_STATUS = 404
+    VERSION_INDEX_TEMPLATE = "{alias}_v{version}"
+
     def __init__(self):
         self.__host = config.elastic_host
         self.__port = config.elastic_port
@@ -22,13 +27,15 @@ class AsyncESClient:
             basic_auth=(config.elastic_name, config.elastic_password),
             max_retries=0,
             retry_on_timeout=False,
+            connections_per_node=config.elastic_connections_per_node,
         )
 
     async def close_(self) -> None:
         await self._client.close()
 
     @backoff_by_connection(
-        exceptions=(ConnectionErrorES, ClientConnectorError)
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
     )
     async def create_index_with_ignore(self, index_: str, body: dict = None):
         if body:
@@ -39,7 +46,8 @@ class AsyncESClient:
                 await self._client.indices.create(index=index_, body=body)
 
     @backoff_by_connection(
-        exceptions=(ConnectionErrorES, ClientConnectorError)
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
     )
     async def insert_document(
         self, index_: str, document: dict, id_: int = None
@@ -55,6 +63,303 @@ class AsyncESClient:
 
         return result
 
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def get_document(self, index_: str, id_: str) -> dict | None:
+        """
+        Документ по id (realtime get, без refresh индекса).
+
+        :param str index_:
+        :param str id_:
+        :return dict | None: _source документа, None - документа или индекса
+        нет.
+        """
+        response_ = await self._client.options(
+            ignore_status=self.NOT_FOUND_STATUS
+        ).get(index=index_, id=id_)
+
+        if response_.get("found"):
+            return response_.get("_source")
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def search_documents(self, index_: str, body: dict) -> dict:
+        """
+        Поиск по индексу (или alias).
+
+        :param str index_:
+        :param dict body:
+        :return dict: ответ ES.
+        """
+        response_ = await self._client.search(index=index_, body=body)
+
+        return response_.body
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def refresh_index(self, index_: str) -> None:
+        await self._client.indices.refresh(index=index_)
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def create_index_with_alias(
+        self, alias: str, body: dict = None
+    ) -> bool:
+        """
+        Создание версионного индекса ({alias}_v1) с alias, если нет ни alias,
+        ни индекса с таким именем (индексы, созданные ранее без alias,
+        продолжают использоваться до первой пересборки).
+
+        :param str alias:
+        :param dict body:
+        :return bool: индекс был создан.
+        """
+        if body and not await self._client.indices.exists(index=alias):
+            # Индекс мог быть создан параллельно другим воркером ETL.
+            response_ = await self._client.options(
+                ignore_status=400
+            ).indices.create(
+                index=self.get_version_index_name(alias=alias, version=1),
+                body={**body, "aliases": {alias: {}}},
+            )
+
+            return bool(response_.get("acknowledged"))
+
+        return False
+
+    @classmethod
+    def get_version_index_name(cls, alias: str, version: int) -> str:
+        return cls.VERSION_INDEX_TEMPLATE.format(alias=alias, version=version)
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def get_version_indices(self, alias: str) -> dict[str, int]:
+        """
+        Версионные индексы ({alias}_v{N}) для alias.
+
+        :param str alias:
+        :return dict[str, int]: имя индекса -> версия.
+        """
+        response_ = await self._client.indices.get(
+            index=f"{alias}_v*", allow_no_indices=True, expand_wildcards="all"
+        )
+        prefix_ = f"{alias}_v"
+
+        return {
+            index_: int(index_.removeprefix(prefix_))
+            for index_ in response_.body
+            if index_.removeprefix(prefix_).isdigit()
+        }
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def get_alias_indices(self, alias: str) -> list[str]:
+        try:
+            response_ = await self._client.indices.get_alias(name=alias)
+
+        except NotFoundError:
+            return []
+
+        return list(response_.body)
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def is_concrete_index(self, index_: str) -> bool:
+        """Существует индекс с именем index_ (а не alias с таким именем)."""
+        if not await self._client.indices.exists(index=index_):
+            return False
+
+        return index_ not in await self.get_alias_indices(alias=index_)
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def create_index(self, index_: str, body: dict) -> None:
+        await self._client.indices.create(index=index_, body=body)
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def put_mapping(self, index_: str, mappings: dict) -> bool:
+        """
+        Добавление в существующий индекс (или индексы alias) новых полей
+        схемы. Несовместимые изменения не применяются: для них нужна
+        пересборка индекса.
+
+        :param str index_:
+        :param dict mappings: mappings схемы индекса.
+        :return bool: схема применена.
+        """
+        response_ = await self._client.options(
+            ignore_status=400
+        ).indices.put_mapping(index=index_, **mappings)
+
+        if error := response_.get("error"):
+            logger.warning(f"{index_}: mapping was not update: {error}")
+
+        return bool(response_.get("acknowledged"))
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def put_settings(self, index_: str, settings: dict) -> None:
+        await self._client.indices.put_settings(
+            index=index_, settings=settings
+        )
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def refresh_and_forcemerge(
+        self, index_: str, max_num_segments: int = 1
+    ) -> None:
+        await self._client.indices.refresh(index=index_)
+        await self._client.indices.forcemerge(
+            index=index_,
+            max_num_segments=max_num_segments,
+            wait_for_completion=True,
+        )
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def swap_alias(
+        self,
+        alias: str,
+        new_index: str,
+        old_indices: list[str],
+        remove_concrete_index: bool = False,
+    ) -> None:
+        """
+        Атомарное переключение alias на новый индекс (одним запросом
+        _aliases). Индекс без alias с именем alias удаляется в том же запросе.
+
+        :param str alias:
+        :param str new_index:
+        :param list[str] old_indices:
+        :param bool remove_concrete_index:
+        :return None:
+        """
+        actions = [
+            {"remove": {"index": old_index, "alias": alias}}
+            for old_index in old_indices
+        ]
+
+        if remove_concrete_index:
+            actions.append({"remove_index": {"index": alias}})
+
+        actions.append({"add": {"index": new_index, "alias": alias}})
+
+        await self._client.indices.update_aliases(actions=actions)
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def delete_indices(self, indices: list[str]) -> None:
+        if indices:
+            await self._client.indices.delete(index=",".join(indices))
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def insert_documents(
+        self, index_: str, documents: dict[str, dict]
+    ) -> dict:
+        """
+        Загрузка документов одним bulk-запросом (index).
+
+        :param str index_:
+        :param dict[str, dict] documents: id документа -> документ.
+        :return dict: status и errors (id документа -> ошибка).
+        """
+        operations = []
+        for id_, document in documents.items():
+            operations.append({"index": {"_index": index_, "_id": id_}})
+            operations.append(document)
+
+        return await self._bulk(
+            index_=index_, action_="index", operations=operations
+        )
+
+    @backoff_by_connection(
+        exceptions=(ConnectionErrorES, ClientConnectorError),
+        backend="elasticsearch",
+    )
+    async def update_documents(
+        self, index_: str, documents: dict[str, dict]
+    ) -> dict:
+        """
+        Частичное обновление документов одним bulk-запросом (_update с doc).
+        Отсутствующие в индексе документы пропускаются: они попадут в индекс
+        полностью через основной конвейер.
+
+        :param str index_:
+        :param dict[str, dict] documents: id документа -> обновляемые поля.
+        :return dict: status и errors (id документа -> ошибка).
+        """
+        operations = []
+        for id_, document in documents.items():
+            operations.append({"update": {"_index": index_, "_id": id_}})
+            operations.append({"doc": document})
+
+        return await self._bulk(
+            index_=index_,
+            action_="update",
+            operations=operations,
+            ignore_statuses=(self.NOT_FOUND_STATUS,),
+        )
+
+    async def _bulk(
+        self,
+        index_: str,
+        action_: str,
+        operations: list[dict],
+        ignore_statuses: tuple = (),
+    ) -> dict:
+        result = {"status": True, "errors": {}}
+
+        if not operations:
+            return result
+
+        response_ = await self._client.bulk(operations=operations)
+
+        if response_.get("errors"):
+            for item in response_.get("items", []):
+                item_ = item.get(action_, {})
+
+                if (error := item_.get("error")) and (
+                    item_.get("status") not in ignore_statuses
+                ):
+                    result["errors"][item_.get("_id")] = error
+
+            result["status"] = not result["errors"]
+            BULK_ERRORS.labels(index=index_, action=action_).inc(
+                len(result["errors"])
+            )
+
+        return result
+
 
 class ESContextManager:
     """Контекстный менеджер по работе с RedisStorage."""
@@ -0,0 +1,185 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any
+
+import lz4.frame
+import msgpack
+import orjson
+import zstandard
+from pydantic import BaseModel
+
+from core import config
+
+__all__ = ["StorageCodec", "get_storage_codec"]
+
+
+class BaseSerializer(ABC):
+    FORMAT: int
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        pass
+
+    def dumps_model(self, model_: BaseModel) -> bytes:
+        return self.dumps(model_.model_dump(mode="json"))
+
+
+class JsonSerializer(BaseSerializer):
+    FORMAT = 0x01
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    def dumps_model(self, model_: BaseModel) -> bytes:
+        # Сериализатор pydantic (Rust) быстрее model_dump + dumps.
+        return model_.model_dump_json().encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer(BaseSerializer):
+    FORMAT = 0x02
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+class BaseCompressor(ABC):
+    FLAG: int
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        pass
+
+
+class ZstdCompressor(BaseCompressor):
+    FLAG = 0x10
+
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class Lz4Compressor(BaseCompressor):
+    FLAG = 0x20
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4.frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4.frame.decompress(data)
+
+
+class StorageCodec:
+    """
+    Кодек значений Storage: сериализация (json, orjson, msgpack) и сжатие
+    (zstd, lz4) значений от compression_min_size байт. Первый байт значения -
+    заголовок (формат | сжатие), поэтому значение читается независимо от
+    текущих настроек кодека. Значения без заголовка (JSON-строки прошлых
+    версий) читаются как JSON.
+    """
+
+    SERIALIZERS = {
+        "json": JsonSerializer,
+        "orjson": OrjsonSerializer,
+        "msgpack": MsgpackSerializer,
+    }
+    COMPRESSORS = {
+        "zstd": ZstdCompressor,
+        "lz4": Lz4Compressor,
+    }
+    FORMAT_MASK = 0x0F
+    COMPRESSION_MASK = 0xF0
+    LEGACY_JSON_PREFIX = b"{"
+
+    def __init__(
+        self,
+        serializer: str = "orjson",
+        compression: str | None = None,
+        compression_min_size: int = 1024,
+    ):
+        self._serializer: BaseSerializer = self.SERIALIZERS[serializer]()
+        self._compressor: BaseCompressor | None = (
+            self.COMPRESSORS[compression]() if compression else None
+        )
+        self._compression_min_size = compression_min_size
+        # Чтение: формат -> сериализатор, флаг сжатия -> компрессор.
+        self._loaders = {
+            JsonSerializer.FORMAT: OrjsonSerializer(),
+            MsgpackSerializer.FORMAT: MsgpackSerializer(),
+        }
+        self._decompressors = {
+            compressor_cls.FLAG: (
+                self._compressor
+                if isinstance(self._compressor, compressor_cls)
+                else compressor_cls()
+            )
+            for compressor_cls in self.COMPRESSORS.values()
+        }
+
+    def encode(self, value: BaseModel | dict) -> bytes:
+        data, header = (
+            self._serializer.dumps_model(value)
+            if isinstance(value, BaseModel)
+            else self._serializer.dumps(value),
+            self._serializer.FORMAT,
+        )
+
+        if self._compressor and len(data) >= self._compression_min_size:
+            data, header = (
+                self._compressor.compress(data),
+                header | self._compressor.FLAG,
+            )
+
+        return bytes((header,)) + data
+
+    def decode(self, data: bytes | str | None) -> Any:
+        if data is None:
+            return None
+
+        if isinstance(data, str):
+            data = data.encode()
+
+        if data.startswith(self.LEGACY_JSON_PREFIX):
+            return self._loaders[JsonSerializer.FORMAT].loads(data)
+
+        header, payload = data[0], data[1:]
+
+        if compression := header & self.COMPRESSION_MASK:
+            payload = self._decompressors[compression].decompress(payload)
+
+        return self._loaders[header & self.FORMAT_MASK].loads(payload)
+
+
+def get_storage_codec() -> StorageCodec:
+    return StorageCodec(
+        serializer=config.etl_storage_codec,
+        compression=config.etl_storage_compression or None,
+        compression_min_size=config.etl_storage_compression_min_size,
+    )
@@ -17,9 +17,10 @@ class RedisContextManager:
 
     URL_TEMPLATE = "redis://{}:{}"
 
-    def __init__(self, redis_db: int) -> None:
+    def __init__(self, redis_db: int, namespace: str = "") -> None:
         self._redis_storage = None
         self._redis_db = redis_db
+        self._namespace = namespace
 
     @property
     def redis_storage(self):
@@ -32,7 +33,9 @@ class RedisContextManager:
             db=self._redis_db,
             decode_responses=True,
         )
-        self._redis_storage = RedisStorage(redis_=redis_)
+        self._redis_storage = RedisStorage(
+            redis_=redis_, namespace=self._namespace
+        )
 
         return self._redis_storage
 
@@ -1,12 +1,18 @@
 import asyncio
 import functools
+import time
 from typing import TypeVar
 
-from redis.asyncio import Redis
+from pydantic import BaseModel
+from redis.asyncio import ConnectionPool, Redis
 from redis.exceptions import ConnectionError as RedisConnectionError
 
+from core import config
 from core.logger import logger
+from core.metrics import BACKEND_CALL_ERRORS, BACKEND_CALL_SECONDS
 from interface.storage.base import BaseStorage
+from interface.storage.codec import StorageCodec, get_storage_codec
+from utils import StorageIsFullError, get_backoff_delay
 
 __all__ = [
     "RedisStorage_T",
@@ -20,27 +26,41 @@ RedisStorage_T = TypeVar("RedisStorage_T", bound="RedisStorage")
 
 def backoff_async_storage(start_sleep_time=2, factor=2, border_sleep_time=20):
     def wrapper_storage(func):
+        call_seconds = BACKEND_CALL_SECONDS.labels(
+            backend="redis", call=func.__name__
+        )
+        call_errors = BACKEND_CALL_ERRORS.labels(
+            backend="redis", call=func.__name__
+        )
+
         @functools.wraps(func)
         async def wrapped_storage(*args, **kwargs):
-            execute_result, n, t = False, 1, start_sleep_time
+            execute_result, n = False, 0
 
             while not execute_result:
                 try:
-                    if asyncio.iscoroutinefunction(func):
-                        result_ = await func(*args, **kwargs)
+                    with call_seconds.time():
+                        if asyncio.iscoroutinefunction(func):
+                            result_ = await func(*args, **kwargs)
 
-                    else:
-                        result_ = func(*args, **kwargs)
+                        else:
+                            result_ = func(*args, **kwargs)
 
                     execute_result = True
 
                     return result_
                 except (RedisConnectionError, ConnectionError) as ex:
-                    t = (
-                        t * (factor ^ n)
-                        if t < border_sleep_time else border_sleep_time
+                    call_errors.inc()
+                    t = get_backoff_delay(
+                        attempt=n,
+                        start_sleep_time=start_sleep_time,
+                        factor=factor,
+                        border_sleep_time=border_sleep_time,
+                    )
+                    n += 1
+                    logger.error(
+                        f"Error connect to RedisStorage({t:.2f}): {ex}"
                     )
-                    logger.error(f"Error connect to RedisStorage({t}): {ex}")
                     await asyncio.sleep(t)
 
         return wrapped_storage
@@ -48,36 +68,40 @@ def backoff_async_storage(start_sleep_time=2, factor=2, border_sleep_time=20):
     return wrapper_storage
 
 
-def check_free_size_storage(
-        start_sleep_time=2, factor=2, border_sleep_time=20, select_limit=100
-):
+def check_free_size_storage():
+    """
+    Backpressure Producer. Количество необработанных сущностей модели -
+    размер staged-множества (SCARD, O(1)). Запись приостанавливается при
+    etl_storage_high_watermark и возобновляется, когда этапы ниже разгрузят
+    Storage до etl_storage_low_watermark (гистерезис). Пока запись
+    приостановлена - сразу StorageIsFullError: этапы выполняются цепочкой в
+    одной задаче (StageChain), поэтому во время ожидания Storage никто не
+    разгружал бы. Producer пропускает модель, а следующие этапы цепочки
+    разгружают Storage.
+    """
     def wrapper(func):
         @functools.wraps(func)
         async def wrapped(*args, **kwargs):
             producer_, model_ = next(iter(args)), kwargs.get("model_")
             key_rule = producer_.get_key_of_rule(model_=model_)
+            staged_key = RedisStorage.get_staged_key(model_name=key_rule)
 
-            need_timeout, n, t = True, 1, start_sleep_time
-            while need_timeout:
-                gen_scan_iter_ = await producer_.redis_storage.scan_iter(
-                    f"{key_rule}_*"
-                )
-                num_obj_in_stor = len(gen_scan_iter_)
+            num_obj_in_stor = await producer_.redis_storage.scard_(
+                name=staged_key
+            )
 
-                if num_obj_in_stor >= select_limit:
-                    t = (
-                        t * (factor ^ n)
-                        if t < border_sleep_time else border_sleep_time
-                    )
-                    msg = (
-                        f"Store contains the maximum of unfinished proc "
-                        f"({num_obj_in_stor}), recheck after {t} sec."
-                    )
-                    logger.warning(msg)
-                    await asyncio.sleep(t)
+            if num_obj_in_stor >= config.etl_storage_high_watermark or (
+                key_rule in producer_.throttled_models
+                and num_obj_in_stor > config.etl_storage_low_watermark
+            ):
+                producer_.throttled_models.add(key_rule)
 
-                else:
-                    need_timeout = False
+                raise StorageIsFullError(message=(
+                    f"{key_rule}: store contains the maximum of "
+                    f"unfinished proc ({num_obj_in_stor})"
+                ))
+
+            producer_.throttled_models.discard(key_rule)
 
             return await func(*args, **kwargs)
 
@@ -87,39 +111,273 @@ def check_free_size_storage(
 
 
 class RedisStorage(BaseStorage):
-    """Storage с использованием Redis."""
+    """
+    Storage с использованием Redis. Все ключи (кроме lease) хранятся с
+    префиксом namespace (например, шарда воркера ETL). Состояния сущностей
+    (save_state, stage_) кодируются StorageCodec и читаются отдельным
+    клиентом без decode_responses.
+    """
+
+    # Продление/освобождение lease только его владельцем (token).
+    RENEW_LEASE_SCRIPT = """
+        if redis.call("GET", KEYS[1]) == ARGV[1] then
+            return redis.call("EXPIRE", KEYS[1], ARGV[2])
+        end
+        return 0
+    """
+    RELEASE_LEASE_SCRIPT = """
+        if redis.call("GET", KEYS[1]) == ARGV[1] then
+            return redis.call("DEL", KEYS[1])
+        end
+        return 0
+    """
 
-    def __init__(self, redis_: Redis):
+    STAGED_KEY_TEMPLATE = "staged:{model_name}"
+
+    def __init__(
+        self,
+        redis_: Redis,
+        namespace: str = "",
+        codec: StorageCodec | None = None,
+        raw_redis_: Redis | None = None,
+    ):
         self._redis = redis_
+        self._raw_redis = raw_redis_ or self.get_raw_redis(redis_=redis_)
+        self._namespace = namespace
+        self._codec = codec or get_storage_codec()
+
+    @staticmethod
+    def get_raw_redis(redis_: Redis) -> Redis:
+        """Клиент с теми же параметрами соединения, но ответами в bytes."""
+        pool_ = redis_.connection_pool
+
+        return Redis(
+            connection_pool=ConnectionPool(
+                connection_class=pool_.connection_class,
+                **{**pool_.connection_kwargs, "decode_responses": False},
+            )
+        )
+
+    def _key(self, name: str) -> str:
+        return f"{self._namespace}{name}"
+
+    @classmethod
+    def get_staged_key(cls, model_name: str) -> str:
+        """Множество id сущностей модели, находящихся в обработке."""
+        return cls.STAGED_KEY_TEMPLATE.format(model_name=model_name)
+
+    def shared(self) -> "RedisStorage":
+        """Storage на том же соединении без namespace (общий для шардов)."""
+        return RedisStorage(
+            redis_=self._redis, codec=self._codec, raw_redis_=self._raw_redis
+        )
 
     @backoff_async_storage()
-    async def save_state(self, key_: str, value: str) -> None:
-        await self._redis.set(name=key_, value=value)
+    async def save_state(self, key_: str, value: BaseModel | dict) -> None:
+        await self._redis.set(
+            name=self._key(key_), value=self._codec.encode(value=value)
+        )
 
     @backoff_async_storage()
-    async def retrieve_state(self, key_: str) -> str:
-        return await self._redis.get(key_)
+    async def retrieve_state(self, key_: str) -> dict | None:
+        return self._codec.decode(
+            data=await self._raw_redis.get(self._key(key_))
+        )
 
     @backoff_async_storage()
     async def get_(self, name: str) -> str:
-        res_ = await self._redis.get(name=name)
+        res_ = await self._redis.get(name=self._key(name))
         return res_
 
     @backoff_async_storage()
     async def set_(self, name: str, value: str | float) -> None:
-        await self._redis.set(name=name, value=value)
+        await self._redis.set(name=self._key(name), value=value)
 
     @backoff_async_storage()
     async def scan_iter(self, match) -> list:
-        return [i async for i in self._redis.scan_iter(match)]
+        return [
+            i.removeprefix(self._namespace)
+            async for i in self._redis.scan_iter(self._key(match))
+        ]
 
     @backoff_async_storage()
     async def delete_(self, name: str = None, names: list[str] = None) -> None:
         if name:
-            await self._redis.delete(name)
+            await self._redis.delete(self._key(name))
 
         if names:
-            await self._redis.delete(*names)
+            await self._redis.delete(*[self._key(n) for n in names])
+
+    @backoff_async_storage()
+    async def sadd_(self, name: str, values: list[str]) -> None:
+        if values:
+            await self._redis.sadd(self._key(name), *values)
+
+    @backoff_async_storage()
+    async def srandmember_(self, name: str, count: int) -> list[str]:
+        return await self._redis.srandmember(
+            name=self._key(name), number=count
+        ) or []
+
+    @backoff_async_storage()
+    async def srem_(self, name: str, values: list[str]) -> None:
+        if values:
+            await self._redis.srem(self._key(name), *values)
+
+    @backoff_async_storage()
+    async def scard_(self, name: str) -> int:
+        return await self._redis.scard(self._key(name))
+
+    @backoff_async_storage()
+    async def stage_(
+        self,
+        staged_key: str,
+        ids: list[str],
+        states: dict[str, BaseModel | dict],
+        pending_key: str | None = None,
+        batches_key: str | None = None,
+        batch: str | None = None,
+    ) -> None:
+        """
+        Сохранение сущностей и учет их id в staged-множестве одной
+        транзакцией. Если задана пачка (batch), в той же транзакции id
+        добавляются в неподтвержденные, а пачка - в очередь пачек.
+
+        :param str staged_key:
+        :param list[str] ids:
+        :param dict[str, BaseModel | dict] states: ключ сущности -> значение.
+        :param str | None pending_key: hash неподтвержденных id.
+        :param str | None batches_key: список пачек.
+        :param str | None batch: сериализованная пачка.
+        :return None:
+        """
+        if not ids:
+            return
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.mset(
+                {
+                    self._key(key_): self._codec.encode(value=value)
+                    for key_, value in states.items()
+                }
+            )
+            pipe.sadd(self._key(staged_key), *ids)
+
+            if pending_key and batches_key and batch:
+                pipe.hset(
+                    self._key(pending_key), mapping=dict.fromkeys(ids, 1)
+                )
+                pipe.rpush(self._key(batches_key), batch)
+
+            await pipe.execute()
+
+    @backoff_async_storage()
+    async def unstage_(
+        self,
+        staged_key: str,
+        ids: list[str],
+        names: list[str],
+        pending_key: str | None = None,
+    ) -> None:
+        """
+        Удаление ключей обработанных сущностей и их id из staged-множества
+        (и подтверждение id в пачках) одной транзакцией.
+
+        :param str staged_key:
+        :param list[str] ids:
+        :param list[str] names: ключи сущностей.
+        :param str | None pending_key: hash неподтвержденных id.
+        :return None:
+        """
+        if not ids:
+            return
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(*[self._key(name) for name in names])
+            pipe.srem(self._key(staged_key), *ids)
+
+            if pending_key:
+                pipe.hdel(self._key(pending_key), *ids)
+
+            await pipe.execute()
+
+    @backoff_async_storage()
+    async def smismember_(self, name: str, values: list[str]) -> list[bool]:
+        if not values:
+            return []
+
+        return [
+            bool(is_member)
+            for is_member in await self._redis.smismember(
+                self._key(name), values
+            )
+        ]
+
+    @backoff_async_storage()
+    async def lrange_(self, name: str) -> list[str]:
+        return await self._redis.lrange(self._key(name), 0, -1)
+
+    @backoff_async_storage()
+    async def lpop_(self, name: str, count: int) -> None:
+        if count:
+            await self._redis.lpop(self._key(name), count=count)
+
+    @backoff_async_storage()
+    async def hmget_(self, name: str, keys: list[str]) -> list[str | None]:
+        if not keys:
+            return []
+
+        return await self._redis.hmget(self._key(name), keys)
+
+    @backoff_async_storage()
+    async def hset_(self, name: str, mapping: dict[str, str]) -> None:
+        if mapping:
+            await self._redis.hset(self._key(name), mapping=mapping)
+
+    @backoff_async_storage()
+    async def hincrby_(self, name: str, keys: list[str]) -> list[int]:
+        """Увеличение счетчиков keys в hash на 1 (один round trip)."""
+        if not keys:
+            return []
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key_ in keys:
+                pipe.hincrby(self._key(name), key_, 1)
+
+            return await pipe.execute()
+
+    @backoff_async_storage()
+    async def hdel_(self, name: str, keys: list[str]) -> None:
+        if keys:
+            await self._redis.hdel(self._key(name), *keys)
+
+    @backoff_async_storage()
+    async def acquire_lease_(self, name: str, token: str, ttl: int) -> bool:
+        return bool(
+            await self._redis.set(name=name, value=token, nx=True, ex=ttl)
+        )
+
+    @backoff_async_storage()
+    async def renew_lease_(self, name: str, token: str, ttl: int) -> bool:
+        return bool(
+            await self._redis.eval(
+                self.RENEW_LEASE_SCRIPT, 1, name, token, ttl
+            )
+        )
+
+    @backoff_async_storage()
+    async def release_lease_(self, name: str, token: str) -> None:
+        await self._redis.eval(self.RELEASE_LEASE_SCRIPT, 1, name, token)
+
+    @backoff_async_storage()
+    async def count_leases_(self, names: list[str]) -> int:
+        return await self._redis.exists(*names)
+
+    @backoff_async_storage()
+    async def flush_db_(self) -> None:
+        await self._redis.flushdb()
 
     async def close_(self) -> None:
         await self._redis.close()
+        await self._raw_redis.close()
+        await self._raw_redis.connection_pool.disconnect()
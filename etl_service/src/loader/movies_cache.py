@@ -0,0 +1,138 @@
+from redis.asyncio import Redis
+
+from core import config
+from core.logger import logger
+from interface.es_client import ESClient_T
+from interface.storage.redis_context_manager import RedisContextManager
+
+__all__ = ["CacheEvents", "create_movies_cache_redis"]
+
+
+def create_movies_cache_redis() -> Redis:
+    """Клиент Redis кеша movies_service (redis_db_movies_cache)."""
+    return Redis.from_url(
+        url=RedisContextManager.URL_TEMPLATE.format(
+            config.redis_host, config.redis_port
+        ),
+        password=config.redis_password,
+        db=config.redis_db_movies_cache,
+        decode_responses=True,
+    )
+
+
+class CacheEvents:
+    """
+    События изменения документов для кеша movies_service: Loader и FanOut
+    копят id загруженных документов по индексам (add), в конце прогона
+    publish обновляет индексы (refresh, чтобы запросы после сброса кеша
+    видели новые документы) и пишет события в Redis stream
+    cache:invalidation.
+    movies_service (services/cache_invalidator.py) читает stream группой
+    потребителей и удаляет ровно затронутые ключи кеша.
+
+    Поля события: index - alias индекса, ids - id документов через запятую;
+    для film_work еще person_ids - персоны загруженных фильмов (их списки
+    фильмов person_films в кеше содержат название и рейтинг фильма).
+    """
+
+    STREAM_KEY = "cache:invalidation"
+    # Поля документа индекса -> поле события с id связанных сущностей.
+    RELATED_FIELDS = {
+        "film_work": {"person_ids": ("actors", "directors", "writers")},
+    }
+    IDS_PER_EVENT = 1_000
+
+    def __init__(self, es_client: ESClient_T, redis_: Redis | None = None):
+        self._es_client: ESClient_T = es_client
+        self._redis = redis_
+        self._own_redis = redis_ is None
+        # alias -> поле события -> id
+        self._changes: dict[str, dict[str, set[str]]] = {}
+
+    @property
+    def redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = create_movies_cache_redis()
+
+        return self._redis
+
+    async def close(self) -> None:
+        """Закрытие клиента Redis, созданного экземпляром."""
+        if self._redis is not None and self._own_redis:
+            await self._redis.close()
+            self._redis = None
+
+    def add(self, index_: str, documents: dict[str, dict]) -> None:
+        """
+        :param str index_: alias индекса.
+        :param dict[str, dict] documents: загруженные документы по id.
+        """
+        if not documents:
+            return
+
+        changes = self._changes.setdefault(index_, {"ids": set()})
+        changes["ids"].update(documents)
+
+        for field_, doc_fields in self.RELATED_FIELDS.get(index_, {}).items():
+            changes.setdefault(field_, set()).update(
+                str(item["id"])
+                for document in documents.values()
+                for doc_field in doc_fields
+                for item in document.get(doc_field) or []
+            )
+
+    async def publish(self) -> int:
+        """
+        Публикация накопленных изменений.
+
+        :return int: количество событий.
+        """
+        # Изменения сбрасываются после публикации: при ошибке Redis или ES
+        # они будут опубликованы следующим прогоном (повторный сброс кеша
+        # безвреден).
+        changes = self._changes
+        events = 0
+
+        for index_, fields in sorted(changes.items()):
+            await self._es_client.refresh_index(index_=index_)
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for event in self._get_events(index_=index_, fields=fields):
+                    pipe.xadd(
+                        name=self.STREAM_KEY,
+                        fields=event,
+                        maxlen=config.etl_cache_events_max_len,
+                        approximate=True,
+                    )
+                    events += 1
+
+                await pipe.execute()
+
+        self._changes = {}
+
+        if events:
+            logger.info(
+                f"cache events: published {events} for "
+                f"{', '.join(sorted(changes))}"
+            )
+
+        return events
+
+    @classmethod
+    def _get_events(
+        cls, index_: str, fields: dict[str, set[str]]
+    ) -> list[dict[str, str]]:
+        """События индекса: не больше IDS_PER_EVENT id в поле события."""
+        values = {field_: sorted(ids) for field_, ids in fields.items()}
+        count = max(len(ids) for ids in values.values())
+
+        return [
+            {
+                "index": index_,
+                **{
+                    field_: ",".join(ids[i:i + cls.IDS_PER_EVENT])
+                    for field_, ids in values.items()
+                },
+            }
+            for i in range(0, count, cls.IDS_PER_EVENT)
+        ]
@@ -1,15 +1,21 @@
+import hashlib
 import json
 import os
 
 from core import config
 from core.logger import logger
+from core.metrics import STAGE_ITEMS, STAGING_KEYS, measure_stage_run
+from extract.movies.checkpoint import Checkpoint
 from interface import RedisStorage_T
 from interface.es_client import ESClient_T
+from loader.movies_cache import CacheEvents
+from loader.top_films import TopFilms
 from models.movies.pg_models import Base as BaseModel
 from models.movies.pg_models import FilmWork, Genre, Person
 from schemas.movies_schemas.film_work_models import FilmWorkESModel
 from schemas.movies_schemas.genre_models import GenreModel
 from schemas.movies_schemas.person_models import PersonModel
+from utils.concurrency import get_stage_concurrency, run_bounded
 
 
 class Loader:
@@ -18,6 +24,8 @@ class Loader:
     MODELS_PATH = "models"
     MOVIES_MODELS_PATH = "movies"
     ES_INDICES_PATH = "es_indices"
+    CONTENT_HASH_KEY_TEMPLATE = "es_hash:{model_name}"
+    CONTENT_HASH_DIGEST_SIZE = 8
     CONCAT = 1
 
     def __init__(
@@ -25,10 +33,38 @@ class Loader:
         redis_storage: RedisStorage_T,
         pg_session,
         es_client: ESClient_T,
+        index_names: dict[str, str] | None = None,
     ):
         self._redis_storage: RedisStorage_T = redis_storage
         self._pg_session = pg_session
         self._es_client: ESClient_T = es_client
+        # Явные имена индексов (alias -> индекс), например для пересборки.
+        self._index_names = index_names
+        # Bulk-запросы пачек идут конкурентно в пределах пула соединений ES.
+        self._concurrency = get_stage_concurrency(
+            pool_size=config.elastic_connections_per_node
+        )
+        # Alias, схема которых сверена с json-схемой индекса.
+        self._synced_mappings: set[str] = set()
+        # Предрасчет топа фильмов для movies_service (не для пересборки).
+        self._top_films = (
+            TopFilms(es_client=es_client)
+            if config.etl_top_films_enabled and index_names is None
+            else None
+        )
+        # События для сброса кеша movies_service (не для пересборки: до
+        # переключения alias новые индексы не видны movies_service).
+        self._cache_events = (
+            CacheEvents(es_client=es_client)
+            if config.etl_cache_invalidation_enabled and index_names is None
+            else None
+        )
+
+    async def close(self) -> None:
+        """Закрытие клиентов Redis кеша movies_service."""
+        for helper_ in (self._top_films, self._cache_events):
+            if helper_:
+                await helper_.close()
 
     @property
     def redis_storage(self) -> RedisStorage_T:
@@ -50,6 +86,23 @@ class Loader:
     def get_key_of_rule(model_: BaseModel) -> str:
         return model_.model_name()
 
+    @classmethod
+    def get_content_hash_key(cls, model_name: str) -> str:
+        return cls.CONTENT_HASH_KEY_TEMPLATE.format(model_name=model_name)
+
+    @classmethod
+    def get_content_hash(cls, document: dict) -> str:
+        """Хэш канонического JSON документа ES (blake2b, 8 байт)."""
+        return hashlib.blake2b(
+            json.dumps(
+                document,
+                sort_keys=True,
+                separators=(",", ":"),
+                ensure_ascii=False,
+            ).encode(),
+            digest_size=cls.CONTENT_HASH_DIGEST_SIZE,
+        ).hexdigest()
+
     @staticmethod
     def _get_clear_es_dict(es_model_dict: dict) -> dict:
         es_model_dict.pop("was_enrich", None)
@@ -57,112 +110,294 @@ class Loader:
 
         return es_model_dict
 
-    async def run(self) -> None:
+    @measure_stage_run(stage="loader")
+    async def run(self) -> int:
         """
         Точка запуска. Этапы:
         - Получение из Storage сущности.
         - Проверяем сущность на валидность pydantic-модели.
         - Очистка и сериализация сущности.
-        - Сохранение данных в ES.
+        - Пропуск документов, хэш которых совпадает с хэшем последней
+        загрузки (etl_skip_unchanged_documents).
+        - Сохранение данных в ES пачками (bulk) по etl_movies_bulk_size,
+        пачки загружаются конкурентно (лимит по пулу соединений ES).
+        - Сохранение хэшей загруженных документов.
         - Очистка Storage.
+        - Публикация id загруженных документов для сброса кеша
+        movies_service (CacheEvents).
+        - Пересчет топа фильмов (TopFilms), если загружались film_work.
 
-        :return None:
+        Данные пишутся в alias индекса (при первом запуске создается индекс
+        {alias}_v1 с alias), либо в индексы из index_names.
+
+        :return int: количество обработанных сущностей.
         """
+        load_total = 0
+
         for model_, es_model_cls in self.models.items():
-            load_count = 0
             key_rule = self.get_key_of_rule(model_=model_)
 
-            await self._es_client.create_index_with_ignore(
-                index_=key_rule, body=self._get_es_schema(name=key_rule)
-            )
+            if self._index_names:
+                index_ = self._index_names[key_rule]
+
+            else:
+                index_ = key_rule
+                schema = self.get_es_schema(name=key_rule)
+
+                if await self._es_client.create_index_with_alias(
+                    alias=key_rule, body=schema
+                ):
+                    # Индекс создан заново: хэши прошлых загрузок неактуальны.
+                    await self.redis_storage.shared().delete_(
+                        name=self.get_content_hash_key(model_name=key_rule)
+                    )
+
+                elif schema and key_rule not in self._synced_mappings:
+                    # Новые поля схемы добавляются в существующий индекс
+                    # (документы получат их при следующей загрузке).
+                    await self._es_client.put_mapping(
+                        index_=key_rule, mappings=schema["mappings"]
+                    )
+
+                self._synced_mappings.add(key_rule)
+
             scan_lst = await self.redis_storage.scan_iter(f"{key_rule}_es_*")
+            STAGING_KEYS.labels(stage="loader", model=key_rule).set(
+                len(scan_lst)
+            )
 
             if scan_lst:
                 logger.debug(
                     f"{key_rule}: start load to ES(count: {len(scan_lst)})"
                 )
 
-            for obj_key_rule in scan_lst:
-                obj_id = obj_key_rule.split(f"{key_rule}_es_")[-1]
-                obj_ = await self._get_object_data_by_key_rule(
-                    obj_key_rule=obj_key_rule
-                )
-
-                es_model_dict = es_model_cls(**obj_).model_dump(mode="json")
-
-                if (
-                    es_model_dict
-                    and es_model_dict.get("was_enrich")
-                    and es_model_dict.get("was_convert")
-                ):
-                    result_ = await self._es_client.insert_document(
-                        index_=key_rule,
-                        document=self._get_clear_es_dict(
-                            es_model_dict=es_model_dict
-                        ),
-                        id_=obj_id,
-                    )
-
-                    if result_.get("status") is False:
-                        logger.error(
-                            f"{key_rule}: error insert data(id={obj_id}) in "
-                            f"ES: {result_.get('message')}"
+            load_count = sum(
+                await run_bounded(
+                    coros=[
+                        self._load_batch(
+                            index_=index_,
+                            key_rule=key_rule,
+                            es_model_cls=es_model_cls,
+                            obj_key_rules=scan_lst[
+                                i:i + config.etl_movies_bulk_size
+                            ],
                         )
-                    else:
-                        load_count += self.CONCAT
-                        logger.debug(
-                            f"{key_rule}: id={obj_id}, data was save in ES"
-                        )
-
-                        await self._delete_objects_by_obj_id(
-                            obj_id=obj_id, key_rule=key_rule
+                        for i in range(
+                            0, len(scan_lst), config.etl_movies_bulk_size
                         )
+                    ],
+                    limit=self._concurrency,
+                )
+            )
 
+            load_total += load_count
+            STAGE_ITEMS.labels(stage="loader", model=key_rule).inc(
+                load_count
+            )
             logger.info(
                 f"{key_rule}: was load in ES({load_count} from "
                 f"{len(scan_lst)})"
             )
 
-    async def _get_object_data_by_key_rule(self, obj_key_rule: str) -> dict:
-        obj_data = await self.redis_storage.retrieve_state(key_=obj_key_rule)
-        obj_deserialize_data = json.loads(obj_data)
+            if self._top_films and load_count and model_ is FilmWork:
+                await self._top_films.mark_dirty()
+
+        if self._cache_events:
+            await self._cache_events.publish()
+
+        if self._top_films:
+            await self._top_films.refresh_if_dirty()
 
-        return obj_deserialize_data
+        return load_total
+
+    async def _load_batch(
+        self,
+        index_: str,
+        key_rule: str,
+        es_model_cls,
+        obj_key_rules: list[str],
+    ) -> int:
+        """
+        Подготовка пачки документов из Storage и загрузка ее в ES.
+
+        :param str index_:
+        :param str key_rule:
+        :param es_model_cls: pydantic-модель документа ES.
+        :param list[str] obj_key_rules:
+        :return int: количество загруженных документов.
+        """
+        documents = {}
+
+        for obj_key_rule in obj_key_rules:
+            obj_id = obj_key_rule.split(f"{key_rule}_es_")[-1]
+            obj_ = await self._get_object_data_by_key_rule(
+                obj_key_rule=obj_key_rule
+            )
+
+            es_model_dict = es_model_cls(**obj_).model_dump(mode="json")
+
+            if (
+                es_model_dict
+                and es_model_dict.get("was_enrich")
+                and es_model_dict.get("was_convert")
+            ):
+                documents[obj_id] = self._get_clear_es_dict(
+                    es_model_dict=es_model_dict
+                )
 
-    async def _delete_objects_by_obj_id(
-            self, obj_id: str, key_rule: str
+        return await self._load_documents(
+            index_=index_, key_rule=key_rule, documents=documents
+        )
+
+    async def _load_documents(
+        self, index_: str, key_rule: str, documents: dict[str, dict]
+    ) -> int:
+        """
+        Загрузка пачки документов одним bulk-запросом и очистка Storage от
+        успешно загруженных и неизмененных сущностей. Хэши документов общие
+        для шардов ETL: id документа принадлежит одному шарду.
+
+        :param str index_:
+        :param str key_rule:
+        :param dict[str, dict] documents:
+        :return int: количество загруженных документов.
+        """
+        if not documents:
+            return 0
+
+        hash_storage = self.redis_storage.shared()
+        hash_key = self.get_content_hash_key(model_name=key_rule)
+        content_hashes = {
+            obj_id: self.get_content_hash(document=document)
+            for obj_id, document in documents.items()
+        }
+
+        if config.etl_skip_unchanged_documents:
+            stored_hashes = await hash_storage.hmget_(
+                name=hash_key, keys=list(documents)
+            )
+            unchanged_ids = {
+                obj_id
+                for obj_id, stored_hash in zip(documents, stored_hashes)
+                if stored_hash == content_hashes[obj_id]
+            }
+
+            if unchanged_ids:
+                documents = {
+                    obj_id: document
+                    for obj_id, document in documents.items()
+                    if obj_id not in unchanged_ids
+                }
+                await self._delete_objects_by_obj_ids(
+                    obj_ids=list(unchanged_ids), key_rule=key_rule
+                )
+                logger.info(
+                    f"{key_rule}: ids({len(unchanged_ids)}) not changed, "
+                    f"skip load in ES"
+                )
+
+        if not documents:
+            return 0
+
+        result_ = await self._es_client.insert_documents(
+            index_=index_, documents=documents
+        )
+
+        for obj_id, error in result_["errors"].items():
+            logger.error(
+                f"{key_rule}: error insert data(id={obj_id}) in ES: {error}"
+            )
+
+        if result_["errors"]:
+            await self._fail_documents(
+                key_rule=key_rule, obj_ids=list(result_["errors"])
+            )
+
+        loaded_ids = [
+            obj_id for obj_id in documents if obj_id not in result_["errors"]
+        ]
+        await hash_storage.hset_(
+            name=hash_key,
+            mapping={obj_id: content_hashes[obj_id] for obj_id in loaded_ids},
+        )
+        await self._delete_objects_by_obj_ids(
+            obj_ids=loaded_ids, key_rule=key_rule
+        )
+        logger.debug(
+            f"{key_rule}: ids({len(loaded_ids)}) data was save in ES"
+        )
+
+        if self._cache_events:
+            self._cache_events.add(
+                index_=key_rule,
+                documents={obj_id: documents[obj_id] for obj_id in loaded_ids},
+            )
+
+        return len(loaded_ids)
+
+    async def _fail_documents(self, key_rule: str, obj_ids: list[str]) -> None:
+        """
+        Учет неудачной загрузки документов. Документы, исчерпавшие
+        etl_checkpoint_max_attempts попыток, удаляются из Storage и
+        исключаются из обработки (dead letter), иначе повторяются следующим
+        запуском.
+
+        :param str key_rule:
+        :param list[str] obj_ids:
+        :return None:
+        """
+        checkpoint = Checkpoint(
+            redis_storage=self.redis_storage,
+            es_client=self._es_client,
+            model_name=key_rule,
+        )
+
+        if dead_ids := await checkpoint.fail_(ids=obj_ids):
+            await self._delete_objects_by_obj_ids(
+                obj_ids=dead_ids, key_rule=key_rule
+            )
+            await checkpoint.dead_letter_(ids=dead_ids)
+
+    async def _get_object_data_by_key_rule(self, obj_key_rule: str) -> dict:
+        return await self.redis_storage.retrieve_state(key_=obj_key_rule)
+
+    async def _delete_objects_by_obj_ids(
+            self, obj_ids: list[str], key_rule: str
     ) -> None:
         """
         Удаление объектов из Storage:
         - Удаление обогащенных сущностей.
         - Удаление сущностей, приведенных к нормали для сохранения в ES.
+        - Подтверждение id в пачках checkpoint (документы уже в ES).
 
-        :param str obj_id:
+        :param list[str] obj_ids:
         :param str key_rule:
         :return None:
         """
-        base_name = f"{key_rule}_{obj_id}"
-        await self.redis_storage.delete_(name=base_name)
-        logger.debug(
-            f"{key_rule}: id={obj_id}, BASE data was delete from Storage"
-            # nosec B608
-        )
+        if not obj_ids:
+            return
 
-        es_name = f"{key_rule}_es_{obj_id}"
-        await self.redis_storage.delete_(name=es_name)
+        await self.redis_storage.unstage_(
+            staged_key=self.redis_storage.get_staged_key(model_name=key_rule),
+            ids=obj_ids,
+            names=[f"{key_rule}_{obj_id}" for obj_id in obj_ids]
+            + [f"{key_rule}_es_{obj_id}" for obj_id in obj_ids],
+            pending_key=Checkpoint.get_pending_key(model_name=key_rule),
+        )
         logger.debug(
-            f"{key_rule}: id={obj_id}, ES data was delete from Storage"
-            # nosec B608
+            f"{key_rule}: ids({len(obj_ids)}) BASE and ES data was delete "
+            f"from Storage"
         )
 
-    def _get_es_schema(self, name: str):
+    @classmethod
+    def get_es_schema(cls, name: str) -> dict | None:
         try:
             with open(
                 os.path.join(
                     config.base_dir,
-                    self.MODELS_PATH,
-                    self.MOVIES_MODELS_PATH,
-                    self.ES_INDICES_PATH,
+                    cls.MODELS_PATH,
+                    cls.MOVIES_MODELS_PATH,
+                    cls.ES_INDICES_PATH,
                     f"{name}.json"
                 ),
                 "r",
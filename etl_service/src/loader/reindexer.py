@@ -0,0 +1,238 @@
+import copy
+
+from core import config
+from core.logger import logger
+from extract.movies.enricher import Enricher
+from extract.movies.fan_out import FanOut
+from extract.movies.producer import Producer
+from interface import ESClient_T, RedisStorage_T
+from loader.movies_loader import Loader
+from loader.top_films import TopFilms
+from models.movies.pg_models import FilmWork, Genre, Person
+from transfer.movies.convertor import Convertor
+from utils import ReindexError
+
+
+class Reindexer:
+    """
+    Класс по полной пересборке индексов ES (blue/green):
+    - Создание версионных индексов {alias}_v{N} с профилем загрузки
+    (refresh_interval=-1, number_of_replicas=0).
+    - Загрузка всех данных из DB через этапы ETL в отдельном Storage.
+    - Восстановление настроек индексов, refresh и forcemerge.
+    - Атомарное переключение alias, из которых читает movies_service.
+    - Догоняющий прогон изменений, сделанных во время пересборки.
+    """
+
+    BULK_LOAD_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+    STAGING_KEY_TEMPLATE = "{alias}_*"
+
+    def __init__(
+        self,
+        redis_storage: RedisStorage_T,
+        pg_session,
+        es_client: ESClient_T,
+    ):
+        # Storage должен быть отдельным от рабочего ETL: он очищается.
+        self._redis_storage: RedisStorage_T = redis_storage
+        self._pg_session = pg_session
+        self._es_client: ESClient_T = es_client
+
+    @property
+    def aliases(self) -> list[str]:
+        return [
+            model_.model_name() for model_ in (FilmWork, Person, Genre)
+        ]
+
+    async def run(self, keep_old: bool = False) -> None:
+        """
+        Точка запуска. Этапы:
+        - Очистка Storage пересборки.
+        - Создание новых версионных индексов с профилем загрузки.
+        - Прогон этапов ETL до полной выгрузки данных в новые индексы.
+        - Восстановление настроек, refresh и forcemerge новых индексов.
+        - Атомарное переключение alias и удаление старых индексов.
+        - Догоняющий прогон (в т.ч. распространение изменений персон и
+        жанров) уже через alias.
+
+        :param bool keep_old: не удалять старые индексы.
+        :return None:
+        """
+        await self._redis_storage.flush_db_()
+        new_indices = {}
+
+        try:
+            for alias in self.aliases:
+                new_indices[alias] = await self._create_new_index(alias=alias)
+
+            await self._load(index_names=new_indices)
+
+            for alias, new_index in new_indices.items():
+                await self._restore_settings(alias=alias, index_=new_index)
+
+        except Exception:
+            logger.error(
+                f"reindex: failed, new indices {list(new_indices.values())} "
+                f"was delete, aliases was not change"
+            )
+            await self._es_client.delete_indices(
+                indices=list(new_indices.values())
+            )
+            raise
+
+        for alias, new_index in new_indices.items():
+            await self._switch_alias(
+                alias=alias, new_index=new_index, keep_old=keep_old
+            )
+
+        # Изменения персон и жанров, накопленные за время пересборки, уже
+        # учтены в новых индексах.
+        await self._redis_storage.delete_(
+            names=[
+                FanOut.FAN_OUT_KEY_TEMPLATE.format(model_name=alias)
+                for alias in self.aliases
+            ]
+        )
+        # Топ фильмов movies_service пересчитывается уже по новым индексам.
+        if config.etl_top_films_enabled:
+            top_films = TopFilms(es_client=self._es_client)
+
+            try:
+                await top_films.mark_dirty()
+
+            finally:
+                await top_films.close()
+
+        await self._load(index_names=None)
+        await self._redis_storage.flush_db_()
+
+        logger.info(f"reindex: done ({new_indices})")
+
+    async def _create_new_index(self, alias: str) -> str:
+        versions = await self._es_client.get_version_indices(alias=alias)
+        new_index = self._es_client.get_version_index_name(
+            alias=alias, version=max(versions.values(), default=0) + 1
+        )
+
+        body = copy.deepcopy(Loader.get_es_schema(name=alias) or {})
+        body.setdefault("settings", {}).update(self.BULK_LOAD_SETTINGS)
+
+        await self._es_client.create_index(index_=new_index, body=body)
+        logger.info(f"reindex: {alias}, index {new_index} was create")
+
+        return new_index
+
+    async def _load(self, index_names: dict[str, str] | None) -> None:
+        """
+        Прогон этапов ETL до тех пор, пока watermark двигаются. Watermark
+        в Storage пересборки нет, поэтому выборка начинается с самой ранней
+        записи в DB.
+
+        :param dict[str, str] | None index_names: alias -> индекс, None -
+        загрузка через alias (с распространением изменений на film_work).
+        :return None:
+        """
+        stages = [
+            Producer(
+                self._redis_storage,
+                self._pg_session,
+                self._es_client,
+                force_poll=True,
+                stream=True,
+                checkpoint=False,
+            ),
+            Enricher(self._redis_storage, self._pg_session, self._es_client),
+            Convertor(self._redis_storage, self._pg_session, self._es_client),
+            Loader(
+                self._redis_storage,
+                self._pg_session,
+                self._es_client,
+                index_names=index_names,
+            ),
+        ]
+
+        if index_names is None:
+            stages.insert(
+                1,
+                FanOut(self._redis_storage, self._pg_session, self._es_client),
+            )
+
+        watermarks, need_run = await self._get_watermarks(), True
+
+        try:
+            while need_run:
+                for stage in stages:
+                    await stage.run()
+
+                prev_watermarks, watermarks = (
+                    watermarks, await self._get_watermarks()
+                )
+                need_run = prev_watermarks != watermarks
+
+        finally:
+            for stage in stages:
+                if close := getattr(stage, "close", None):
+                    await close()
+
+        if staged_keys := await self._get_staged_keys():
+            raise ReindexError(message=(
+                f"reindex: entities({len(staged_keys)}) was not load in ES"
+            ))
+
+    async def _get_watermarks(self) -> list:
+        return [
+            await self._redis_storage.get_(name=alias)
+            for alias in self.aliases
+        ]
+
+    async def _get_staged_keys(self) -> list[str]:
+        staged_keys = []
+
+        for alias in self.aliases:
+            staged_keys.extend(
+                await self._redis_storage.scan_iter(
+                    self.STAGING_KEY_TEMPLATE.format(alias=alias)
+                )
+            )
+
+        return staged_keys
+
+    async def _restore_settings(self, alias: str, index_: str) -> None:
+        schema_settings = (Loader.get_es_schema(name=alias) or {}).get(
+            "settings", {}
+        )
+        await self._es_client.put_settings(
+            index_=index_,
+            settings={
+                "refresh_interval": schema_settings.get(
+                    "refresh_interval", config.etl_reindex_refresh_interval
+                ),
+                "number_of_replicas": schema_settings.get(
+                    "number_of_replicas",
+                    config.etl_reindex_number_of_replicas,
+                ),
+            },
+        )
+        await self._es_client.refresh_and_forcemerge(index_=index_)
+        logger.info(f"reindex: {alias}, index {index_} settings was restore")
+
+    async def _switch_alias(
+        self, alias: str, new_index: str, keep_old: bool
+    ) -> None:
+        old_indices = await self._es_client.get_alias_indices(alias=alias)
+        is_concrete_index = await self._es_client.is_concrete_index(
+            index_=alias
+        )
+
+        await self._es_client.swap_alias(
+            alias=alias,
+            new_index=new_index,
+            old_indices=old_indices,
+            remove_concrete_index=is_concrete_index,
+        )
+        logger.info(
+            f"reindex: {alias}, alias was switch {old_indices} -> {new_index}"
+        )
+
+        if not keep_old:
+            await self._es_client.delete_indices(indices=old_indices)
@@ -0,0 +1,210 @@
+import json
+
+from redis.asyncio import Redis
+
+from core import config
+from core.logger import logger
+from interface.es_client import ESClient_T
+from loader.movies_cache import create_movies_cache_redis
+from models.movies.pg_models import FilmWork
+from utils.concurrency import get_stage_concurrency, run_bounded
+
+__all__ = ["TopFilms"]
+
+
+class TopFilms:
+    """
+    Предрасчет первых страниц списка фильмов по рейтингу (sort=-imdb_rating)
+    для movies_service: общий и по каждому жанру. Хранится в Redis кеша
+    movies_service (redis_db_movies_cache):
+    - top_films:{genre_id | all} - sorted set id фильмов, score - значение
+    сортировки ES со знаком минус (порядок ZRANGE совпадает с сортировкой
+    ES "imdb_rating desc, id asc", score годится для search_after);
+    - top_films:docs - hash id -> JSON полей FilmBase (id, title,
+    imdb_rating);
+    - top_films:genres - множество жанров, для которых есть sorted set.
+
+    Loader помечает данные устаревшими (dirty) после загрузки film_work;
+    пересчет выполняет не чаще etl_top_films_refresh_interval_sec один
+    воркер ETL (lock в Redis).
+    """
+
+    KEY_TEMPLATE = "top_films:{genre}"
+    ALL_GENRES = "all"
+    DOCS_KEY = "top_films:docs"
+    GENRES_KEY = "top_films:genres"
+    DIRTY_KEY = "top_films:dirty"
+    LOCK_KEY = "top_films:lock"
+    SOURCE_FIELDS = ["id", "title", "imdb_rating"]
+
+    def __init__(self, es_client: ESClient_T, redis_: Redis | None = None):
+        self._es_client: ESClient_T = es_client
+        self._redis = redis_
+        self._own_redis = redis_ is None
+        self._concurrency = get_stage_concurrency(
+            pool_size=config.elastic_connections_per_node
+        )
+
+    @property
+    def redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = create_movies_cache_redis()
+
+        return self._redis
+
+    async def close(self) -> None:
+        """Закрытие клиента Redis, созданного экземпляром."""
+        if self._redis is not None and self._own_redis:
+            await self._redis.close()
+            self._redis = None
+
+    @classmethod
+    def get_key(cls, genre: str) -> str:
+        return cls.KEY_TEMPLATE.format(genre=genre)
+
+    async def mark_dirty(self) -> None:
+        await self.redis.set(name=self.DIRTY_KEY, value=1)
+
+    async def refresh_if_dirty(self) -> bool:
+        """
+        Пересчет, если данные помечены устаревшими и пересчет не выполнялся
+        последние etl_top_films_refresh_interval_sec.
+
+        :return bool: пересчет выполнен.
+        """
+        if not await self.redis.exists(self.DIRTY_KEY) or not (
+            await self.redis.set(
+                name=self.LOCK_KEY,
+                value=1,
+                nx=True,
+                ex=config.etl_top_films_refresh_interval_sec,
+            )
+        ):
+            return False
+
+        # Загрузки во время пересчета снова пометят данные устаревшими.
+        await self.redis.delete(self.DIRTY_KEY)
+
+        try:
+            await self.refresh()
+
+        except Exception:
+            # Пересчет повторяется следующим прогоном, не дожидаясь
+            # истечения интервала.
+            await self.mark_dirty()
+            await self.redis.delete(self.LOCK_KEY)
+            raise
+
+        return True
+
+    async def refresh(self) -> None:
+        index_ = FilmWork.model_name()
+        await self._es_client.refresh_index(index_=index_)
+
+        genres = await self._get_genres(index_=index_)
+        top_lists = await run_bounded(
+            coros=[
+                self._get_top(index_=index_, genre=genre)
+                for genre in [None, *genres]
+            ],
+            limit=self._concurrency,
+        )
+        previous_genres = await self.redis.smembers(self.GENRES_KEY)
+        docs = {}
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(
+                self.DOCS_KEY,
+                self.GENRES_KEY,
+                *[
+                    self.get_key(genre=genre)
+                    for genre in set(previous_genres) - set(genres)
+                ],
+            )
+
+            for genre, hits in zip([self.ALL_GENRES, *genres], top_lists):
+                key_ = self.get_key(genre=genre)
+                pipe.delete(key_)
+
+                if hits:
+                    pipe.zadd(
+                        key_,
+                        {hit["_id"]: -hit["sort"][0] for hit in hits},
+                    )
+
+                for hit in hits:
+                    docs[hit["_id"]] = json.dumps(
+                        hit["_source"], separators=(",", ":")
+                    )
+
+            if genres:
+                pipe.sadd(self.GENRES_KEY, *genres)
+
+            if docs:
+                pipe.hset(self.DOCS_KEY, mapping=docs)
+
+            await pipe.execute()
+
+        logger.info(
+            f"top films: refresh for {len(genres)} genres, "
+            f"{len(docs)} films"
+        )
+
+    async def _get_genres(self, index_: str) -> list[str]:
+        response_ = await self._es_client.search_documents(
+            index_=index_,
+            body={
+                "size": 0,
+                "aggs": {
+                    "genres": {
+                        "nested": {"path": "genres"},
+                        "aggs": {
+                            "ids": {
+                                "terms": {
+                                    "field": "genres.id",
+                                    "size": config.etl_top_films_max_genres,
+                                }
+                            }
+                        },
+                    }
+                },
+            },
+        )
+        buckets = (
+            response_.get("aggregations", {})
+            .get("genres", {})
+            .get("ids", {})
+            .get("buckets", [])
+        )
+
+        return [bucket["key"] for bucket in buckets]
+
+    async def _get_top(self, index_: str, genre: str | None) -> list[dict]:
+        """
+        Первые etl_top_films_size фильмов с рейтингом, в порядке
+        movies_service (imdb_rating desc, id asc).
+        """
+        filter_ = [{"exists": {"field": "imdb_rating"}}]
+
+        if genre:
+            filter_.append({
+                "nested": {
+                    "path": "genres",
+                    "query": {"term": {"genres.id": genre}},
+                }
+            })
+
+        response_ = await self._es_client.search_documents(
+            index_=index_,
+            body={
+                "query": {"bool": {"filter": filter_}},
+                "sort": [
+                    {"imdb_rating": {"order": "desc"}},
+                    {"id": "asc"},
+                ],
+                "size": config.etl_top_films_size,
+                "_source": self.SOURCE_FIELDS,
+            },
+        )
+
+        return response_.get("hits", {}).get("hits", [])
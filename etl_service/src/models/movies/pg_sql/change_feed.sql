@@ -0,0 +1,50 @@
+-- Change feed для ETL: уведомления (NOTIFY) об изменениях записей контента.
+-- Payload содержит только идентификаторы (лимит NOTIFY - 8000 байт).
+
+CREATE OR REPLACE FUNCTION content.etl_notify_change() RETURNS trigger AS $$
+DECLARE
+    rec jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := to_jsonb(OLD);
+    ELSE
+        rec := to_jsonb(NEW);
+    END IF;
+
+    PERFORM pg_notify(
+        TG_ARGV[0],
+        json_build_object(
+            'table', TG_TABLE_NAME,
+            'op', TG_OP,
+            'id', rec ->> 'id',
+            'film_work_id', rec ->> 'film_work_id',
+            'person_id', rec ->> 'person_id',
+            'genre_id', rec ->> 'genre_id'
+        )::text
+    );
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    table_name text;
+BEGIN
+    FOREACH table_name IN ARRAY ARRAY[
+        'film_work', 'person', 'genre', 'person_film_work', 'genre_film_work'
+    ]
+    LOOP
+        EXECUTE format(
+            'DROP TRIGGER IF EXISTS etl_notify_change ON content.%I',
+            table_name
+        );
+        EXECUTE format(
+            'CREATE TRIGGER etl_notify_change '
+            'AFTER INSERT OR UPDATE OR DELETE ON content.%I '
+            'FOR EACH ROW EXECUTE FUNCTION content.etl_notify_change(%L)',
+            table_name, '{channel}'
+        );
+    END LOOP;
+END;
+$$;
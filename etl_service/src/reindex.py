@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+
+from core import config
+from db.postgres_session import pg_scoped_session
+from interface import RedisContextManager, es_context_manager
+from loader.reindexer import Reindexer
+
+
+async def reindex(keep_old: bool) -> None:
+    async with (
+        RedisContextManager(
+            redis_db=config.redis_db_movies_reindex
+        ) as redis_storage,
+        pg_scoped_session.context_session() as pg_session,
+        es_context_manager as es_client,
+    ):
+        await Reindexer(redis_storage, pg_session, es_client).run(
+            keep_old=keep_old
+        )
+
+
+if __name__ == "__main__":
+    """
+    Точка входа. Полная пересборка индексов ES сервиса Кинотеатр в новые
+    версионные индексы с атомарным переключением alias (blue/green).
+    Рабочий ETL (run.py) при этом не останавливается. Индекс, созданный
+    ранее без alias, удаляется при переключении.
+    """
+    parser = argparse.ArgumentParser(
+        description="Full blue/green reindex of movies ES indices"
+    )
+    parser.add_argument(
+        "--keep-old",
+        action="store_true",
+        help="do not delete previous versioned indices after alias swap",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(reindex(keep_old=args.keep_old))
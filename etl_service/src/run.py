@@ -1,17 +1,48 @@
 import asyncio
+import multiprocessing
 
+from core import config
+from core.logger import logger
+from core.metrics import start_metrics_server
 from scheduler import MoviesETLScheduler
 
 
+def run_movies_worker(worker_number: int = 0) -> None:
+    # Каждый процесс отдает свои метрики на etl_metrics_port + номер воркера.
+    start_metrics_server(port=config.etl_metrics_port + worker_number)
+    asyncio.run(MoviesETLScheduler.run())
+
+
 if __name__ == "__main__":
     """
     Точка входа. Запуск планировщиков ETL-событий:
-    - MoviesETLScheduler: ETL-обработчиков для сервиса Кинотеатр.
+    - MoviesETLScheduler: ETL-обработчиков для сервиса Кинотеатр. Запускается
+    etl_workers_count процессов, каждый захватывает свой шард из
+    etl_shards_count (шарды распределяются и между репликами сервиса).
     - EventsETLScheduler: ETL-обработчиков для сервиса генерации контента
     пользователем (UGC).
     """
-    current_loop = asyncio.get_event_loop()
+    if config.etl_shards_count > config.etl_workers_count:
+        logger.warning(
+            f"ETL_SHARDS_COUNT({config.etl_shards_count}) > "
+            f"ETL_WORKERS_COUNT({config.etl_workers_count}): if there are "
+            f"not enough replicas, shards are processed in turn (every "
+            f"ETL_SHARD_ROTATE_SEC({config.etl_shard_rotate_sec}))"
+        )
+
+    if config.etl_workers_count > 1:
+        workers = [
+            multiprocessing.Process(
+                target=run_movies_worker, args=(worker_number,)
+            )
+            for worker_number in range(config.etl_workers_count)
+        ]
+
+        for worker in workers:
+            worker.start()
 
-    current_loop.run_until_complete(MoviesETLScheduler.run())
+        for worker in workers:
+            worker.join()
 
-    current_loop.run_forever()
+    else:
+        run_movies_worker()
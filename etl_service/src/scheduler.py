@@ -1,80 +1,189 @@
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+import asyncio
+import contextlib
+import os
+import socket
+import time
 
 from core import config
+from core.logger import logger
 from db.postgres_session import pg_scoped_session
+from extract.movies.change_feed import ChangeFeedListener
 from extract.movies.enricher import Enricher as MoviesEnricher
+from extract.movies.fan_out import FanOut as MoviesFanOut
 from extract.movies.producer import Producer as MoviesProducer
 from interface import RedisContextManager, es_context_manager
 from loader.movies_loader import Loader as MoviesLoader
+from schemas.shard import ShardModel
 from transfer.movies.convertor import Convertor as MoviesConvertor
 from utils.abstract import ETLSchedulerInterface
+from utils.stage_chain import StageChain
 
 
 class MoviesETLScheduler(ETLSchedulerInterface):
     """Планировщик ETL-событий для сервиса 'Movies' (movies_service)."""
 
+    LEASE_KEY_TEMPLATE = "lease:etl_movies:shard:{number}"
+
+    change_feed_listener: ChangeFeedListener | None = None
+
     @classmethod
     def jobs(cls) -> list[dict]:
+        """Этапы ETL в порядке цепочки (StageChain)."""
         return [
-            {
-                "cls_job": MoviesProducer,
-                "job_params": {
-                    "trigger": config.etl_task_trigger,
-                    "seconds": config.etl_movies_task_interval_sec,
-                    "coalesce": True,
-                    "max_instances": 1,
-                    "misfire_grace_time": None,
-                },
-            },
-            {
-                "cls_job": MoviesEnricher,
-                "job_params": {
-                    "trigger": config.etl_task_trigger,
-                    "seconds": config.etl_movies_task_interval_sec,
-                    "coalesce": True,
-                    "max_instances": 1,
-                    "misfire_grace_time": None,
-                },
-            },
-            {
-                "cls_job": MoviesConvertor,
-                "job_params": {
-                    "trigger": config.etl_task_trigger,
-                    "seconds": config.etl_movies_task_interval_sec,
-                    "coalesce": True,
-                    "max_instances": 1,
-                    "misfire_grace_time": None,
-                },
-            },
-            {
-                "cls_job": MoviesLoader,
-                "job_params": {
-                    "trigger": config.etl_task_trigger,
-                    "seconds": config.etl_movies_task_interval_sec,
-                    "coalesce": True,
-                    "max_instances": 1,
-                    "misfire_grace_time": None,
-                },
-            },
+            {"cls_job": MoviesProducer, "sharded": True},
+            {"cls_job": MoviesFanOut},
+            {"cls_job": MoviesEnricher},
+            {"cls_job": MoviesConvertor},
+            {"cls_job": MoviesLoader},
         ]
 
+    @classmethod
+    def get_lease_key(cls, number: int) -> str:
+        return cls.LEASE_KEY_TEMPLATE.format(number=number)
+
     @classmethod
     async def run(cls) -> None:
-        scheduler_ = AsyncIOScheduler()
+        """
+        Воркер захватывает свободный шард (lease в Redis) и запускает на нем
+        цепочку этапов ETL. Шард - сущности с
+        hash(id) % etl_shards_count == номер, со своими watermark и ключами
+        Storage. Если lease потерян, цепочка останавливается, и воркер снова
+        ждет свободный шард. Если есть шард без lease (шардов больше, чем
+        воркеров), воркер через etl_shard_rotate_sec уступает свой шард и
+        берет следующий по кругу: все шарды обрабатываются по очереди.
+
+        :return None:
+        """
+        token = f"{socket.gethostname()}:{os.getpid()}"
+        start_number = 0
+
+        async with RedisContextManager(
+            redis_db=config.redis_db_movies
+        ) as lease_storage:
+            while True:
+                shard = await cls._acquire_shard(
+                    lease_storage=lease_storage,
+                    token=token,
+                    start_number=start_number,
+                )
+                start_number = shard.number + 1
+
+                try:
+                    await cls._run_shard(
+                        shard=shard, lease_storage=lease_storage, token=token
+                    )
+
+                finally:
+                    await lease_storage.release_lease_(
+                        name=cls.get_lease_key(number=shard.number),
+                        token=token,
+                    )
+
+    @classmethod
+    async def _acquire_shard(
+        cls, lease_storage, token: str, start_number: int = 0
+    ) -> ShardModel:
+        count = config.etl_shards_count
+
+        while True:
+            for i in range(count):
+                number = (start_number + i) % count
+
+                if await lease_storage.acquire_lease_(
+                    name=cls.get_lease_key(number=number),
+                    token=token,
+                    ttl=config.etl_shard_lease_ttl_sec,
+                ):
+                    return ShardModel(number=number, count=count)
+
+            logger.debug(f"{token}: all ETL shards are busy, wait")
+            await asyncio.sleep(config.etl_shard_lease_ttl_sec / 3)
+
+    @classmethod
+    async def _has_free_shard(cls, lease_storage) -> bool:
+        return await lease_storage.count_leases_(
+            names=[
+                cls.get_lease_key(number=number)
+                for number in range(config.etl_shards_count)
+            ]
+        ) < config.etl_shards_count
+
+    @classmethod
+    async def _run_shard(
+        cls, shard: ShardModel, lease_storage, token: str
+    ) -> None:
+        lease_key = cls.get_lease_key(number=shard.number)
 
         async with (
             RedisContextManager(
-                redis_db=config.redis_db_movies
+                redis_db=config.redis_db_movies, namespace=shard.namespace
             ) as redis_storage,
             pg_scoped_session.context_session() as pg_session,
             es_context_manager as es_client,
         ):
-            for job_ in cls.jobs():
-                scheduler_.add_job(
-                    func=job_["cls_job"](
-                        redis_storage, pg_session, es_client
-                    ).run,
-                    **job_["job_params"]
+            stages = [
+                job_["cls_job"](
+                    redis_storage,
+                    pg_session,
+                    es_client,
+                    **({"shard": shard} if job_.get("sharded") else {}),
                 )
+                for job_ in cls.jobs()
+            ]
+            stage_chain = StageChain(
+                stages=stages,
+                idle_interval_sec=config.etl_movies_task_interval_sec,
+                has_backlog=stages[0].has_backlog,
+            )
+            stage_chain_task = asyncio.create_task(stage_chain.run())
+            logger.info(
+                f"{token}: ETL shard {shard.number} of {shard.count} started"
+            )
+
+            if config.etl_change_feed_enabled:
+                cls.change_feed_listener = ChangeFeedListener(
+                    redis_storage=redis_storage,
+                    on_change=stage_chain.wake_up,
+                    shard=shard,
+                )
+                await cls.change_feed_listener.start()
+
+            started = time.monotonic()
+
+            try:
+                while await lease_storage.renew_lease_(
+                    name=lease_key,
+                    token=token,
+                    ttl=config.etl_shard_lease_ttl_sec,
+                ):
+                    await asyncio.sleep(config.etl_shard_lease_ttl_sec / 3)
+
+                    if time.monotonic() - started >= (
+                        config.etl_shard_rotate_sec
+                    ) and await cls._has_free_shard(
+                        lease_storage=lease_storage
+                    ):
+                        logger.info(
+                            f"{token}: ETL shard {shard.number} released "
+                            f"for the free shard"
+                        )
+                        break
+
+                else:
+                    logger.warning(
+                        f"{token}: lease of ETL shard {shard.number} was lost"
+                    )
+
+            finally:
+                stage_chain_task.cancel()
+
+                with contextlib.suppress(asyncio.CancelledError):
+                    await stage_chain_task
+
+                if cls.change_feed_listener:
+                    await cls.change_feed_listener.stop()
+                    cls.change_feed_listener = None
 
-            scheduler_.start()
+                for stage in stages:
+                    if close := getattr(stage, "close", None):
+                        await close()
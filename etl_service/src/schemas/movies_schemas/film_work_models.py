@@ -34,6 +34,8 @@ class FilmWorkESModel(Base):
     imdb_rating: float
     genres: list[dict[str, str | UUID]]
     title: str
+    # None - документ подготовлен до появления поля (staging прошлой версии)
+    title_suggest: Optional[dict[str, list[str] | int]] = None
     description: str
     directors_names: list[str]
     actors_names: list[str]
@@ -0,0 +1,47 @@
+import hashlib
+from typing import ClassVar
+from uuid import UUID
+
+from pydantic import BaseModel
+
+__all__ = ["ShardModel"]
+
+
+class ShardModel(BaseModel):
+    """
+    Шард ETL: воркер обрабатывает сущности, у которых
+    hash(id) % count == number. Хэш совпадает с shard_condition на стороне DB
+    (первые 7 hex-символов md5 от id).
+    """
+
+    HASH_HEX_LENGTH: ClassVar[int] = 7
+    NAMESPACE_TEMPLATE: ClassVar[str] = "shard:{number}:"
+
+    number: int = 0
+    count: int = 1
+
+    @property
+    def is_single(self) -> bool:
+        return self.count <= 1
+
+    @property
+    def namespace(self) -> str:
+        """Префикс ключей Storage шарда (без префикса для одного шарда)."""
+        if self.is_single:
+            return ""
+
+        return self.NAMESPACE_TEMPLATE.format(number=self.number)
+
+    @classmethod
+    def get_hash(cls, id_: str | UUID) -> int:
+        return int(
+            hashlib.md5(
+                str(id_).encode(), usedforsecurity=False
+            ).hexdigest()[:cls.HASH_HEX_LENGTH],
+            16,
+        )
+
+    def owns(self, id_: str | UUID) -> bool:
+        return self.is_single or self.get_hash(id_=id_) % self.count == (
+            self.number
+        )
@@ -0,0 +1,25 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+__all__ = ["WatermarkModel", "CheckpointBatchModel"]
+
+
+class WatermarkModel(BaseModel):
+    """
+    Составной курсор (modified, id) для keyset-пагинации по модели DB.
+    Если id не задан - выборка начинается с modified включительно.
+    """
+
+    modified: datetime
+    id: UUID | None = None
+
+
+class CheckpointBatchModel(BaseModel):
+    """
+    Пачка выборки Producer: id сущностей и watermark после последней из них.
+    """
+
+    ids: list[str]
+    watermark: WatermarkModel
@@ -1,72 +1,105 @@
-from schemas.movies_schemas.film_work_models import (FilmWorkESModel,
-                                                     FilmWorkModel)
+from schemas.movies_schemas.film_work_models import FilmWorkESModel
 from utils.movies_utils.etl_enum import PersonRoles
 
 
 class FilmWorkRules:
 
+    # Роль персоны -> (поле имен, поле объектов) документа film_work.
+    ROLE_FIELDS = {
+        PersonRoles.DIRECTOR.value: ("directors_names", "directors"),
+        PersonRoles.ACTOR.value: ("actors_names", "actors"),
+        PersonRoles.WRITER.value: ("writers_names", "writers"),
+    }
+    # Окончания названия (с начала слова), по которым ищет подсказка.
+    SUGGEST_MAX_INPUTS = 5
+
     @classmethod
-    async def film_work_transformation_data_rule(cls, obj_data: dict):
-        film_work_model = FilmWorkModel(**obj_data)
+    def film_work_denormalized_data_rule(
+        cls, persons: list[dict], genres: list[dict]
+    ) -> dict:
+        """
+        Поля документа film_work, денормализованные из персон и жанров.
+        Используются как при полной конвертации, так и для частичного
+        обновления документа (fan-out изменений персон и жанров). Персоны
+        раскладываются по ролям за один проход.
 
-        film_work_es_model = FilmWorkESModel(
-            id=film_work_model.id,
-            imdb_rating=(
-                film_work_model.imdb_rating
-                if film_work_model.imdb_rating is not None
-                else 0.0
-            ),
-            genres=[
-                {
-                    "id": genre.id,
-                    "name": genre.name if genre.name else "",
-                }
-                for genre in film_work_model.genres
-            ],
-            title=film_work_model.title if film_work_model.title else "",
-            description=film_work_model.description or "",
-            directors_names=[
-                person.full_name
-                for person in film_work_model.persons
-                if person.role == PersonRoles.DIRECTOR.value
-            ],
-            actors_names=[
-                person.full_name
-                for person in film_work_model.persons
-                if person.role == PersonRoles.ACTOR.value
-            ],
-            writers_names=[
-                person.full_name
-                for person in film_work_model.persons
-                if person.role == PersonRoles.WRITER.value
-            ],
-            directors=[
-                {
-                    "id": person.id,
-                    "full_name": person.full_name if person.full_name else "",
-                }
-                for person in film_work_model.persons
-                if person.role == PersonRoles.DIRECTOR.value
+        :param list[dict] persons: персоны в формате PersonModel.
+        :param list[dict] genres: жанры в формате GenreModel.
+        :return dict:
+        """
+        document = {
+            "genres": [
+                {"id": genre["id"], "name": genre["name"] or ""}
+                for genre in genres
             ],
-            actors=[
-                {
-                    "id": person.id,
-                    "full_name": person.full_name if person.full_name else "",
-                }
-                for person in film_work_model.persons
-                if person.role == PersonRoles.ACTOR.value
-            ],
-            writers=[
-                {
-                    "id": person.id,
-                    "full_name": person.full_name if person.full_name else "",
-                }
-                for person in film_work_model.persons
-                if person.role == PersonRoles.WRITER.value
+        }
+
+        for names_field, objects_field in cls.ROLE_FIELDS.values():
+            document[names_field], document[objects_field] = [], []
+
+        for person in persons:
+            if role_fields := cls.ROLE_FIELDS.get(person["role"]):
+                names_field, objects_field = role_fields
+                full_name = person["full_name"] or ""
+
+                document[names_field].append(full_name)
+                document[objects_field].append(
+                    {"id": person["id"], "full_name": full_name}
+                )
+
+        return document
+
+    @classmethod
+    def film_work_suggest_rule(cls, title: str, imdb_rating: float) -> dict:
+        """
+        Поле title_suggest (completion suggester): название целиком и его
+        окончания, начиная с каждого следующего слова (до
+        SUGGEST_MAX_INPUTS), чтобы подсказка находила фильм по началу любого
+        слова названия. Вес - рейтинг (выше рейтинг - выше в подсказках).
+
+        :param str title:
+        :param float imdb_rating:
+        :return dict:
+        """
+        words = title.split()
+
+        return {
+            "input": [
+                " ".join(words[i:])
+                for i in range(min(len(words), cls.SUGGEST_MAX_INPUTS))
             ],
-        )
+            "weight": max(round(imdb_rating * 10), 0),
+        }
+
+    @classmethod
+    async def film_work_transformation_data_rule(
+        cls, obj_data: dict
+    ) -> FilmWorkESModel:
+        """
+        Документ ES строится напрямую из обогащенных данных Storage и
+        валидируется один раз (FilmWorkESModel).
 
-        film_work_es_model.was_enrich = True
-        film_work_es_model.was_convert = True
+        :param dict obj_data: данные в формате FilmWorkModel.
+        :return FilmWorkESModel:
+        """
+        imdb_rating = obj_data.get("imdb_rating")
+        imdb_rating = imdb_rating if imdb_rating is not None else 0.0
+        title = obj_data.get("title") or ""
 
-        return film_work_es_model
+        return FilmWorkESModel.model_validate(
+            {
+                "id": obj_data["id"],
+                "imdb_rating": imdb_rating,
+                "title": title,
+                "title_suggest": cls.film_work_suggest_rule(
+                    title=title, imdb_rating=imdb_rating
+                ),
+                "description": obj_data.get("description") or "",
+                **cls.film_work_denormalized_data_rule(
+                    persons=obj_data.get("persons") or [],
+                    genres=obj_data.get("genres") or [],
+                ),
+                "was_enrich": True,
+                "was_convert": True,
+            }
+        )
@@ -1,6 +1,5 @@
-import json
-
 from core.logger import logger
+from core.metrics import STAGE_ITEMS, STAGING_KEYS, measure_stage_run
 from interface import ESClient_T, RedisStorage_T
 from models.movies.pg_models import Base as BaseModel
 from models.movies.pg_models import FilmWork, Genre, Person
@@ -44,7 +43,8 @@ class Convertor:
     def get_key_of_rule(model_: BaseModel) -> str:
         return model_.model_name()
 
-    async def run(self) -> None:
+    @measure_stage_run(stage="convertor")
+    async def run(self) -> int:
         """
         Точка запуска. Этапы:
         - Получение из Storage сущности.
@@ -52,12 +52,17 @@ class Convertor:
         данных.
         - Сохранение валидных для схемы индекса ES данных в Storage.
 
-        :return None:
+        :return int: количество обработанных сущностей.
         """
+        convert_total = 0
+
         for model_, transformation_rule in self.model_rules.items():
             convert_count = 0
             key_rule = self.get_key_of_rule(model_=model_)
             scan_lst = await self.redis_storage.scan_iter(f"{key_rule}_*")
+            STAGING_KEYS.labels(stage="convertor", model=key_rule).set(
+                len(scan_lst)
+            )
 
             if scan_lst:
                 logger.info(
@@ -88,18 +93,19 @@ class Convertor:
                         f"{key_rule}: id={obj_id}, enrich data was convert"
                     )
 
+            convert_total += convert_count
+            STAGE_ITEMS.labels(stage="convertor", model=key_rule).inc(
+                convert_count
+            )
             logger.info(
                 f"{key_rule}: enrich data was convert({convert_count} from "
                 f"{len(scan_lst)})"
             )
 
-    async def _get_object_data_by_key_rule(self, obj_key_rule: str) -> dict:
-        if obj_data := await self.redis_storage.retrieve_state(
-                key_=obj_key_rule
-        ):
-            obj_deserialize_data = json.loads(obj_data)
+        return convert_total
 
-            return obj_deserialize_data
+    async def _get_object_data_by_key_rule(self, obj_key_rule: str) -> dict:
+        return await self.redis_storage.retrieve_state(key_=obj_key_rule)
 
     async def _save_transformation_data(
         self, model_: BaseModel, obj_id: int, transformation_data: BaseSchema
@@ -107,5 +113,5 @@ class Convertor:
         key_ = f"{model_.model_name()}_es_{obj_id}"
 
         await self.redis_storage.save_state(
-            key_=key_, value=transformation_data.model_dump_json()
+            key_=key_, value=transformation_data
         )
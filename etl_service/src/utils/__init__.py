@@ -1,2 +1,3 @@
-from .base_backoff import backoff_by_connection
-from .custom_exception import EntitiesNotFoundInDBError, EventRuleError
+from .base_backoff import backoff_by_connection, get_backoff_delay
+from .custom_exception import (EntitiesNotFoundInDBError, EventRuleError,
+                               ReindexError, StorageIsFullError)
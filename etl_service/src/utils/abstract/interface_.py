@@ -2,16 +2,16 @@ from abc import ABC, abstractmethod
 
 
 class ETLSchedulerInterface(ABC):
-    """Интерфейс для реализации ETL-процессов через AsyncIOScheduler."""
+    """Интерфейс для реализации планировщиков ETL-процессов."""
 
     @classmethod
     @abstractmethod
     def jobs(cls) -> list[dict]:
         """
-        Метод получения всех задач (с заданными параметрами) для планировщика.
+        Метод получения всех задач (этапов ETL) для планировщика.
         """
 
     @classmethod
     @abstractmethod
     async def run(cls) -> None:
-        """Метод добавления всех задач в планировщике."""
+        """Метод запуска всех задач планировщика."""
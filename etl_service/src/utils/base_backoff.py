@@ -1,35 +1,76 @@
 import asyncio
 import functools
+import random
 
 from core.logger import logger
+from core.metrics import BACKEND_CALL_ERRORS, BACKEND_CALL_SECONDS
+
+
+def get_backoff_delay(
+    attempt: int,
+    start_sleep_time: float,
+    factor: float,
+    border_sleep_time: float,
+) -> float:
+    """
+    Экспоненциальная задержка с jitter: половина от
+    min(border_sleep_time, start_sleep_time * factor ** attempt) плюс
+    случайная добавка до второй половины (не даем воркерам ретраить
+    синхронно).
+
+    :param int attempt: номер попытки (с 0).
+    :param float start_sleep_time:
+    :param float factor:
+    :param float border_sleep_time:
+    :return float:
+    """
+    delay = min(border_sleep_time, start_sleep_time * factor ** attempt)
+
+    return delay / 2 + random.uniform(0, delay / 2)  # nosec B311
 
 
 def backoff_by_connection(
-    exceptions: tuple, start_sleep_time=2, factor=2, border_sleep_time=20
+    exceptions: tuple,
+    start_sleep_time=2,
+    factor=2,
+    border_sleep_time=20,
+    backend: str = "unknown",
 ):
     def wrapper_es(func):
+        call_seconds = BACKEND_CALL_SECONDS.labels(
+            backend=backend, call=func.__qualname__
+        )
+        call_errors = BACKEND_CALL_ERRORS.labels(
+            backend=backend, call=func.__qualname__
+        )
+
         @functools.wraps(func)
         async def wrapped_es(*args, **kwargs):
-            execute_result, n, t = False, 1, start_sleep_time
+            execute_result, n = False, 0
 
             while not execute_result:
                 try:
-                    if asyncio.iscoroutinefunction(func):
-                        result_ = await func(*args, **kwargs)
+                    with call_seconds.time():
+                        if asyncio.iscoroutinefunction(func):
+                            result_ = await func(*args, **kwargs)
 
-                    else:
-                        result_ = func(*args, **kwargs)
+                        else:
+                            result_ = func(*args, **kwargs)
 
                     execute_result = True
 
                     return result_
                 except exceptions as ex:
-                    if t < border_sleep_time:
-                        t = t * (factor ^ n)
-                    else:
-                        border_sleep_time
-                    logger.error(f"Error connect({t}): {ex}")
-                    await asyncio.sleep(start_sleep_time)
+                    call_errors.inc()
+                    t = get_backoff_delay(
+                        attempt=n,
+                        start_sleep_time=start_sleep_time,
+                        factor=factor,
+                        border_sleep_time=border_sleep_time,
+                    )
+                    n += 1
+                    logger.error(f"Error connect({t:.2f}): {ex}")
+                    await asyncio.sleep(t)
 
         return wrapped_es
 
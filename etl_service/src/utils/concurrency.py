@@ -0,0 +1,67 @@
+import asyncio
+import math
+from typing import Awaitable, Iterable, Sequence, TypeVar
+
+from core import config
+
+__all__ = ["get_stage_concurrency", "split_batches", "run_bounded"]
+
+T = TypeVar("T")
+
+
+def get_stage_concurrency(pool_size: int) -> int:
+    """
+    Лимит конкурентных задач этапа ETL по размеру пула соединений бэкенда:
+    одно соединение остается основной сессии этапа. ETL_STAGE_CONCURRENCY
+    (если задан) ограничивает лимит сверху.
+
+    :param int pool_size: постоянные соединения пула.
+    :return int:
+    """
+    concurrency = max(pool_size - 1, 1)
+
+    if config.etl_stage_concurrency > 0:
+        concurrency = min(concurrency, config.etl_stage_concurrency)
+
+    return concurrency
+
+
+def split_batches(
+    items: Sequence[T], concurrency: int, max_size: int
+) -> list[Sequence[T]]:
+    """
+    Разбиение на пачки не больше max_size так, чтобы работа распределялась
+    на все concurrency задач.
+
+    :param Sequence[T] items:
+    :param int concurrency:
+    :param int max_size:
+    :return list[Sequence[T]]:
+    """
+    if not items:
+        return []
+
+    size = max(min(max_size, math.ceil(len(items) / concurrency)), 1)
+
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def run_bounded(coros: Iterable[Awaitable[T]], limit: int) -> list[T]:
+    """
+    Конкурентный запуск корутин в asyncio.TaskGroup, не более limit
+    одновременно. Ошибка одной задачи отменяет остальные.
+
+    :param Iterable[Awaitable[T]] coros:
+    :param int limit:
+    :return list[T]: результаты в порядке coros.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(coro: Awaitable[T]) -> T:
+        async with semaphore:
+            return await coro
+
+    async with asyncio.TaskGroup() as task_group:
+        tasks = [task_group.create_task(bounded(coro)) for coro in coros]
+
+    return [task.result() for task in tasks]
@@ -10,3 +10,17 @@ class EventRuleError(Exception):
 
     def __init__(self, message: str) -> None:
         super().__init__(message)
+
+
+class ReindexError(Exception):
+    """Обработчик ошибки - пересборка индексов ES не завершена."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class StorageIsFullError(Exception):
+    """Обработчик ошибки - Storage переполнен необработанными сущностями."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
@@ -3,6 +3,8 @@ import enum
 
 class RuleTypes(enum.Enum):
     SELECTION_RULE = "selection_rule"
+    STREAM_SELECTION_RULE = "stream_selection_rule"
+    SELECTION_BY_IDS_RULE = "selection_by_ids_rule"
     NORMALIZE_RULE = "normalize_rule"
     ENRICH_RULE = "enrich_rule"
 
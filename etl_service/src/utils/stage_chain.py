@@ -0,0 +1,81 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from core.logger import logger
+
+__all__ = ["StageChain"]
+
+
+class StageChain:
+    """
+    Цепочка этапов ETL. Этап запускается сразу после предыдущих, если они
+    что-то выдали (run() вернул количество > 0) или в Storage остались
+    необработанные сущности (has_backlog). Пока этапы что-то обрабатывают,
+    проходы идут без пауз. Таймер idle_interval_sec работает только в
+    простое: по нему выполняется полный проход всех этапов (дочистка Storage
+    после ошибок). wake_up() (например, из change feed)
+    запускает проход, не дожидаясь таймера.
+    """
+
+    def __init__(
+        self,
+        stages: list,
+        idle_interval_sec: float,
+        has_backlog: Callable[[], Awaitable[bool]] | None = None,
+    ) -> None:
+        self._stages = stages
+        self._idle_interval_sec = idle_interval_sec
+        self._has_backlog = has_backlog
+        self._wake_up_event = asyncio.Event()
+
+    async def wake_up(self) -> None:
+        self._wake_up_event.set()
+
+    async def run(self) -> None:
+        full_pass = True
+
+        while True:
+            try:
+                process_count = await self.run_pass(full_pass=full_pass)
+
+            except Exception as ex:
+                logger.error(f"stage chain: error run ETL-stages: {ex}")
+                process_count = 0
+
+            if process_count:
+                full_pass = False
+                continue
+
+            try:
+                await asyncio.wait_for(
+                    self._wake_up_event.wait(),
+                    timeout=self._idle_interval_sec,
+                )
+                full_pass = False
+
+            except asyncio.TimeoutError:
+                full_pass = True
+
+            self._wake_up_event.clear()
+
+    async def run_pass(self, full_pass: bool = False) -> int:
+        """
+        Один проход цепочки.
+
+        :param bool full_pass: запускать все этапы, даже без входных данных.
+        :return int: суммарный выход этапов.
+        """
+        outputs = []
+
+        for stage in self._stages:
+            if outputs and not (
+                full_pass or any(outputs) or await self._check_backlog()
+            ):
+                break
+
+            outputs.append(await stage.run() or 0)
+
+        return sum(outputs)
+
+    async def _check_backlog(self) -> bool:
+        return bool(self._has_backlog) and await self._has_backlog()
@@ -0,0 +1,162 @@
+"""
+Бенчмарк RateLimit: requests/sec на GET /api/v1/movies/films без
+middleware, с прежним AsyncRateLimitMiddleware (BaseHTTPMiddleware) и с
+ASGI-middleware. FilmService подменяется заглушкой (без Elasticsearch и
+кеша), Redis для RateLimit - fakeredis или сервер по --redis-url. Лимит
+выставляется заведомо большим: измеряется накладной расход, а не отказы.
+
+Запуск из каталога movies_service:
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/rate_limit_middleware.py --requests 5000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+)
+
+import fakeredis.aioredis  # noqa: E402
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request, status  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from redis.asyncio import Redis  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from src.api.v1 import films  # noqa: E402
+from src.middleware import AsyncRateLimitMiddleware  # noqa: E402
+from src.models.models import FilmBase  # noqa: E402
+from src.services.film_service import get_film_service  # noqa: E402
+from src.services.rate_limiter import RateLimiter  # noqa: E402
+
+URL = "/api/v1/movies/films"
+
+
+class StubFilmService:
+    def __init__(self, page_size: int):
+        self._films = [
+            FilmBase(id=uuid.uuid4(), title=f"Film {i}", imdb_rating=7.5)
+            for i in range(page_size)
+        ]
+
+    async def get_films(
+        self, **kwargs
+    ) -> tuple[list[FilmBase], str | None]:
+        return self._films, None
+
+
+class BaseHTTPRateLimitMiddleware(BaseHTTPMiddleware):
+    """Прежняя реализация: dispatch поверх BaseHTTPMiddleware."""
+
+    def __init__(self, app, rate_limiter: RateLimiter) -> None:
+        super().__init__(app=app)
+        self._rate_limiter = rate_limiter
+
+    async def dispatch(self, request: Request, call_next):
+        client_id = request.headers.get("X-Forwarded-For", request.client.host)
+        allowed, retry_after = await self._rate_limiter.hit(
+            client_id=client_id
+        )
+
+        if not allowed:
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "TOO MANY REQUESTS"},
+                headers={"Retry-After": str(retry_after)},
+            )
+
+        return await call_next(request)
+
+
+def create_app(
+    middleware_cls: type | None, rate_limiter: RateLimiter, page_size: int
+) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(films.router, prefix=URL)
+    film_service = StubFilmService(page_size=page_size)
+    app.dependency_overrides[get_film_service] = lambda: film_service
+
+    if middleware_cls:
+        app.add_middleware(middleware_cls, rate_limiter=rate_limiter)
+
+    return app
+
+
+async def measure(app: FastAPI, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    counter = iter(range(requests))
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark"
+    ) as client:
+        async def worker() -> None:
+            for _ in counter:
+                response = await client.get(URL)
+                assert response.status_code == status.HTTP_200_OK
+
+        await client.get(URL)
+        start_ = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        return requests / (time.perf_counter() - start_)
+
+
+async def run_benchmark(args: argparse.Namespace) -> None:
+    redis_client = (
+        Redis.from_url(url=args.redis_url) if args.redis_url
+        else fakeredis.aioredis.FakeRedis()
+    )
+    rate_limiter = RateLimiter(
+        redis_client=redis_client, limit=10 ** 9, window_sec=60
+    )
+    variants = [
+        ("no middleware", None),
+        ("BaseHTTPMiddleware", BaseHTTPRateLimitMiddleware),
+        ("ASGI middleware", AsyncRateLimitMiddleware),
+    ]
+    base_rps = None
+
+    print(f"{'variant':>20} {'req/sec':>10} {'us/req':>8} {'overhead':>9}")
+    for name, middleware_cls in variants:
+        rps = await measure(
+            app=create_app(
+                middleware_cls=middleware_cls,
+                rate_limiter=rate_limiter,
+                page_size=args.page_size,
+            ),
+            requests=args.requests,
+            concurrency=args.concurrency,
+        )
+        base_rps = base_rps or rps
+        print(
+            f"{name:>20} {rps:>10.1f} {1e6 / rps:>8.1f} "
+            f"{(1 / rps - 1 / base_rps) * 1e6:>+7.1f}us"
+        )
+
+    await redis_client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument(
+        "--redis-url", default=None,
+        help="Redis for rate limit (default: fakeredis)",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    asyncio.run(run_benchmark(args=args))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,12 @@ import logging
 from http import HTTPStatus
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
+from src.core.exceptions import InvalidCursorError
 from src.models.models import Film, FilmBase
 from src.services.film_service import FilmService, get_film_service
+from src.services.pagination import NEXT_CURSOR_HEADER
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +19,7 @@ router = APIRouter()
     response_model=list[FilmBase],
 )
 async def search_films(
+    response: Response,
     query: str | None = Query(None, description="Поисковый запрос по фильмам"),
     page_size: int = Query(
         10,
@@ -29,15 +32,74 @@ async def search_films(
         ge=1,
         description="Смещение для пагинации (больше ноля)",
     ),
+    cursor: str | None = Query(
+        None,
+        description=(
+            "Курсор следующей страницы из заголовка X-Next-Cursor "
+            "предыдущего ответа (вместо page_number)"
+        ),
+    ),
     film_service: FilmService = Depends(get_film_service),
 ) -> list[FilmBase]:
     """
     Эндпоинт для поиска фильмов с поддержкой поиска по названию
-    и пагинацией.
+    и пагинацией (по номеру страницы или курсору).
+    """
+    try:
+        films, next_cursor = await film_service.search_films(
+            query=query, page_size=page_size, page_number=page_number,
+            cursor=cursor,
+        )
+
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+    if not films:
+        # Выбрасываем HTTP-исключение с кодом 404
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="Films not found",
+        )
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    return films
+
+
+@router.get(
+    "/suggest",
+    response_model=list[FilmBase],
+)
+async def suggest_films(
+    query: str = Query(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Начало названия фильма (или любого слова названия)",
+    ),
+    size: int = Query(
+        10,
+        ge=1,
+        le=50,
+        description="Количество подсказок (от 1 до 50)",
+    ),
+    fuzzy: bool = Query(
+        False, description="Допускать опечатки в запросе"
+    ),
+    film_service: FilmService = Depends(get_film_service),
+) -> list[FilmBase]:
     """
-    films = await film_service.search_films(
-        query=query, page_size=page_size, page_number=page_number
+    Эндпоинт автодополнения названий фильмов (подсказки при вводе,
+    распознавание названий голосовым ассистентом).
+    """
+    films = await film_service.suggest_films(
+        query=query, size=size, fuzzy=fuzzy
     )
+
     if not films:
         # Выбрасываем HTTP-исключение с кодом 404
         raise HTTPException(
@@ -50,6 +112,7 @@ async def search_films(
 
 @router.get("", response_model=list[FilmBase])
 async def get_films(
+        response: Response,
         genre: UUID | None = Query(
             None, description="UUID жанра для фильтрации"
         ),
@@ -68,18 +131,33 @@ async def get_films(
             ge=1,
             description="Смещение для пагинации (больше ноля)",
         ),
+        cursor: str | None = Query(
+            None,
+            description=(
+                "Курсор следующей страницы из заголовка X-Next-Cursor "
+                "предыдущего ответа (вместо page_number)"
+            ),
+        ),
         film_service: FilmService = Depends(get_film_service),
 ) -> list[FilmBase]:
     """
     Эндпоинт для получения фильмов с поддержкой сортировки по рейтингу,
-    фильтрации по жанру и пагинацией.
+    фильтрации по жанру и пагинацией (по номеру страницы или курсору).
     """
-    films = await film_service.get_films(
-        sort=sort,
-        genre=genre,
-        page_size=page_size,
-        page_number=page_number,
-    )
+    try:
+        films, next_cursor = await film_service.get_films(
+            sort=sort,
+            genre=genre,
+            page_size=page_size,
+            page_number=page_number,
+            cursor=cursor,
+        )
+
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid cursor",
+        )
 
     if not films:
         # Выбрасываем HTTP-исключение с кодом 404
@@ -88,6 +166,9 @@ async def get_films(
             detail="Films not found",
         )
 
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
     return films
 
 
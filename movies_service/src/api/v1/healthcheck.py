@@ -1,4 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import ORJSONResponse
+
+from src.db.health_monitor import health_monitor
 
 router = APIRouter()
 
@@ -6,3 +9,19 @@ router = APIRouter()
 @router.get("")
 async def root():
     return {"message": "Movies API is running"}
+
+
+@router.get("/readiness")
+async def readiness():
+    """
+    Готовность сервиса по результатам фонового монитора здоровья: 503, если
+    Redis или Elasticsearch не прошли последнюю проверку.
+    """
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK
+        if health_monitor.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "ready": health_monitor.ready,
+            "backends": health_monitor.status(),
+        },
+    )
@@ -2,9 +2,11 @@ import logging
 from http import HTTPStatus
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
+from src.core.exceptions import InvalidCursorError
 from src.models.models import FilmBase, Person
+from src.services.pagination import NEXT_CURSOR_HEADER
 from src.services.person_service import PersonService, get_person_service
 
 logger = logging.getLogger(__name__)
@@ -14,6 +16,7 @@ router = APIRouter()
 
 @router.get("/search", response_model=list[Person])
 async def search_persons(
+    response: Response,
     query: str | None = Query(
         None, description="Поисковый запрос по персонам"
     ),
@@ -28,15 +31,31 @@ async def search_persons(
         ge=1,
         description="Смещение для пагинации (больше ноля)",
     ),
+    cursor: str | None = Query(
+        None,
+        description=(
+            "Курсор следующей страницы из заголовка X-Next-Cursor "
+            "предыдущего ответа (вместо page_number)"
+        ),
+    ),
     person_service: PersonService = Depends(get_person_service),
 ) -> list[Person]:
     """
     Эндпоинт для поиска персон с поддержкой поиска по названию
-    и пагинацией.
+    и пагинацией (по номеру страницы или курсору).
     """
-    persons = await person_service.search_persons(
-        query=query, page_size=page_size, page_number=page_number
-    )
+    try:
+        persons, next_cursor = await person_service.search_persons(
+            query=query, page_size=page_size, page_number=page_number,
+            cursor=cursor,
+        )
+
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
     if not persons:
         # Выбрасываем HTTP-исключение с кодом 404
         raise HTTPException(
@@ -44,6 +63,9 @@ async def search_persons(
             detail="Persons not found",
         )
 
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
     return persons
 
 
@@ -43,6 +43,12 @@ class Settings(BaseSettings):
     redis_port: int = Field(default=6379, alias="REDIS_PORT")
     redis_password: str = Field(default="password", alias="REDIS_PASSWORD")
     redis_rate_limit_db: int = Field(default=1, alias="REDIS_RATE_LIMIT_DB")
+    redis_rate_limit_max_connections: int = Field(
+        default=50, alias="REDIS_RATE_LIMIT_MAX_CONNECTIONS"
+    )
+    redis_rate_limit_pool_timeout_sec: float = Field(
+        default=5.0, alias="REDIS_RATE_LIMIT_POOL_TIMEOUT_SEC"
+    )
 
     elastic_host: str = Field(default="elasticsearch", alias="ELASTIC_HOST")
     elastic_port: int = Field(default=9200, alias="ELASTIC_PORT")
@@ -59,7 +65,69 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
 
     elastic_response_size: int = 1000
-    cache_expire_in_seconds: int = 300
+    # Курсорная пагинация (search_after): время жизни point in time между
+    # запросами страниц; пустая строка - без PIT.
+    elastic_pit_keep_alive: str = Field(
+        default="1m", alias="ELASTIC_PIT_KEEP_ALIVE"
+    )
+    # Время жизни кеша: ETL сбрасывает затронутые ключи по событиям
+    # загрузки (CacheInvalidator), короткое время жизни ограничивает
+    # устаревание при потерянном событии.
+    cache_expire_in_seconds: int = Field(
+        default=300, alias="CACHE_EXPIRE_SEC"
+    )
+    # Сброс кеша по событиям ETL (Redis stream): ожидание событий,
+    # размер пачки, через сколько забирать события остановленного
+    # экземпляра, задержка повторного удаления ключей.
+    cache_invalidation_enabled: bool = Field(
+        default=True, alias="CACHE_INVALIDATION_ENABLED"
+    )
+    cache_invalidation_block_ms: int = Field(
+        default=5_000, alias="CACHE_INVALIDATION_BLOCK_MS"
+    )
+    cache_invalidation_batch_size: int = Field(
+        default=100, alias="CACHE_INVALIDATION_BATCH_SIZE"
+    )
+    cache_invalidation_claim_idle_ms: int = Field(
+        default=60_000, alias="CACHE_INVALIDATION_CLAIM_IDLE_MS"
+    )
+    cache_invalidation_repeat_delay_sec: float = Field(
+        default=2.0, alias="CACHE_INVALIDATION_REPEAT_DELAY_SEC"
+    )
+    # Наибольшее число ключей списков (страниц, подсказок) на индекс.
+    cache_tag_max_keys: int = Field(
+        default=100_000, alias="CACHE_TAG_MAX_KEYS"
+    )
+
+    # Фоновый монитор здоровья Redis и Elasticsearch: проверки раз в
+    # interval секунд; после failure_threshold неудачных проверок подряд
+    # клиент пересоздается.
+    health_check_interval_sec: float = Field(
+        default=5.0, alias="HEALTH_CHECK_INTERVAL_SEC"
+    )
+    health_check_timeout_sec: float = Field(
+        default=2.0, alias="HEALTH_CHECK_TIMEOUT_SEC"
+    )
+    health_check_failure_threshold: int = Field(
+        default=3, alias="HEALTH_CHECK_FAILURE_THRESHOLD"
+    )
+
+    # Кеш результатов поиска (search_films, search_persons, search_genres)
+    # по нормализованному запросу и номеру страницы: время жизни и
+    # наибольшее число ключей на индекс (старые вытесняются). ETL сбрасывает
+    # ключи кеша индекса после загрузки в него (CacheInvalidator).
+    search_cache_enabled: bool = Field(
+        default=True, alias="SEARCH_CACHE_ENABLED"
+    )
+    search_cache_expire_sec: int = Field(
+        default=60, alias="SEARCH_CACHE_EXPIRE_SEC"
+    )
+    search_cache_max_keys: int = Field(
+        default=10_000, alias="SEARCH_CACHE_MAX_KEYS"
+    )
+
+    # Первые страницы фильмов по рейтингу из топа, предрасчитанного ETL.
+    top_films_enabled: bool = Field(default=True, alias="TOP_FILMS_ENABLED")
 
     rate_limit: int = Field(default=30, alias="RATE_LIMIT")
     rate_limit_window: int = Field(default=60, alias="RATE_LIMIT_WINDOW")
@@ -53,3 +53,8 @@ class JsonLoadsError(BaseServiceError):
 class CheckCacheError(BaseServiceError):
     """Исключение для ошибок, связанных с проверкой записи в кеше."""
     pass
+
+
+class InvalidCursorError(BaseServiceError):
+    """Исключение для некорректного курсора пагинации."""
+    pass
@@ -0,0 +1,9 @@
+from prometheus_client import Counter
+
+__all__ = ["SEARCH_CACHE_REQUESTS"]
+
+SEARCH_CACHE_REQUESTS = Counter(
+    "movies_search_cache_requests",
+    "Search requests by cache result (hit rate: hit / (hit + miss))",
+    ["endpoint", "result"],
+)
@@ -1,8 +1,9 @@
 import logging
 
-from elasticsearch import ApiError, AsyncElasticsearch, ConnectionError
+from elasticsearch import AsyncElasticsearch
 
 from src.core.config import settings
+from src.core.exceptions import ElasticServiceError
 from src.services.elastic_service import ElasticService
 
 logger = logging.getLogger(__name__)
@@ -11,46 +12,51 @@ logging.basicConfig(level=logging.INFO)
 es: ElasticService | None = None
 
 
-async def get_elastic() -> ElasticService:
+def create_elastic_client() -> AsyncElasticsearch:
+    return AsyncElasticsearch(
+        hosts=[
+            f"{settings.elastic_scheme}://{settings.elastic_host}:"
+            f"{settings.elastic_port}"
+        ],
+        basic_auth=(settings.elastic_name, settings.elastic_password),
+    )
+
+
+async def init_elastic() -> ElasticService:
+    """
+    Создает клиент Elasticsearch при запуске приложения. Доступность
+    проверяет монитор здоровья (HealthMonitor), а не запросы.
+    """
     global es
-    # Проверка, существует ли es и активно ли соединение
-    if not es or not await es.es_client.ping():
+    if not es:
         logger.info("Создание клиента Elasticsearch...")
-        es_client = None
-        try:
-            es_client = AsyncElasticsearch(
-                hosts=[
-                    f"{settings.elastic_scheme}://{settings.elastic_host}:"
-                    f"{settings.elastic_port}"
-                ],
-                basic_auth=(settings.elastic_name, settings.elastic_password),
-            )
-            if not await es_client.ping():
-                raise ConnectionError("Elasticsearch недоступен.")
-
-            logger.info("Клиент Elasticsearch успешно создан.")
-
-            es = ElasticService(es_client)
-
-        except ConnectionError as ce:
-            logger.error(f"Ошибка подключения к Elasticsearch: {ce}")
-            if es_client:
-                await es_client.close()
-            raise
-        except ApiError as ae:
-            logger.error(f"Ошибка API Elasticsearch: {ae}")
-            if es_client:
-                await es_client.close()
-            raise
-        except Exception as e:
-            logger.error(f"Ошибка при создании клиента Elasticsearch: {e}")
-            if es_client:
-                await es_client.close()
-            raise
+        es = ElasticService(create_elastic_client())
 
     return es
 
 
+async def get_elastic() -> ElasticService:
+    """
+    Провайдер зависимости: возвращает клиент, созданный при запуске, без
+    сетевых проверок на каждый запрос.
+    """
+    if not es:
+        raise ElasticServiceError("Клиент Elasticsearch не инициализирован.")
+
+    return es
+
+
+async def rebuild_elastic() -> None:
+    """
+    Пересоздает клиент Elasticsearch (после серии неудачных проверок
+    монитора здоровья). Экземпляр ElasticService сохраняется, поэтому
+    сервисы, уже получившие его, используют новый клиент.
+    """
+    if es:
+        logger.warning("Пересоздание клиента Elasticsearch...")
+        await es.reconnect(create_elastic_client())
+
+
 async def close_elastic():
     """
     Закрывает соединение с Elasticsearch.
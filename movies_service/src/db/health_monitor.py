@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["HealthCheck", "HealthMonitor", "health_monitor"]
+
+
+@dataclass
+class HealthCheck:
+    """
+    Проверка бэкенда: ping - запрос доступности, rebuild - пересоздание
+    клиента после failure_threshold неудачных проверок подряд.
+    """
+    name: str
+    ping: Callable[[], Awaitable[bool]]
+    rebuild: Callable[[], Awaitable[None]]
+    healthy: bool = True
+    failures: int = 0
+    error: str | None = field(default=None)
+
+
+class HealthMonitor:
+    """
+    Фоновая проверка доступности Redis и Elasticsearch. Запросы API не
+    выполняют ping: готовность сервиса (ready) определяется результатами
+    последних проверок монитора.
+    """
+
+    def __init__(
+        self,
+        interval_sec: float = settings.health_check_interval_sec,
+        timeout_sec: float = settings.health_check_timeout_sec,
+        failure_threshold: int = settings.health_check_failure_threshold,
+    ):
+        self._interval_sec = interval_sec
+        self._timeout_sec = timeout_sec
+        self._failure_threshold = failure_threshold
+        self._checks: dict[str, HealthCheck] = {}
+        self._task: asyncio.Task | None = None
+
+    def add_check(
+        self,
+        name: str,
+        ping: Callable[[], Awaitable[bool]],
+        rebuild: Callable[[], Awaitable[None]],
+    ) -> None:
+        self._checks[name] = HealthCheck(name=name, ping=ping, rebuild=rebuild)
+
+    @property
+    def ready(self) -> bool:
+        return all(check.healthy for check in self._checks.values())
+
+    def status(self) -> dict[str, dict]:
+        return {
+            check.name: {
+                "healthy": check.healthy,
+                "failures": check.failures,
+                "error": check.error,
+            }
+            for check in self._checks.values()
+        }
+
+    async def _check(self, check: HealthCheck) -> None:
+        try:
+            if not await asyncio.wait_for(
+                check.ping(), timeout=self._timeout_sec
+            ):
+                raise ConnectionError(f"{check.name} не отвечает на ping.")
+
+        except Exception as e:
+            check.healthy, check.error = False, repr(e)
+            check.failures += 1
+            logger.warning(
+                "Проверка %s не пройдена (%s подряд): %s",
+                check.name, check.failures, e
+            )
+
+            if check.failures % self._failure_threshold == 0:
+                try:
+                    await check.rebuild()
+
+                except Exception as e:
+                    logger.error(
+                        "Ошибка при пересоздании клиента %s: %s",
+                        check.name, e
+                    )
+
+        else:
+            if not check.healthy:
+                logger.info("%s снова доступен.", check.name)
+
+            check.healthy, check.error, check.failures = True, None, 0
+
+    async def check_all(self) -> bool:
+        await asyncio.gather(
+            *(self._check(check) for check in self._checks.values())
+        )
+
+        return self.ready
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval_sec)
+            await self.check_all()
+
+    def start(self) -> None:
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+            try:
+                await self._task
+
+            except asyncio.CancelledError:
+                pass
+
+            self._task = None
+
+
+health_monitor = HealthMonitor()
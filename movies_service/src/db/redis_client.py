@@ -1,62 +1,96 @@
 import logging
-from contextlib import asynccontextmanager
 
-from redis.asyncio import Redis
-from redis.exceptions import ConnectionError
+from redis.asyncio import BlockingConnectionPool, Redis
 
 from src.core.config import settings
+from src.core.exceptions import CacheServiceError
 from src.services.cache_service import CacheService
 
 logger = logging.getLogger(__name__)
 
 redis_cache: CacheService | None = None
+redis_rate_limit: Redis | None = None
 
 
-async def get_redis_cache() -> CacheService:
+def create_redis_cache_client() -> Redis:
+    return Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        password=settings.redis_password,
+        db=1,
+    )
+
+
+async def init_redis_cache() -> CacheService:
     """
-    Возвращает экземпляр CacheService, обеспечивающий работу с Redis для
-    кэширования.
+    Создает клиент Redis для кеша при запуске приложения. Доступность
+    проверяет монитор здоровья (HealthMonitor), а не запросы.
     """
     global redis_cache
+    if not redis_cache:
+        logger.info("Создание клиента Redis для кеша...")
+        redis_cache = CacheService(create_redis_cache_client())
 
-    try:
-        if not redis_cache or not await redis_cache.redis_client.ping():
-            logger.info("Создание клиента Redis для кеша...")
-            redis_client = Redis(
-                host=settings.redis_host,
-                port=settings.redis_port,
-                password=settings.redis_password,
-                db=1,
-            )
-            if not await redis_client.ping():
-                raise ConnectionError("Redis недоступен!")
-
-            redis_cache = CacheService(redis_client)
+    return redis_cache
 
-            logger.info("Клиент Redis для кеша успешно создан.")
 
-    except Exception as e:
-        logger.error(f"Ошибка при создании клиента Redis для кеша: {e}")
-        raise
+async def get_redis_cache() -> CacheService:
+    """
+    Провайдер зависимости: возвращает экземпляр CacheService, созданный при
+    запуске, без сетевых проверок на каждый запрос.
+    """
+    if not redis_cache:
+        raise CacheServiceError("Клиент Redis для кеша не инициализирован.")
 
     return redis_cache
 
 
-@asynccontextmanager
-async def redis_client_by_rate_limit():
+async def rebuild_redis_cache() -> None:
     """
-    Асинхронный контекстный менеджер Redis для RateLimit.
+    Пересоздает клиент Redis для кеша (после серии неудачных проверок
+    монитора здоровья).
+    """
+    if redis_cache:
+        logger.warning("Пересоздание клиента Redis для кеша...")
+        await redis_cache.reconnect(create_redis_cache_client())
+
+
+async def close_redis_cache() -> None:
+    global redis_cache
+    if redis_cache:
+        await redis_cache.close()
+        redis_cache = None
+
 
-    @rtype: AsyncGenerator[Redis | None | Redis[bytes], Any]
+def get_redis_rate_limit() -> Redis:
+    """
+    Клиент Redis для RateLimit. Один на процесс: запросы берут соединения из
+    общего пула (не более redis_rate_limit_max_connections) вместо
+    подключения и ping на каждый запрос. При исчерпании пула запрос ждет
+    свободное соединение (BlockingConnectionPool), а не получает ошибку:
+    иначе всплеск запросов пропускался бы без ограничения.
+
+    @rtype: Redis
     @return: redis_client
     """
-    redis_client = Redis.from_url(url=settings.redis_rate_limit_url)
+    global redis_rate_limit
+
+    if not redis_rate_limit:
+        redis_rate_limit = Redis(
+            connection_pool=BlockingConnectionPool.from_url(
+                url=settings.redis_rate_limit_url,
+                max_connections=settings.redis_rate_limit_max_connections,
+                timeout=settings.redis_rate_limit_pool_timeout_sec,
+            )
+        )
+
+    return redis_rate_limit
 
-    try:
-        if not await redis_client.ping():
-            raise ConnectionError("Redis недоступен!")
 
-        yield redis_client
+async def close_redis_rate_limit() -> None:
+    global redis_rate_limit
 
-    finally:
-        await redis_client.close()
+    if redis_rate_limit:
+        await redis_rate_limit.close()
+        await redis_rate_limit.connection_pool.disconnect()
+        redis_rate_limit = None
@@ -2,12 +2,16 @@ import logging
 
 from fastapi import APIRouter, FastAPI
 from fastapi.responses import ORJSONResponse
+from prometheus_client import make_asgi_app
 
 from src.api.v1 import films, genres, healthcheck, persons
 from src.core.config import settings
-from src.db.elastic import get_elastic
-from src.db.redis_client import get_redis_cache
+from src.db.elastic import close_elastic, init_elastic, rebuild_elastic
+from src.db.health_monitor import health_monitor
+from src.db.redis_client import (close_redis_cache, close_redis_rate_limit,
+                                 init_redis_cache, rebuild_redis_cache)
 from src.middleware import AsyncRateLimitMiddleware
+from src.services.cache_invalidator import cache_invalidator
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -29,47 +33,40 @@ internal_api_router = APIRouter(prefix="/api/v1/internal")
 @app.on_event('startup')
 async def startup():
     """
-    Событие запуска приложения: инициализация базы данных PostgreSQL и
-    подключений к Redis и Elasticsearch.
+    Событие запуска приложения: создание клиентов Redis и Elasticsearch,
+    однократная проверка их доступности, запуск фонового монитора здоровья
+    и сброса кеша по событиям ETL. Клиенты живут все время работы
+    приложения, запросы их не пингуют.
     """
-    # Инициализация подключения к Redis
-    logger.info("Инициализация подключения к Redis...")
-    try:
-        redis_cache = await get_redis_cache()
-
-        # Проверяем доступность Redis-кеш
-        if not await redis_cache.redis_client.ping():
-            raise ConnectionError("Redis-кеш не отвечает на запросы.")
-
-    except settings.redis_exceptions as e:
-        logger.error("Ошибка подключения к Redis: %s", e)
-
-        raise ConnectionError(
-            "Не удалось подключиться к Redis. Приложение завершает работу."
+    logger.info("Инициализация подключений к Redis и Elasticsearch...")
+    redis_cache = await init_redis_cache()
+    es = await init_elastic()
+
+    health_monitor.add_check(
+        name="redis",
+        ping=redis_cache.is_connected,
+        rebuild=rebuild_redis_cache,
+    )
+    health_monitor.add_check(
+        name="elasticsearch",
+        ping=es.is_connected,
+        rebuild=rebuild_elastic,
+    )
+
+    if not await health_monitor.check_all():
+        logger.error(
+            "Ошибка подключения к бэкендам: %s", health_monitor.status()
         )
 
-    else:
-        logger.info("Подключение к Redis успешно установлено.")
-
-    # Инициализация подключения к Elasticsearch
-    logger.info("Инициализация подключения к Elasticsearch...")
-    try:
-        es = await get_elastic()
-
-        # Проверяем доступность Elasticsearch
-        if not await es.es_client.ping():
-            raise ConnectionError("Elasticsearch не отвечает на запросы.")
-
-    except settings.elastic_exceptions as e:
-        logger.error("Ошибка подключения к Elasticsearch: %s", e)
-
         raise ConnectionError(
-            "Не удалось подключиться к Elasticsearch. Приложение завершает "
-            "работу."
+            "Не удалось подключиться к Redis или Elasticsearch. Приложение "
+            "завершает работу."
         )
 
-    else:
-        logger.info("Подключение к Elasticsearch успешно установлено.")
+    health_monitor.start()
+
+    if settings.cache_invalidation_enabled:
+        cache_invalidator.start(redis_cache)
 
     logger.info("Все подключения успешно установлены.")
 
@@ -77,18 +74,14 @@ async def startup():
 @app.on_event('shutdown')
 async def shutdown():
     """
-    Событие завершения работы приложения: закрытие подключений к Redis и
-    Elasticsearch.
+    Событие завершения работы приложения: остановка монитора здоровья и
+    сброса кеша, закрытие подключений к Redis и Elasticsearch.
     """
-    # Закрытие подключения к Redis
-    redis_cache = await get_redis_cache()
-    if redis_cache:
-        await redis_cache.close()
-
-    # Закрытие подключения к Elasticsearch
-    es = await get_elastic()
-    if es:
-        await es.close()
+    await health_monitor.stop()
+    await cache_invalidator.stop()
+    await close_redis_cache()
+    await close_redis_rate_limit()
+    await close_elastic()
 
 
 # Подключение Route - внешних
@@ -107,5 +100,8 @@ api_router.include_router(
 
 app.include_router(api_router)
 
+# Метрики Prometheus (попадания в кеш поиска и т.п.)
+app.mount("/metrics", make_asgi_app())
+
 # Middleware:
 app.add_middleware(AsyncRateLimitMiddleware)
@@ -1,82 +1,114 @@
-from fastapi import Request, Response, status
+import logging
+from abc import ABC, abstractmethod
+
+from fastapi import status
 from fastapi.responses import JSONResponse
 from limits import parse
 from limits.storage import RedisStorage
 from limits.strategies import FixedWindowRateLimiter
-from redis.asyncio.client import Pipeline
-from starlette.middleware.base import (BaseHTTPMiddleware,
-                                       RequestResponseEndpoint)
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from src.core.config import settings
-from src.db.redis_client import redis_client_by_rate_limit
+from src.db.redis_client import get_redis_rate_limit
+from src.services.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
 
 __all__ = ["RateLimitMiddleware", "AsyncRateLimitMiddleware"]
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class BaseRateLimitMiddleware(ABC):
+    """
+    Базовый RateLimit в виде ASGI-middleware: без BaseHTTPMiddleware, то есть
+    без дополнительных задач и потоков памяти на каждый запрос, ответ
+    (в том числе потоковый) передается приложением напрямую. Запросы,
+    отличные от http (lifespan, websocket), не ограничиваются.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @staticmethod
+    def get_client_id(scope: Scope) -> str:
+        client = scope.get("client")
+
+        return Headers(scope=scope).get(
+            "x-forwarded-for", client[0] if client else ""
+        )
+
+    @abstractmethod
+    async def is_allowed(self, client_id: str) -> tuple[bool, int | None]:
+        """
+        @rtype: tuple[bool, int | None]
+        @return: (разрешен ли запрос, секунд до повтора)
+        """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        allowed, retry_after = await self.is_allowed(
+            client_id=self.get_client_id(scope=scope)
+        )
+
+        if not allowed:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "TOO MANY REQUESTS"},
+                headers={"Retry-After": str(retry_after)}
+                if retry_after else None,
+            )
+
+            return await response(scope, receive, send)
+
+        await self.app(scope, receive, send)
+
+
+class RateLimitMiddleware(BaseRateLimitMiddleware):
     """
     RateLimit с использованием limits. Синхронный, реализует стратегию
     ограничения с фиксированным окном.
     """
 
-    def __init__(self, app) -> None:
+    def __init__(self, app: ASGIApp) -> None:
         super().__init__(app=app)
         self._rate_limit = parse(settings.rate_limit)
         self._strategy = FixedWindowRateLimiter(
             storage=RedisStorage(uri=settings.redis_rate_limit_url)
         )
 
-    async def dispatch(
-            self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response | None:
-        client_id = request.client.host
-
+    async def is_allowed(self, client_id: str) -> tuple[bool, int | None]:
         if not self._strategy.test(self._rate_limit, client_id):
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={"detail": "TOO MANY REQUESTS"}
-            )
+            return False, None
 
         self._strategy.hit(self._rate_limit, client_id)
 
-        return await call_next(request)
+        return True, None
 
 
-class AsyncRateLimitMiddleware(BaseHTTPMiddleware):
+class AsyncRateLimitMiddleware(BaseRateLimitMiddleware):
     """
-    Кастомный RateLimit. Асинхронный, реализует стратегию ограничения с
-    фиксированным окном.
+    Кастомный RateLimit. Асинхронный, реализует алгоритм GCRA (RateLimiter):
+    проверка и учет запроса - один атомарный Lua-скрипт в Redis через общий
+    пул соединений. При недоступности Redis запросы пропускаются.
     """
 
-    def __init__(self, app) -> None:
+    def __init__(
+        self, app: ASGIApp, rate_limiter: RateLimiter | None = None
+    ) -> None:
         super().__init__(app=app)
-        self._limit = settings.rate_limit
-        self._window_sec = settings.rate_limit_window
-        self._key_template = "ratelimit:{client_id}"
-
-        self.__def_counter = 0
-
-    async def dispatch(
-            self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response | None:
-        client_id = request.headers.get("X-Forwarded-For", request.client.host)
-        key_ = self._key_template.format(client_id=client_id)
-
-        async with redis_client_by_rate_limit() as rm_redis_client:
-            current_count = await rm_redis_client.get(name=key_)
-            current_count = int(
-                current_count
-            ) if current_count else self.__def_counter
-
-            if current_count > self._limit:
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={"detail": "TOO MANY REQUESTS"}
-                )
-
-            pipe: Pipeline = await rm_redis_client.pipeline()
-            pipe.incr(name=key_)
-            pipe.expire(name=key_, time=self._window_sec)
-            await pipe.execute()
-
-        return await call_next(request)
+        self._rate_limiter = rate_limiter or RateLimiter(
+            redis_client=get_redis_rate_limit(),
+            limit=settings.rate_limit,
+            window_sec=settings.rate_limit_window,
+        )
+
+    async def is_allowed(self, client_id: str) -> tuple[bool, int | None]:
+        try:
+            return await self._rate_limiter.hit(client_id=client_id)
+
+        except settings.redis_exceptions as e:
+            logger.warning("RateLimit недоступен, запрос пропущен: %s", e)
+
+            return True, None
@@ -1,18 +1,26 @@
 import asyncio
 import logging
+from functools import lru_cache
 from typing import Any, Type
 
 import orjson
 from elasticsearch import NotFoundError
 from pydantic import BaseModel, ValidationError
 
+from src.core.config import settings
+from src.core.metrics import SEARCH_CACHE_REQUESTS
 from src.core.exceptions import (CacheServiceError, CheckCacheError,
                                  CreateObjectError, CreateObjectsError,
                                  ElasticParsingError, ElasticServiceError,
                                  JsonLoadsError, ModelDumpError,
                                  ModelDumpJsonError)
+from src.services.cache_invalidator import get_cache_tag_key
 from src.services.cache_service import CacheService
 from src.services.elastic_service import ElasticService
+from src.services.pagination import (decode_cursor, encode_cursor,
+                                     strip_cursor_pit)
+from src.services.search_cache import (get_search_cache_key,
+                                       get_search_keyset_key)
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +33,10 @@ class BaseService:
     и Elasticsearch (для полнотекстового поиска).
     """
 
+    # Части ответа search, которые нужны сервисам: документы, значения
+    # сортировки (курсор) и point in time.
+    SEARCH_FILTER_PATH = "hits.hits._source,hits.hits.sort,pit_id"
+
     def __init__(self, redis_client: CacheService, es_client: ElasticService):
         self.redis_client = redis_client
         self.es_client = es_client
@@ -98,15 +110,26 @@ class BaseService:
         Вспомогательный метод для извлечения списка записей из Elasticsearch.
         """
         try:
-            return data["hits"]["hits"]
+            # При filter_path ответ без совпадений не содержит hits.
+            return data.get("hits", {}).get("hits", [])
 
-        except (KeyError, TypeError) as e:
+        except (AttributeError, TypeError) as e:
             logger.error(
                 "Ошибка некорректного ответа от Elasticsearch: %s. %s",
                 e, log_info
             )
             raise ElasticParsingError(e)
 
+    @staticmethod
+    @lru_cache()
+    def _get_source_fields(model: Type[BaseModel]) -> tuple[str, ...]:
+        """
+        Поля документа, из которых строится модель: _source includes для
+        запросов, чтобы Elasticsearch не передавал остальные поля (описания,
+        вложенные персоны и т.п.).
+        """
+        return tuple(model.model_fields)
+
     @staticmethod
     def _get_data_from_json(json: bytes | None, log_info: str = "") -> Any:
         """Вспомогательный метод для десериализации JSON в объекты Python."""
@@ -219,16 +242,25 @@ class BaseService:
             raise CheckCacheError(e)
 
     async def _put_to_cache(
-        self, cache_key: str, data: list[BaseModel] | None, log_info: str = ""
+        self,
+        cache_key: str,
+        data: list[BaseModel] | None,
+        log_info: str = "",
+        expire: int = settings.cache_expire_in_seconds,
+        cache_tag: str | None = None,
     ) -> None:
-        """Вспомогательные метод для кеширования записей."""
+        """
+        Вспомогательные метод для кеширования записей. cache_tag - индекс,
+        при изменении любого документа которого ключ сбрасывается (списки).
+        """
         try:
             json_represent = self._create_json_from_objects(
                 data, log_info
             )
             await self.redis_client.set(
-                cache_key, json_represent, log_info=log_info
+                cache_key, json_represent, expire, log_info=log_info
             )
+            await self._tag_cache_keys(cache_tag, [cache_key], log_info)
 
         except (CacheServiceError, ModelDumpJsonError):
             pass
@@ -241,20 +273,48 @@ class BaseService:
             )
             raise ModelDumpJsonError(e)
 
-    async def _base_get_no_cache(
+    async def _tag_cache_keys(
+        self, cache_tag: str | None, keys: list[str], log_info: str = ""
+    ) -> None:
+        """
+        Вспомогательный метод для добавления ключей в множество ключей
+        индекса cache_tag, которое сбрасывает CacheInvalidator.
+        """
+        if not cache_tag:
+            return
+
+        try:
+            await self.redis_client.add_to_keyset(
+                get_cache_tag_key(cache_tag),
+                keys,
+                settings.cache_tag_max_keys,
+                settings.cache_expire_in_seconds,
+                log_info,
+            )
+
+        except CacheServiceError:
+            pass
+
+    async def _base_search(
         self,
         model: Type[BaseModel],
-        index: str,
+        index: str | None,
         body: dict,
         log_info: str,
-    ) -> list[BaseModel] | None:
+    ) -> tuple[list[BaseModel] | None, dict]:
         """
-        Вспомогательный базовый метод для получения записей из Elasticsearch
-        без использования кеша.
+        Вспомогательный базовый метод для поиска записей в Elasticsearch:
+        возвращает объекты модели и ответ Elasticsearch (значения сортировки
+        hits, pit_id).
+
+        Если в body не задан _source, запрашиваются только поля модели;
+        ответ сокращается до SEARCH_FILTER_PATH.
         """
+        body.setdefault("_source", list(self._get_source_fields(model)))
+
         try:
             response = await self.es_client.search(
-                index, body, log_info
+                index, body, log_info, filter_path=self.SEARCH_FILTER_PATH
             )
             records_data = self._get_records_from_hits(response, log_info)
             records_obj = self._create_objects_from_elastic(
@@ -262,20 +322,77 @@ class BaseService:
             )
 
         except (ElasticServiceError, ElasticParsingError, CreateObjectsError):
-            return None
+            return None, {}
 
         except NotFoundError:
             logger.info(
                 "Запись с ID %s не найдена в Elasticsearch. %s", id, log_info
             )
-            return []
+            return [], {}
 
         else:
             logger.info(
                 "Из Elasticsearch получено записей в количестве: %d шт. %s",
                 len(records_obj), log_info
             )
-            return records_obj
+            return records_obj, response
+
+    async def _base_mget(
+        self,
+        model: Type[BaseModel],
+        index: str,
+        ids: list[str],
+        log_info: str,
+    ) -> list[BaseModel] | None:
+        """
+        Вспомогательный базовый метод для получения записей по списку id
+        одним запросом mget (только поля модели), в порядке ids.
+        Отсутствующие в индексе документы пропускаются.
+        """
+        if not ids:
+            return []
+
+        try:
+            response = await self.es_client.mget(
+                index, ids, log_info,
+                source_includes=list(self._get_source_fields(model)),
+            )
+            records_obj = self._create_objects_from_elastic(
+                model,
+                [doc for doc in response["docs"] if doc.get("found")],
+                log_info,
+            )
+
+        except (ElasticServiceError, CreateObjectsError):
+            return None
+
+        except (KeyError, TypeError) as e:
+            logger.error(
+                "Ошибка некорректного ответа от Elasticsearch: %s. %s",
+                e, log_info
+            )
+            return None
+
+        logger.info(
+            "Из Elasticsearch получено записей в количестве: %d шт. %s",
+            len(records_obj), log_info
+        )
+        return records_obj
+
+    async def _base_get_no_cache(
+        self,
+        model: Type[BaseModel],
+        index: str,
+        body: dict,
+        log_info: str,
+    ) -> list[BaseModel] | None:
+        """
+        Вспомогательный базовый метод для получения записей из Elasticsearch
+        без использования кеша.
+        """
+        records_obj, _ = await self._base_search(model, index, body, log_info)
+
+        return records_obj
 
     async def _base_get_with_cache(
         self,
@@ -284,6 +401,7 @@ class BaseService:
         body: dict,
         cache_key: str,
         log_info: str,
+        cache_tag: str | None = None,
     ) -> list[BaseModel] | None:
         """
         Вспомогательный базовый метод для получения записей с использованием
@@ -304,6 +422,235 @@ class BaseService:
         result = await self._base_get_no_cache(model, index, body, log_info)
 
         # Кешируем асинхронно фильм в Redis
-        asyncio.create_task(self._put_to_cache(cache_key, result, log_info))
+        asyncio.create_task(self._put_to_cache(
+            cache_key, result, log_info, cache_tag=cache_tag
+        ))
 
         return result
+
+    @staticmethod
+    def _get_next_cursor(
+        response: dict, page_size: int, pit_id: str | None = None
+    ) -> str | None:
+        """
+        Курсор следующей страницы по значениям сортировки последней записи;
+        None, если страница неполная (записей больше нет).
+        """
+        hits = response.get("hits", {}).get("hits", [])
+
+        if len(hits) < page_size or "sort" not in hits[-1]:
+            return None
+
+        return encode_cursor(
+            search_after=hits[-1]["sort"],
+            pit_id=response.get("pit_id", pit_id),
+        )
+
+    async def _put_page_to_cache(
+        self,
+        cache_key: str,
+        data: list[BaseModel] | None,
+        next_cursor: str | None,
+        log_info: str = "",
+        expire: int = settings.cache_expire_in_seconds,
+        cache_tag: str | None = None,
+    ) -> None:
+        """
+        Вспомогательные метод для кеширования страницы и ее курсора. Курсор
+        кешируется без point in time (strip_cursor_pit): PIT может истечь
+        раньше страницы в кеше.
+        """
+        await self._put_to_cache(cache_key, data, log_info, expire)
+
+        if data and next_cursor:
+            try:
+                await self.redis_client.set(
+                    f"{cache_key}:cursor",
+                    strip_cursor_pit(next_cursor).encode(), expire,
+                    log_info=log_info,
+                )
+
+            except CacheServiceError:
+                pass
+
+        await self._tag_cache_keys(
+            cache_tag, [cache_key, f"{cache_key}:cursor"], log_info
+        )
+
+    async def _get_page_from_cache(
+        self, model: Type[BaseModel], cache_key: str, log_info: str = ""
+    ) -> tuple[list[BaseModel], str | None] | None:
+        """
+        Вспомогательный метод для получения страницы и ее курсора из кеша;
+        None - страницы нет в кеше (или кеш недоступен).
+        """
+        try:
+            cache = await self._get_from_cache(model, cache_key, log_info)
+
+            if cache is not None:
+                next_cursor = await self.redis_client.get(
+                    f"{cache_key}:cursor", log_info
+                )
+
+                return cache, next_cursor.decode() if next_cursor else None
+
+        except (CheckCacheError, CacheServiceError):
+            pass
+
+        return None
+
+    async def _base_get_page(
+        self,
+        model: Type[BaseModel],
+        index: str,
+        body: dict,
+        page_size: int,
+        page_number: int = 1,
+        cursor: str | None = None,
+        cache_key: str | None = None,
+        log_info: str = "",
+        cache_tag: str | None = None,
+    ) -> tuple[list[BaseModel] | None, str | None]:
+        """
+        Вспомогательный базовый метод для получения страницы записей.
+
+        Без курсора - страница page_number через from/size (неглубокие
+        страницы, с кешем по cache_key). С курсором - следующая страница
+        через search_after (и point in time, если включен): Elasticsearch не
+        собирает from+size записей на каждом шарде, поэтому время страницы
+        не зависит от глубины и нет ограничения max_result_window. Сортировка
+        в body должна завершаться уникальным полем (id).
+
+        Возвращает записи и курсор следующей страницы.
+        """
+        body["size"] = page_size
+
+        if cursor:
+            body["search_after"], pit_id = decode_cursor(cursor)
+
+            if settings.elastic_pit_keep_alive:
+                try:
+                    pit_id = pit_id or await self.es_client.open_point_in_time(
+                        index, settings.elastic_pit_keep_alive, log_info
+                    )
+
+                except ElasticServiceError:
+                    return None, None
+
+                # Поиск в point in time выполняется без указания индекса.
+                body["pit"] = {
+                    "id": pit_id, "keep_alive": settings.elastic_pit_keep_alive
+                }
+                index = None
+
+            records, response = await self._base_search(
+                model, index, body, log_info
+            )
+            next_cursor = self._get_next_cursor(response, page_size, pit_id)
+
+            # Последняя страница: point in time больше не нужен, не ждем
+            # истечения keep_alive (число открытых PIT на узле ограничено).
+            if pit_id and records is not None and next_cursor is None:
+                asyncio.create_task(self.es_client.close_point_in_time(
+                    response.get("pit_id", pit_id), log_info
+                ))
+
+            return records, next_cursor
+
+        body["from"] = (page_number - 1) * page_size
+
+        if cache_key:
+            page = await self._get_page_from_cache(model, cache_key, log_info)
+
+            if page is not None:
+                return page
+
+        records, response = await self._base_search(
+            model, index, body, log_info
+        )
+        next_cursor = self._get_next_cursor(response, page_size)
+
+        if cache_key:
+            asyncio.create_task(self._put_page_to_cache(
+                cache_key, records, next_cursor, log_info,
+                cache_tag=cache_tag,
+            ))
+
+        return records, next_cursor
+
+    async def _put_search_page_to_cache(
+        self,
+        index: str,
+        cache_key: str,
+        data: list[BaseModel],
+        next_cursor: str | None,
+        log_info: str = "",
+    ) -> None:
+        """
+        Вспомогательный метод для кеширования страницы результатов поиска:
+        ключи страницы добавляются в множество ключей поиска по индексу,
+        которое ограничивает размер кеша и сбрасывается ETL.
+        """
+        await self._put_page_to_cache(
+            cache_key, data, next_cursor, log_info,
+            settings.search_cache_expire_sec,
+        )
+
+        try:
+            await self.redis_client.add_to_keyset(
+                get_search_keyset_key(index),
+                [cache_key, f"{cache_key}:cursor"],
+                settings.search_cache_max_keys,
+                settings.search_cache_expire_sec,
+                log_info,
+            )
+
+        except CacheServiceError:
+            pass
+
+    async def _base_search_page(
+        self,
+        endpoint: str,
+        model: Type[BaseModel],
+        index: str,
+        body: dict,
+        query: str,
+        page_size: int,
+        page_number: int = 1,
+        cursor: str | None = None,
+        log_info: str = "",
+    ) -> tuple[list[BaseModel] | None, str | None]:
+        """
+        Вспомогательный базовый метод для поиска с кешем результатов:
+        страница page_number кешируется по индексу, нормализованному
+        запросу query (normalize_search_query) и параметрам страницы на
+        search_cache_expire_sec. Страницы по курсору не кешируются.
+        Попадания и промахи кеша учитываются по endpoint в метрике
+        SEARCH_CACHE_REQUESTS.
+        """
+        if cursor or not settings.search_cache_enabled:
+            return await self._base_get_page(
+                model, index, body, page_size, page_number, cursor,
+                log_info=log_info
+            )
+
+        cache_key = get_search_cache_key(index, query, page_size, page_number)
+        page = await self._get_page_from_cache(model, cache_key, log_info)
+
+        if page is not None:
+            SEARCH_CACHE_REQUESTS.labels(endpoint=endpoint, result="hit").inc()
+
+            return page
+
+        SEARCH_CACHE_REQUESTS.labels(endpoint=endpoint, result="miss").inc()
+
+        records, next_cursor = await self._base_get_page(
+            model, index, body, page_size, page_number, log_info=log_info
+        )
+
+        if records is not None:
+            asyncio.create_task(self._put_search_page_to_cache(
+                index, cache_key, records, next_cursor, log_info
+            ))
+
+        return records, next_cursor
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import os
+import socket
+
+from redis.exceptions import ResponseError
+
+from src.core.config import settings
+from src.core.exceptions import CacheServiceError
+from src.services.cache_service import CacheService
+from src.services.search_cache import get_search_keyset_key
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["CacheInvalidator", "cache_invalidator", "get_cache_tag_key"]
+
+# Множество ключей (add_to_keyset) списков и подсказок по индексу: страницы
+# фильмов, подсказки названий, список жанров. Сбрасывается целиком при
+# изменении любого документа индекса.
+CACHE_TAG_KEY_TEMPLATE = "cache_tag:{index}"
+
+
+def get_cache_tag_key(index: str) -> str:
+    return CACHE_TAG_KEY_TEMPLATE.format(index=index)
+
+
+class CacheInvalidator:
+    """
+    Сброс кеша по событиям ETL (etl_service: loader/movies_cache.py): ETL
+    после загрузки документов пишет в Redis stream cache:invalidation
+    события с индексом и id документов. Экземпляры movies_service читают
+    stream одной группой потребителей (кеш в Redis общий, событие
+    обрабатывается один раз) и удаляют ровно затронутые ключи: документы
+    по id (KEY_TEMPLATES), множество ключей списков индекса (тег) и кеш
+    поиска индекса.
+
+    События, прочитанные остановленным экземпляром и не подтвержденные
+    (XACK), забираются другими через claim_idle_ms (XAUTOCLAIM). Через
+    repeat_delay_sec ключи удаляются повторно: запрос, прочитавший из
+    Elasticsearch прежние данные до события, мог закешировать их уже
+    после первого удаления.
+    """
+
+    STREAM_KEY = "cache:invalidation"
+    GROUP = "movies_service"
+    # Поле события -> ключи кеша, которые зависят от документа с этим id.
+    KEY_TEMPLATES = {
+        "film_work": {
+            "ids": ("film:{id}",),
+            "person_ids": ("person_films:{id}",),
+        },
+        "person": {"ids": ("person:{id}", "person_films:{id}")},
+        "genre": {"ids": ("genre:{id}",)},
+    }
+
+    def __init__(
+        self,
+        block_ms: int = settings.cache_invalidation_block_ms,
+        batch_size: int = settings.cache_invalidation_batch_size,
+        claim_idle_ms: int = settings.cache_invalidation_claim_idle_ms,
+        repeat_delay_sec: float = settings.cache_invalidation_repeat_delay_sec,
+    ):
+        self._block_ms = block_ms
+        self._batch_size = batch_size
+        self._claim_idle_ms = claim_idle_ms
+        self._repeat_delay_sec = repeat_delay_sec
+        self._consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._cache: CacheService | None = None
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    def get_keys(cls, event: dict[str, str]) -> tuple[list[str], list[str]]:
+        """Ключи и множества ключей кеша, затронутые событием."""
+        index = event.get("index", "")
+        keys = [
+            template.format(id=id_)
+            for field, templates in cls.KEY_TEMPLATES.get(index, {}).items()
+            for id_ in event.get(field, "").split(",")
+            if id_
+            for template in templates
+        ]
+
+        return keys, [get_cache_tag_key(index), get_search_keyset_key(index)]
+
+    async def _create_group(self) -> None:
+        try:
+            await self._cache.redis_client.xgroup_create(
+                self.STREAM_KEY, self.GROUP, id="$", mkstream=True
+            )
+
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _read(self) -> list[tuple[bytes, dict]]:
+        """
+        Новые события группы; если их нет - события, не подтвержденные
+        другими потребителями дольше claim_idle_ms.
+        """
+        redis_client = self._cache.redis_client
+        response = await redis_client.xreadgroup(
+            self.GROUP, self._consumer, {self.STREAM_KEY: ">"},
+            count=self._batch_size, block=self._block_ms,
+        )
+
+        if response:
+            return response[0][1]
+
+        _, messages, *_ = await redis_client.xautoclaim(
+            self.STREAM_KEY, self.GROUP, self._consumer,
+            min_idle_time=self._claim_idle_ms, count=self._batch_size,
+        )
+
+        return messages
+
+    async def _evict(self, events: list[dict[str, str]]) -> int:
+        keys, keysets = [], set()
+
+        for event in events:
+            event_keys, event_keysets = self.get_keys(event)
+            keys.extend(event_keys)
+            keysets.update(event_keysets)
+
+        return await self._cache.evict(
+            list(dict.fromkeys(keys)), sorted(keysets),
+            log_info="Сброс кеша по событиям ETL."
+        )
+
+    async def _evict_later(self, events: list[dict[str, str]]) -> None:
+        await asyncio.sleep(self._repeat_delay_sec)
+
+        try:
+            await self._evict(events)
+
+        except CacheServiceError:
+            pass
+
+    async def process(self) -> int:
+        """
+        Обработка пачки событий: удаление ключей и подтверждение событий.
+        Возвращает количество событий.
+        """
+        messages = await self._read()
+
+        if not messages:
+            return 0
+
+        events = [
+            {
+                field.decode(): value.decode()
+                for field, value in message.items()
+            }
+            for _, message in messages
+            if message
+        ]
+        deleted = await self._evict(events)
+
+        await self._cache.redis_client.xack(
+            self.STREAM_KEY, self.GROUP,
+            *(message_id for message_id, _ in messages)
+        )
+        logger.info(
+            "Кеш сброшен по событиям ETL: событий %d, удалено ключей %d.",
+            len(messages), deleted
+        )
+
+        if self._repeat_delay_sec:
+            asyncio.create_task(self._evict_later(events))
+
+        return len(messages)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._create_group()
+
+                while True:
+                    await self.process()
+
+            except Exception as e:
+                logger.error(
+                    "Ошибка при чтении событий сброса кеша: %s. Повтор "
+                    "через %s с.", e, settings.health_check_interval_sec
+                )
+                await asyncio.sleep(settings.health_check_interval_sec)
+
+    def start(self, cache: CacheService) -> None:
+        if not self._task:
+            self._cache = cache
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+            try:
+                await self._task
+
+            except asyncio.CancelledError:
+                pass
+
+            self._task = None
+
+
+cache_invalidator = CacheInvalidator()
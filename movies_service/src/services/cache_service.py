@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from redis.asyncio import Redis
@@ -9,8 +10,69 @@ logger = logging.getLogger(__name__)
 
 
 class CacheService:
+    # KEYS[1] - множество ключей (sorted set, score - время добавления в
+    # мс), KEYS[2..] - добавляемые ключи; ARGV[1] - наибольшее число ключей,
+    # ARGV[2] - время жизни в мс. Истекшие ключи удаляются из множества,
+    # сверх лимита - вытесняются самые старые (вместе со значениями).
+    KEYSET_SCRIPT = """
+local max_keys = tonumber(ARGV[1])
+local expire_ms = tonumber(ARGV[2])
+local time_ = redis.call('TIME')
+local now = time_[1] * 1000 + math.floor(time_[2] / 1000)
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - expire_ms)
+
+for i = 2, #KEYS do
+    redis.call('ZADD', KEYS[1], now, KEYS[i])
+end
+
+local excess = redis.call('ZCARD', KEYS[1]) - max_keys
+
+if excess > 0 then
+    local evicted = redis.call('ZPOPMIN', KEYS[1], excess)
+
+    for i = 1, #evicted, 2 do
+        redis.call('DEL', evicted[i])
+    end
+end
+
+redis.call('PEXPIRE', KEYS[1], expire_ms)
+
+return math.max(excess, 0)
+"""
+
+    # KEYS - удаляемые ключи, последние ARGV[1] из них - множества ключей
+    # (удаляются вместе с ключами, которые в них перечислены). Удаление
+    # пачками (ограничение unpack). Возвращает число удаленных ключей.
+    EVICT_SCRIPT = """
+local keysets = tonumber(ARGV[1])
+local plain = #KEYS - keysets
+local deleted = 0
+
+local function delete(keys, first, last)
+    for i = first, last, 1000 do
+        deleted = deleted + redis.call(
+            'DEL', unpack(keys, i, math.min(i + 999, last))
+        )
+    end
+end
+
+delete(KEYS, 1, plain)
+
+for i = plain + 1, #KEYS do
+    local keys = redis.call('ZRANGE', KEYS[i], 0, -1)
+    delete(keys, 1, #keys)
+    redis.call('DEL', KEYS[i])
+end
+
+return deleted
+"""
+
     def __init__(self, redis_client: Redis):
         self.redis_client = redis_client
+        # Скрипты вызываются по EVALSHA текущим клиентом (см. reconnect).
+        self._keyset_script = redis_client.register_script(self.KEYSET_SCRIPT)
+        self._evict_script = redis_client.register_script(self.EVICT_SCRIPT)
 
     async def get(self, key: str, log_info: str = "") -> bytes | None:
         logger.debug(
@@ -67,6 +129,102 @@ class CacheService:
                 key, expire, log_info
             )
 
+    async def add_to_keyset(
+            self,
+            keyset_key: str,
+            keys: list[str],
+            max_keys: int,
+            expire: int = settings.cache_expire_in_seconds,
+            log_info: str = "",
+    ) -> int:
+        """
+        Добавление ключей в множество ключей кеша (для сброса и
+        ограничения размера кеша). Возвращает число вытесненных ключей.
+        """
+        try:
+            evicted = await self._keyset_script(
+                keys=[keyset_key, *keys],
+                args=[max_keys, expire * 1000],
+                client=self.redis_client,
+            )
+
+        except settings.redis_exceptions as e:
+            logger.error(
+                "Ошибка при добавлении ключей в множество: key=%s, "
+                "error=%s. %s",
+                keyset_key, e, log_info
+            )
+            raise CacheServiceError(e)
+
+        if evicted:
+            logger.info(
+                "Из кеша вытеснено ключей: %d (key=%s). %s",
+                evicted, keyset_key, log_info
+            )
+
+        return evicted
+
+    async def evict(
+            self,
+            keys: list[str],
+            keysets: list[str] | None = None,
+            log_info: str = "",
+    ) -> int:
+        """
+        Удаление ключей и множеств ключей (add_to_keyset) вместе с
+        перечисленными в них ключами. Возвращает число удаленных ключей.
+        """
+        keysets = keysets or []
+
+        if not keys and not keysets:
+            return 0
+
+        try:
+            return await self._evict_script(
+                keys=[*keys, *keysets],
+                args=[len(keysets)],
+                client=self.redis_client,
+            )
+
+        except settings.redis_exceptions as e:
+            logger.error(
+                "Ошибка при удалении ключей из кеша: keys=%d, keysets=%s, "
+                "error=%s. %s",
+                len(keys), keysets, e, log_info
+            )
+            raise CacheServiceError(e)
+
+    async def zrange_with_scores(
+        self, key: str, start: int, end: int, log_info: str = ""
+    ) -> list[tuple[bytes, float]]:
+        """Элементы sorted set с позиции start по end (включительно)."""
+        try:
+            return await self.redis_client.zrange(
+                key, start, end, withscores=True
+            )
+
+        except settings.redis_exceptions as e:
+            logger.error(
+                "Ошибка при получении sorted set из кеша: key=%s, error=%s. "
+                "%s",
+                key, e, log_info
+            )
+            raise CacheServiceError(e)
+
+    async def hmget(
+        self, key: str, fields: list[str], log_info: str = ""
+    ) -> list[bytes | None]:
+        try:
+            return await self.redis_client.hmget(key, fields)
+
+        except settings.redis_exceptions as e:
+            logger.error(
+                "Ошибка при получении полей hash из кеша: key=%s, error=%s. "
+                "%s",
+                key, e, log_info
+            )
+            raise CacheServiceError(e)
+
     async def close(self) -> None:
         logger.info("Закрытие соединения с Redis по работе с кешом...")
 
@@ -82,3 +240,26 @@ class CacheService:
                 "%s", e
             )
             raise CacheServiceError(e)
+
+    async def is_connected(self) -> bool:
+        return await self.redis_client.ping()
+
+    async def reconnect(self, redis_client: Redis) -> None:
+        """
+        Заменяет клиент на новый и закрывает прежний в фоне: запросы, уже
+        начатые с прежним клиентом, успевают завершиться.
+        """
+        old_client, self.redis_client = self.redis_client, redis_client
+        asyncio.create_task(self._close_later(old_client))
+
+    @staticmethod
+    async def _close_later(old_client: Redis) -> None:
+        await asyncio.sleep(settings.health_check_timeout_sec)
+
+        try:
+            await old_client.close()
+
+        except (settings.redis_exceptions, RuntimeError) as e:
+            logger.warning(
+                "Ошибка при закрытии прежнего клиента Redis для кеша: %s", e
+            )
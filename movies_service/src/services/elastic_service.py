@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Any
 
@@ -5,7 +6,7 @@ from elastic_transport import ObjectApiResponse, TransportError
 from elasticsearch import AsyncElasticsearch, NotFoundError
 
 from src.core.config import settings
-from src.core.exceptions import ElasticServiceError
+from src.core.exceptions import ElasticServiceError, InvalidCursorError
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +16,11 @@ class ElasticService:
         self.es_client = es_client
 
     async def get(
-        self, index: str, id: str, log_info: str = ""
+        self,
+        index: str,
+        id: str,
+        log_info: str = "",
+        source_includes: list[str] | None = None,
     ) -> ObjectApiResponse[Any] | None:
         logger.debug(
             "Попытка выполнить запрос get в Elasticsearch: "
@@ -23,7 +28,9 @@ class ElasticService:
             index, id, log_info
         )
         try:
-            response = await self.es_client.get(index=index, id=id)
+            response = await self.es_client.get(
+                index=index, id=id, source_includes=source_includes
+            )
 
             logger.info(
                 "Запрос get успешно выполнен в Elasticsearch: index=%s. %s",
@@ -46,16 +53,58 @@ class ElasticService:
             )
             raise ElasticServiceError(e)
 
+    async def mget(
+        self,
+        index: str,
+        ids: list[str],
+        log_info: str = "",
+        source_includes: list[str] | None = None,
+    ) -> ObjectApiResponse[Any]:
+        """Получить документы по списку id одним запросом."""
+        logger.debug(
+            "Попытка выполнить запрос mget в Elasticsearch: "
+            "index=%s, ids=%d. %s",
+            index, len(ids), log_info
+        )
+        try:
+            response = await self.es_client.mget(
+                index=index, ids=ids, source_includes=source_includes
+            )
+
+            logger.info(
+                "Запрос mget успешно выполнен в Elasticsearch: index=%s. %s",
+                index, log_info
+            )
+            return response
+
+        except settings.elastic_exceptions as e:
+            logger.error(
+                "Ошибка при выполнении запроса mget в Elasticsearch: "
+                "index=%s, error=%s. %s",
+                index, e, log_info
+            )
+            raise ElasticServiceError(e)
+
     async def search(
-        self, index: str, query: dict, log_info: str = ""
+        self,
+        index: str | None,
+        query: dict,
+        log_info: str = "",
+        filter_path: str | None = None,
     ) -> ObjectApiResponse[Any]:
+        """
+        Поиск; index=None - поиск в point in time из query["pit"].
+        filter_path - части ответа, которые вернет Elasticsearch.
+        """
         logger.debug(
             "Попытка выполнить запрос search в Elasticsearch: "
             "index=%s, query=%s. %s",
             index, query, log_info
         )
         try:
-            response = await self.es_client.search(index=index, body=query)
+            response = await self.es_client.search(
+                index=index, body=query, filter_path=filter_path
+            )
             count_records = len(response.get("hits", {}).get("hits", []))
 
             logger.info(
@@ -65,7 +114,15 @@ class ElasticService:
             )
             return response
 
-        except NotFoundError:
+        except NotFoundError as e:
+            # Point in time из курсора истек или неизвестен.
+            if index is None:
+                logger.info(
+                    "Point in time курсора не найден в Elasticsearch: %s. %s",
+                    e, log_info
+                )
+                raise InvalidCursorError(e)
+
             logger.info(
                 "Не найдена ни одна запись в Elasticsearch: index=%s. %s",
                 index, log_info
@@ -80,6 +137,37 @@ class ElasticService:
             )
             raise ElasticServiceError(e)
 
+    async def open_point_in_time(
+        self, index: str, keep_alive: str, log_info: str = ""
+    ) -> str:
+        """Открыть point in time индекса для курсорной пагинации."""
+        try:
+            response = await self.es_client.open_point_in_time(
+                index=index, keep_alive=keep_alive
+            )
+            return response["id"]
+
+        except settings.elastic_exceptions as e:
+            logger.error(
+                "Ошибка при открытии point in time в Elasticsearch: "
+                "index=%s, error=%s. %s",
+                index, e, log_info
+            )
+            raise ElasticServiceError(e)
+
+    async def close_point_in_time(
+        self, pit_id: str, log_info: str = ""
+    ) -> None:
+        """Закрыть point in time: курсорная пагинация завершена."""
+        try:
+            await self.es_client.close_point_in_time(id=pit_id)
+
+        except settings.elastic_exceptions as e:
+            logger.warning(
+                "Ошибка при закрытии point in time в Elasticsearch: %s. %s",
+                e, log_info
+            )
+
     async def index(
         self, index: str, id: str, body: dict
     ) -> ObjectApiResponse[Any]:
@@ -134,3 +222,23 @@ class ElasticService:
 
     async def is_connected(self) -> bool:
         return await self.es_client.ping()
+
+    async def reconnect(self, es_client: AsyncElasticsearch) -> None:
+        """
+        Заменяет клиент на новый и закрывает прежний в фоне: запросы, уже
+        начатые с прежним клиентом, успевают завершиться.
+        """
+        old_client, self.es_client = self.es_client, es_client
+        asyncio.create_task(self._close_later(old_client))
+
+    @staticmethod
+    async def _close_later(old_client: AsyncElasticsearch) -> None:
+        await asyncio.sleep(settings.health_check_timeout_sec)
+
+        try:
+            await old_client.close()
+
+        except (TransportError, RuntimeError) as e:
+            logger.warning(
+                "Ошибка при закрытии прежнего клиента Elasticsearch: %s", e
+            )
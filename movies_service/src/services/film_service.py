@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from functools import lru_cache
 from typing import Annotated
@@ -5,12 +6,18 @@ from uuid import UUID
 
 from fastapi import Depends
 
+from src.core.config import settings
+from src.core.exceptions import (CacheServiceError, CheckCacheError,
+                                 CreateObjectError, CreateObjectsError,
+                                 ElasticServiceError, JsonLoadsError)
 from src.db.elastic import get_elastic
 from src.db.redis_client import get_redis_cache
 from src.models.models import Film, FilmBase
 from src.services.base_service import BaseService
 from src.services.cache_service import CacheService
 from src.services.elastic_service import ElasticService
+from src.services.pagination import encode_cursor
+from src.services.search_cache import normalize_search_query
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +30,19 @@ class FilmService(BaseService):
     и Elasticsearch (для полнотекстового поиска).
     """
 
+    # Топ фильмов по рейтингу, который ETL предрасчитывает в Redis кеша
+    # (etl_service: loader/top_films.py): sorted set id фильмов по жанру
+    # (или all), score - значение сортировки ES со знаком минус; hash id ->
+    # JSON полей FilmBase.
+    TOP_FILMS_KEY_TEMPLATE = "top_films:{genre}"
+    TOP_FILMS_ALL_GENRES = "all"
+    TOP_FILMS_DOCS_KEY = "top_films:docs"
+    TOP_FILMS_SORT = "-imdb_rating"
+
+    # Подсказки completion suggester: из ответа нужны только документы.
+    SUGGEST_NAME = "film"
+    SUGGEST_FILTER_PATH = f"suggest.{SUGGEST_NAME}.options._source"
+
     async def get_film_by_id(self, film_id: UUID) -> list[Film] | None:
         """Получить фильм по его ID."""
         log_info = f"Получение фильма по ID {film_id}"
@@ -49,18 +69,32 @@ class FilmService(BaseService):
             sort: str = "-imdb_rating",
             page_size: int = 10,
             page_number: int = 1,
-    ) -> list[FilmBase] | None:
+            cursor: str | None = None,
+    ) -> tuple[list[FilmBase] | None, str | None]:
         """
         Получить список фильмов с поддержкой сортировки по рейтингу,
-        фильтрации по жанру и пагинацией.
+        фильтрации по жанру и пагинацией (номер страницы или курсор).
+        Возвращает фильмы и курсор следующей страницы.
         """
         log_info = (
             f"Запрос на получение фильмов: (sort={sort}, genre={genre}, "
-            f"page_size={page_size}, page_number={page_number})."
+            f"page_size={page_size}, page_number={page_number}, "
+            f"cursor={cursor})."
         )
 
         logger.info(log_info)
 
+        # Первые страницы по рейтингу - из топа, предрасчитанного ETL
+        if settings.top_films_enabled and sort == self.TOP_FILMS_SORT and (
+            not cursor
+        ):
+            top_page = await self._get_top_films_page(
+                genre, page_size, page_number, log_info
+            )
+
+            if top_page is not None:
+                return top_page
+
         #  Индекс для Elasticsearch
         es_index = "film_work"
         # Ключ для кеша
@@ -91,18 +125,67 @@ class FilmService(BaseService):
         sort_field = sort.lstrip("-")
         sort_order = "desc" if sort.startswith("-") else "asc"
 
-        body["sort"] = [{sort_field: {
-            "order": sort_order, "missing": "_last"
-        }}]
+        # id - уникальный завершающий ключ сортировки для search_after
+        body["sort"] = [
+            {sort_field: {"order": sort_order, "missing": "_last"}},
+            {"id": "asc"},
+        ]
+
+        return await self._base_get_page(
+            model, es_index, body, page_size, page_number, cursor,
+            cache_key, log_info, cache_tag=es_index
+        )
+
+    async def _get_top_films_page(
+            self,
+            genre: UUID | None,
+            page_size: int,
+            page_number: int,
+            log_info: str = "",
+    ) -> tuple[list[FilmBase], str | None] | None:
+        """
+        Страница фильмов по рейтингу из топа, предрасчитанного ETL, и курсор
+        следующей страницы (для продолжения через search_after в
+        Elasticsearch). None - страницы нет в топе (глубже топа, топ еще не
+        рассчитан, ошибка Redis): запрос выполняется в Elasticsearch.
+        """
+        start = (page_number - 1) * page_size
+        key = self.TOP_FILMS_KEY_TEMPLATE.format(
+            genre=genre or self.TOP_FILMS_ALL_GENRES
+        )
+
+        try:
+            ranked = await self.redis_client.zrange_with_scores(
+                key, start, start + page_size - 1, log_info
+            )
+
+            # Неполная страница - конец топа: остаток только в ES
+            if len(ranked) < page_size:
+                return None
+
+            film_ids = [film_id.decode() for film_id, _ in ranked]
+            docs = await self.redis_client.hmget(
+                self.TOP_FILMS_DOCS_KEY, film_ids, log_info
+            )
+
+            if not all(docs):
+                return None
+
+            films = [
+                self._create_object_from_dict(
+                    FilmBase, self._get_data_from_json(doc, log_info),
+                    log_info
+                )
+                for doc in docs
+            ]
 
-        #  Вычисляем начальную запись для выдачи
-        from_value = (page_number - 1) * page_size
+        except (CacheServiceError, JsonLoadsError, CreateObjectError):
+            return None
 
-        body["from"] = from_value
-        body["size"] = page_size
+        logger.info("Страница фильмов получена из топа. %s", log_info)
 
-        return await self._base_get_with_cache(
-            model, es_index, body, cache_key, log_info
+        return films, encode_cursor(
+            search_after=[-ranked[-1][1], film_ids[-1]]
         )
 
     async def search_films(
@@ -110,13 +193,17 @@ class FilmService(BaseService):
         query: str | None = None,
         page_size: int = 10,
         page_number: int = 1,
-    ) -> list[FilmBase] | None:
+        cursor: str | None = None,
+    ) -> tuple[list[FilmBase] | None, str | None]:
         """
-        Поиск фильмов по ключевым словам и пагинацией.
+        Поиск фильмов по ключевым словам и пагинацией (номер страницы или
+        курсор). Возвращает фильмы и курсор следующей страницы.
         """
+        query = normalize_search_query(query)
         log_info = (
             f"Запрос на получение фильмов: (query={query}, "
-            f"page_size={page_size}, page_number={page_number})."
+            f"page_size={page_size}, page_number={page_number}, "
+            f"cursor={cursor})."
         )
 
         logger.info(log_info)
@@ -140,16 +227,98 @@ class FilmService(BaseService):
         else:
             body["query"]["match_all"] = {}
 
-        #  Вычисляем начальную запись для выдачи
-        from_value = (page_number - 1) * page_size
+        # Релевантность, id - уникальный завершающий ключ для search_after
+        body["sort"] = ["_score", {"id": "asc"}]
 
-        body["from"] = from_value
-        body["size"] = page_size
+        return await self._base_search_page(
+            "search_films", model, es_index, body, query, page_size,
+            page_number, cursor, log_info
+        )
 
-        return await self._base_get_no_cache(
-            model, es_index, body, log_info
+    async def suggest_films(
+        self,
+        query: str,
+        size: int = 10,
+        fuzzy: bool = False,
+    ) -> list[FilmBase] | None:
+        """
+        Автодополнение названий фильмов по началу любого слова названия
+        (completion suggester по полю title_suggest, которое заполняет ETL).
+        Подсказки упорядочены по весу (рейтингу фильма); fuzzy - с
+        опечатками в префиксе (для распознанной речи).
+        """
+        log_info = (
+            f"Запрос подсказок фильмов: (query={query}, size={size}, "
+            f"fuzzy={fuzzy})."
         )
 
+        logger.info(log_info)
+
+        #  Индекс для Elasticsearch
+        es_index = "film_work"
+        # Ключ для кеша
+        cache_key = f"films:suggest:{int(fuzzy)}:{size}:{query.lower()}"
+        # Модель Pydantic для возврата
+        model = FilmBase
+
+        try:
+            cache = await self._get_from_cache(model, cache_key, log_info)
+
+            if cache is not None:
+                return cache
+
+        except CheckCacheError:
+            pass
+
+        completion = {
+            "field": "title_suggest",
+            "size": size,
+            "skip_duplicates": True,
+        }
+
+        if fuzzy:
+            completion["fuzzy"] = {"fuzziness": "AUTO"}
+
+        # Формируем тело запроса для Elasticsearch
+        body = {
+            "_source": list(self._get_source_fields(model)),
+            "suggest": {
+                self.SUGGEST_NAME: {"prefix": query, "completion": completion}
+            },
+        }
+
+        try:
+            response = await self.es_client.search(
+                es_index, body, log_info, filter_path=self.SUGGEST_FILTER_PATH
+            )
+            options = [
+                option
+                for entry in response.get("suggest", {}).get(
+                    self.SUGGEST_NAME, []
+                )
+                for option in entry.get("options", [])
+            ]
+            films = self._create_objects_from_elastic(
+                model, options, log_info
+            )
+
+        except (ElasticServiceError, CreateObjectsError):
+            return None
+
+        except (AttributeError, TypeError) as e:
+            logger.error(
+                "Ошибка некорректного ответа от Elasticsearch: %s. %s",
+                e, log_info
+            )
+            return None
+
+        # Кешируем асинхронно подсказки в Redis
+        asyncio.create_task(self._put_to_cache(
+            cache_key, films, log_info, cache_tag=es_index
+        ))
+
+        return films
+
 
 @lru_cache()
 def get_film_service(
@@ -11,6 +11,7 @@ from src.models.models import GenreBase
 from src.services.base_service import BaseService
 from src.services.cache_service import CacheService
 from src.services.elastic_service import ElasticService
+from src.services.search_cache import normalize_search_query
 
 logger = logging.getLogger(__name__)
 
@@ -62,13 +63,14 @@ class GenreService(BaseService):
         }
 
         return await self._base_get_with_cache(
-            model, es_index, body, cache_key, log_info
+            model, es_index, body, cache_key, log_info, cache_tag=es_index
         )
 
     async def search_genres(
         self, query: str | None = None
     ) -> list[GenreBase] | None:
         """Поиск жанров по ключевым словам."""
+        query = normalize_search_query(query)
         log_info = f"Запрос на получение жанров: (query={query})."
 
         logger.info(log_info)
@@ -92,10 +94,13 @@ class GenreService(BaseService):
         else:
             body["query"]["match_all"] = {}
 
-        return await self._base_get_no_cache(
-            model, es_index, body, log_info
+        genres, _ = await self._base_search_page(
+            "search_genres", model, es_index, body, query,
+            settings.elastic_response_size, log_info=log_info
         )
 
+        return genres
+
 
 @lru_cache()
 def get_genre_service(
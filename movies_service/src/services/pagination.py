@@ -0,0 +1,63 @@
+import base64
+from typing import Any
+
+import orjson
+
+from src.core.exceptions import InvalidCursorError
+
+__all__ = [
+    "NEXT_CURSOR_HEADER",
+    "encode_cursor",
+    "decode_cursor",
+    "strip_cursor_pit",
+]
+
+# Заголовок ответа с курсором следующей страницы
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(search_after: list[Any], pit_id: str | None = None) -> str:
+    """
+    Курсор следующей страницы: значения сортировки последней записи
+    (search_after) и, если используется, идентификатор point in time.
+    Для клиента курсор - непрозрачная строка (base64url).
+    """
+    payload = {"s": search_after}
+
+    if pit_id:
+        payload["p"] = pit_id
+
+    return base64.urlsafe_b64encode(orjson.dumps(payload)).decode().rstrip(
+        "="
+    )
+
+
+def decode_cursor(cursor: str) -> tuple[list[Any], str | None]:
+    """
+    @rtype: tuple[list[Any], str | None]
+    @return: (search_after, pit_id)
+    """
+    try:
+        payload = orjson.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+        search_after = payload["s"]
+
+        if not isinstance(search_after, list) or not search_after:
+            raise ValueError("search_after должен быть непустым списком")
+
+        return search_after, payload.get("p")
+
+    except (ValueError, TypeError, KeyError, orjson.JSONDecodeError) as e:
+        raise InvalidCursorError(e)
+
+
+def strip_cursor_pit(cursor: str) -> str:
+    """
+    Курсор без point in time: для кеширования вместе со страницей. PIT
+    истекает через elastic_pit_keep_alive после открытия, а страница может
+    жить в кеше дольше; продолжение по такому курсору откроет новый PIT.
+    """
+    search_after, pit_id = decode_cursor(cursor)
+
+    return encode_cursor(search_after=search_after) if pit_id else cursor
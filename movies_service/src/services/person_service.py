@@ -1,17 +1,21 @@
+import asyncio
 import logging
 from functools import lru_cache
 from typing import Annotated
 from uuid import UUID
 
+from elasticsearch import NotFoundError
 from fastapi import Depends
 
 from src.core.config import settings
+from src.core.exceptions import CheckCacheError, ElasticServiceError
 from src.db.elastic import get_elastic
 from src.db.redis_client import get_redis_cache
 from src.models.models import FilmBase, Person
 from src.services.base_service import BaseService
 from src.services.cache_service import CacheService
 from src.services.elastic_service import ElasticService
+from src.services.search_cache import normalize_search_query
 
 logger = logging.getLogger(__name__)
 
@@ -58,66 +62,61 @@ class PersonService(BaseService):
 
         logger.info(log_info)
 
-        #  Индекс для Elasticsearch
-        es_index = "film_work"
         # Ключ для кеша
         cache_key = f"person_films:{person_id}"
         # Модель Pydantic для возврата
         model = FilmBase
 
-        # Формируем тело запроса для Elasticsearch
-        body = {"query": {"bool": {
-            "should": [
-                {
-                    "nested": {
-                        "path": "actors",
-                        "query": {
-                            "term": {
-                                "actors.id": person_id,
-                            }
-                        }
-                    }
-                },
-                {
-                    "nested": {
-                        "path": "writers",
-                        "query": {
-                            "term": {
-                                "writers.id": person_id,
-                            }
-                        }
-                    }
-                },
-                {
-                    "nested": {
-                        "path": "directors",
-                        "query": {
-                            "term": {
-                                "directors.id": person_id,
-                            }
-                        }
-                    }
-                },
-            ],
-            "minimum_should_match": 1,
-        }}, "size": settings.elastic_response_size}
+        try:
+            cache = await self._get_from_cache(model, cache_key, log_info)
+            if cache is not None:
+                return cache
 
-        return await self._base_get_with_cache(
-            model, es_index, body, cache_key, log_info
-        )
+        except CheckCacheError:
+            pass
+
+        # Фильмы персоны денормализованы ETL в документ person (films):
+        # id фильмов из него и один mget по film_work вместо трех nested
+        # запросов по actors, writers и directors.
+        try:
+            person = await self.es_client.get(
+                "person", str(person_id), log_info,
+                source_includes=["films.id"],
+            )
+
+        except NotFoundError:
+            return []
+
+        except ElasticServiceError:
+            return None
+
+        film_ids = [
+            film["id"] for film in person["_source"].get("films", [])
+        ][:settings.elastic_response_size]
+
+        result = await self._base_mget(model, "film_work", film_ids, log_info)
+
+        # Кешируем асинхронно фильмы в Redis
+        asyncio.create_task(self._put_to_cache(cache_key, result, log_info))
+
+        return result
 
     async def search_persons(
         self,
         query: str | None = None,
         page_size: int = 10,
         page_number: int = 1,
-    ) -> list[Person] | None:
+        cursor: str | None = None,
+    ) -> tuple[list[Person] | None, str | None]:
         """
-        Поиск персон по ключевым словам и пагинацией.
+        Поиск персон по ключевым словам и пагинацией (номер страницы или
+        курсор). Возвращает персоны и курсор следующей страницы.
         """
+        query = normalize_search_query(query)
         log_info = (
             f"Запрос на получение персон: (query={query}, "
-            f"page_size={page_size}, page_number={page_number})."
+            f"page_size={page_size}, page_number={page_number}, "
+            f"cursor={cursor})."
         )
 
         logger.info(log_info)
@@ -141,14 +140,12 @@ class PersonService(BaseService):
         else:
             body["query"]["match_all"] = {}
 
-        #  Вычисляем начальную запись для выдачи
-        from_value = (page_number - 1) * page_size
-
-        body["from"] = from_value
-        body["size"] = page_size
+        # Релевантность, id - уникальный завершающий ключ для search_after
+        body["sort"] = ["_score", {"id": "asc"}]
 
-        return await self._base_get_no_cache(
-            model, es_index, body, log_info
+        return await self._base_search_page(
+            "search_persons", model, es_index, body, query, page_size,
+            page_number, cursor, log_info
         )
 
 
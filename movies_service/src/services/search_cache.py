@@ -0,0 +1,42 @@
+import hashlib
+import unicodedata
+
+__all__ = [
+    "normalize_search_query",
+    "get_search_cache_key",
+    "get_search_keyset_key",
+]
+
+# Ключи кеша результатов поиска по индексу и множество (sorted set) этих
+# ключей: по нему ограничивается размер кеша и ETL (etl_service:
+# loader/movies_cache.py) сбрасывает кеш индекса после загрузки.
+SEARCH_CACHE_KEY_TEMPLATE = "search:{index}:{params}:{digest}"
+SEARCH_KEYSET_KEY_TEMPLATE = "search:{index}:keys"
+
+
+def normalize_search_query(query: str | None) -> str:
+    """
+    Нормализованный поисковый запрос: NFKC, без учета регистра, пробелы
+    схлопнуты. Запросы, которые отличаются только этим, Elasticsearch
+    (standard analyzer) обрабатывает одинаково, поэтому у них общий кеш.
+    """
+    if not query:
+        return ""
+
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def get_search_cache_key(index: str, query: str, *params: int) -> str:
+    """
+    Ключ кеша поиска: индекс, параметры страницы и хеш нормализованного
+    запроса (длина ключа не зависит от длины запроса).
+    """
+    return SEARCH_CACHE_KEY_TEMPLATE.format(
+        index=index,
+        params=":".join(map(str, params)),
+        digest=hashlib.blake2b(query.encode(), digest_size=16).hexdigest(),
+    )
+
+
+def get_search_keyset_key(index: str) -> str:
+    return SEARCH_KEYSET_KEY_TEMPLATE.format(index=index)
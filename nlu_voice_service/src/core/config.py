@@ -123,6 +123,7 @@ class Config(BaseSettings):
         )
 
     movies_service_uri: dict[str, str] = {
+        "suggest_films_by_title": "api/v1/movies/films/suggest",
         "search_films_by_title": "api/v1/movies/films/search",
     }
 
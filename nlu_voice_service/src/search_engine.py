@@ -84,41 +84,87 @@ class VoiceSearchEngine(STTMixin, TTSMixin, AssistantModelWorkerMixin):
 
     async def _get_movies_by_titles(self, movie: str) -> list[str]:
         """
-        Поиск фильмов из входящего аудиофайла в movies_service.
+        Поиск фильмов из входящего аудиофайла в movies_service: сначала
+        автодополнение по началу названия (быстрый запрос к подсказкам, с
+        опечатками распознавания), затем полнотекстовый поиск.
 
         @type movie: str
         @param movie: Наименование запрашиваемого фильма.
         @rtype: list[str]
         @return:
         """
-        query_data = {"query": movie, "page_size": 3, "page_number": 1}
+        requests_ = (
+            (
+                "suggest_films_by_title",
+                {"query": movie, "size": 3, "fuzzy": "true"},
+            ),
+            (
+                "search_films_by_title",
+                {"query": movie, "page_size": 3, "page_number": 1},
+            ),
+        )
+
+        async with aiohttp.ClientSession() as session:
+            for uri_name, query_data in requests_:
+                if titles := await self._request_movies_titles(
+                    session, uri_name, query_data
+                ):
+                    return titles
+
+        return []
+
+    async def _request_movies_titles(
+        self,
+        session: aiohttp.ClientSession,
+        uri_name: str,
+        query_data: dict[str, str | int],
+    ) -> list[str]:
+        """
+        Запрос фильмов в movies_service.
+
+        @type session: aiohttp.ClientSession
+        @param session: Сессия HTTP-клиента.
+        @type uri_name: str
+        @param uri_name: Имя эндпоинта в config.movies_service_uri.
+        @type query_data: dict[str, str | int]
+        @param query_data: Параметры запроса.
+        @rtype: list[str]
+        @return: Названия найденных фильмов.
+        """
+        url = (
+            f"{config.get_movies_service_url()}/"
+            f"{config.movies_service_uri[uri_name]}"
+        )
 
         try:
-            async with aiohttp.ClientSession() as session:
-                url = (
-                    f"{config.get_movies_service_url()}/"
-                    f"{config.movies_service_uri['search_films_by_title']}"
-                )
-                headers = {
-                    "Accept": "application/json",
-                    "x-request-id": self._incoming_voice_d.request_id,
-                }
-                response = await session.get(
-                    url,
-                    params=query_data,
-                    headers=headers,
+            headers = {
+                "Accept": "application/json",
+                "x-request-id": self._incoming_voice_d.request_id,
+            }
+            response = await session.get(
+                url,
+                params=query_data,
+                headers=headers,
+            )
+
+            # 404 - фильмы не найдены (для подсказок - обычный промах перед
+            # полнотекстовым поиском), а не ошибка.
+            if response.status == 404:
+                logger.debug(
+                    f"[*] Not found data(url={url}, query_data={query_data})"
                 )
+                return []
 
-                if response.status != 200:
-                    error_msg = (
-                        f"[!] Error get data(url={url}, "
-                        f"query_data={query_data}): code = {response.status}"
-                    )
-                    logger.error(error_msg)
-                    return []
+            if response.status != 200:
+                error_msg = (
+                    f"[!] Error get data(url={url}, "
+                    f"query_data={query_data}): code = {response.status}"
+                )
+                logger.error(error_msg)
+                return []
 
-                films = await response.json()
-                return [film["title"] for film in films] if films else []
+            films = await response.json()
+            return [film["title"] for film in films] if films else []
 
         except Exception as ex:
             error_msg = (